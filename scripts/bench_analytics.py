@@ -0,0 +1,117 @@
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+# Allow importing from project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from bench_bulk_orders import fresh_pool, generate_orders
+from utils.analytics import AnalyticsSnapshot
+from utils.order_store import save_orders_bulk
+
+START_DATE = datetime.date(2000, 1, 1)
+END_DATE = datetime.date(2100, 1, 1)
+
+
+def seed(directory, num_orders):
+    pool = fresh_pool(directory, f"analytics_{num_orders}.db")
+    with pool.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO menu (item_id, item_name, category, price, gst, image_url) VALUES (?, ?, ?, ?, ?, '')",
+            [(i, f"Item {i}", f"Category {i % 8}", 50.0 + i, 5.0) for i in range(1, 101)]
+        )
+    save_orders_bulk(generate_orders(num_orders), batch_size=5000, pool=pool)
+    return pool
+
+
+def raw_queries(pool, start_date, end_date):
+    """
+    The dashboard before rollups: six functions, each scanning orders on its own connection.
+    """
+    start, end = start_date.strftime("%Y-%m-%d 00:00:00"), end_date.strftime("%Y-%m-%d 23:59:59")
+    with pool.connection() as conn:
+        conn.execute("SELECT SUM(total_paise) / 100.0 FROM orders WHERE timestamp BETWEEN ? AND ?", (start, end)).fetchone()
+    with pool.connection() as conn:
+        conn.execute("SELECT COUNT(*) FROM orders WHERE timestamp BETWEEN ? AND ?", (start, end)).fetchone()
+    with pool.connection() as conn:
+        pd.read_sql(
+            "SELECT DATE(timestamp) AS order_date, SUM(total_paise) / 100.0 AS daily_sales FROM orders "
+            "WHERE timestamp BETWEEN ? AND ? GROUP BY order_date ORDER BY order_date",
+            conn, params=(start, end)
+        )
+    with pool.connection() as conn:
+        pd.read_sql(
+            "SELECT payment, SUM(total_paise) / 100.0 AS total_sales FROM orders "
+            "WHERE timestamp BETWEEN ? AND ? GROUP BY payment",
+            conn, params=(start, end)
+        )
+    with pool.connection() as conn:
+        items = pd.read_sql(
+            "SELECT oi.item_id, oi.qty FROM order_items oi JOIN orders o ON oi.order_id = o.order_id "
+            "WHERE o.timestamp BETWEEN ? AND ?",
+            conn, params=(start, end)
+        )
+        menu = pd.read_sql("SELECT * FROM menu", conn)
+    merged = pd.merge(items, menu, on="item_id")
+    merged["total_sales"] = merged["qty"] * merged["price"]
+    merged.groupby("category")["total_sales"].sum().reset_index()
+    with pool.connection() as conn:
+        conn.execute(
+            "SELECT oi.item_id, SUM(oi.qty) AS q FROM order_items oi JOIN orders o ON oi.order_id = o.order_id "
+            "WHERE o.timestamp BETWEEN ? AND ? GROUP BY oi.item_id ORDER BY q DESC LIMIT 5",
+            (start, end)
+        ).fetchall()
+
+
+def rollup_queries(pool, start_date, end_date):
+    """
+    Six independent queries against the daily rollups, each on its own connection.
+    """
+    days = (start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
+    for query in (
+        "SELECT SUM(revenue_paise) / 100.0 FROM sales_daily WHERE bucket BETWEEN ? AND ?",
+        "SELECT SUM(orders) FROM sales_daily WHERE bucket BETWEEN ? AND ?",
+        "SELECT bucket, SUM(revenue_paise) / 100.0 FROM sales_daily WHERE bucket BETWEEN ? AND ? GROUP BY bucket",
+        "SELECT payment, SUM(revenue_paise) / 100.0 FROM sales_daily WHERE bucket BETWEEN ? AND ? GROUP BY payment",
+        "SELECT m.category, SUM(r.revenue_paise) / 100.0 FROM item_sales_daily r JOIN menu m ON m.item_id = r.item_id "
+        "WHERE r.bucket BETWEEN ? AND ? GROUP BY m.category",
+        "SELECT item_id, SUM(qty) AS q FROM item_sales_daily WHERE bucket BETWEEN ? AND ? GROUP BY item_id ORDER BY q DESC LIMIT 5",
+    ):
+        with pool.connection() as conn:
+            pd.read_sql(query, conn, params=days)
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AnalyticsSnapshot against per-widget dashboard queries.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Order counts to test.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'orders':>10} {'raw (6 queries)':>17} {'rollups (6 queries)':>20} {'snapshot':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            pool = seed(tmp, size)
+            engine = AnalyticsSnapshot(pool)
+            raw = best_of(lambda: raw_queries(pool, START_DATE, END_DATE), args.repeat)
+            rollups = best_of(lambda: rollup_queries(pool, START_DATE, END_DATE), args.repeat)
+            snapshot = best_of(lambda: engine.compute(START_DATE, END_DATE), args.repeat)
+            print(f"{size:>10,} {raw * 1000:>14.1f} ms {rollups * 1000:>17.1f} ms {snapshot * 1000:>7.1f} ms")
+            pool.close()
+
+
+if __name__ == "__main__":
+    main()
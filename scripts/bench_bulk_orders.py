@@ -0,0 +1,78 @@
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+
+# Allow importing from project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.db_pool import ConnectionPool
+from utils.migrations import run_migrations
+from utils.order_store import insert_order, save_orders_bulk
+
+
+def generate_orders(count, seed=7, invalid_every=0):
+    """
+    Yields synthetic order dicts; every `invalid_every`-th one is malformed on purpose.
+    """
+    rng = random.Random(seed)
+    start = datetime.datetime(2025, 1, 1, 11, 0, 0)
+    for i in range(count):
+        items = []
+        for _ in range(rng.randint(1, 5)):
+            qty = rng.randint(1, 3)
+            items.append({"item_id": rng.randint(1, 100), "qty": qty, "total": round(qty * rng.choice([50.0, 120.0, 380.0]) * 1.05, 2)})
+        order = {
+            "mode": rng.choice(["Dine-In", "Takeaway"]),
+            "payment": rng.choice(["Cash", "Card", "UPI"]),
+            "timestamp": (start + datetime.timedelta(minutes=7 * i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "total": round(sum(item["total"] for item in items), 2),
+            "items": items,
+        }
+        if invalid_every and i % invalid_every == invalid_every - 1:
+            order["items"] = []
+        yield order
+
+
+def fresh_pool(directory, name):
+    pool = ConnectionPool(os.path.join(directory, name))
+    with pool.connection() as conn:
+        run_migrations(conn)
+    return pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-order commits vs save_orders_bulk.")
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--single-orders", type=int, default=5_000,
+                        help="Orders saved one commit at a time (slow; the rate is extrapolated).")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = fresh_pool(tmp, "single.db")
+        n = min(args.single_orders, args.orders)
+        started = datetime.datetime.now()
+        for order in list(generate_orders(n)):
+            with pool.transaction() as conn:
+                insert_order(conn, order)
+        single_seconds = (datetime.datetime.now() - started).total_seconds()
+        pool.close()
+
+        pool = fresh_pool(tmp, "bulk.db")
+        orders = list(generate_orders(args.orders, invalid_every=1000))
+        result = save_orders_bulk(orders, batch_size=args.batch_size, pool=pool)
+        with pool.connection() as conn:
+            line_items = conn.execute("SELECT COUNT(*) FROM order_items").fetchone()[0]
+        pool.close()
+
+    print(f"Per-order commits: {n:,} orders in {single_seconds:.2f} s ({n / single_seconds:,.0f} orders/s)")
+    print(f"Bulk (batch {args.batch_size}): {result.inserted:,} orders, {line_items:,} line items in "
+          f"{result.seconds:.2f} s ({result.inserted / result.seconds:,.0f} orders/s, "
+          f"{line_items / result.seconds:,.0f} rows/s)")
+    print(f"Rejected rows: {len(result.errors)} (first: {result.errors[0] if result.errors else None})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, current, threshold, stat="median"):
+    """
+    Pairs up the benchmarks present in both reports.
+
+    Returns:
+        list: (name, baseline seconds, current seconds, ratio, verdict) per benchmark,
+              verdict being "slower", "faster" or "" when within `threshold`.
+    """
+    rows = []
+    for name, result in current["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            continue
+        ratio = result[stat] / before[stat] if before[stat] else float("inf")
+        verdict = "slower" if ratio > 1 + threshold else "faster" if ratio < 1 - threshold else ""
+        rows.append((name, before[stat], result[stat], ratio, verdict))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare two bench_suite.py reports; exits 1 if any benchmark regressed past the threshold.")
+    parser.add_argument("baseline", help="Report from the reference run.")
+    parser.add_argument("current", help="Report from the run under test.")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Relative change treated as noise (0.15 = 15%%).")
+    parser.add_argument("--stat", choices=("min", "median", "mean"), default="median")
+    args = parser.parse_args()
+
+    baseline, current = load(args.baseline), load(args.current)
+    for label, report in (("baseline", baseline), ("current", current)):
+        meta = report["meta"]
+        print(f"{label:>8}: {meta.get('revision') or '?'} ({meta['created']}, Python {meta['python']}, {meta['cpus']} CPUs)")
+    if baseline["meta"].get("platform") != current["meta"].get("platform"):
+        print("warning: the reports come from different platforms")
+
+    rows = compare(baseline, current, args.threshold, args.stat)
+    print(f"\n{'benchmark':<52} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, before, after, ratio, verdict in rows:
+        print(f"{name:<52} {before * 1e6:>9,.1f} µs {after * 1e6:>9,.1f} µs {ratio - 1:>+7.0%} {verdict}")
+    missing = sorted(set(baseline["benchmarks"]) ^ set(current["benchmarks"]))
+    if missing:
+        print(f"\nOnly in one report: {', '.join(missing)}")
+
+    regressions = [row for row in rows if row[4] == "slower"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
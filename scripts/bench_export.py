@@ -0,0 +1,91 @@
+import argparse
+import datetime
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+# Allow importing from project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from bench_bulk_orders import fresh_pool, generate_orders
+from utils.db_pool import ConnectionPool
+from utils.order_export import EXPORT_COLUMNS, write_order_history_xlsx
+from utils.order_history import iter_history_rows
+from utils.order_store import save_orders_bulk
+
+START_DATE = datetime.date(2000, 1, 1)
+END_DATE = datetime.date(2100, 1, 1)
+
+
+def seed(db_dir, line_items):
+    """
+    Bulk-loads synthetic orders until the database holds at least `line_items` lines.
+    """
+    pool = fresh_pool(db_dir, "export.db")
+    # generate_orders averages 3 lines per order.
+    save_orders_bulk(generate_orders(line_items // 3 + 1), batch_size=5000, pool=pool)
+    with pool.connection() as conn:
+        lines = conn.execute("SELECT COUNT(*) FROM order_items").fetchone()[0]
+    pool.close()
+    return lines
+
+
+def run_export(db_path, mode, out_path):
+    """
+    Runs one export in this process and prints "<seconds> <peak RSS in MB>".
+    """
+    pool = ConnectionPool(db_path)
+    started = time.perf_counter()
+    if mode == "stream":
+        write_order_history_xlsx(out_path, START_DATE, END_DATE, pool=pool)
+    else:
+        # The previous approach: every row in a DataFrame, the workbook built in memory.
+        import io
+
+        import pandas as pd
+        df = pd.DataFrame(list(iter_history_rows(START_DATE, END_DATE, pool=pool)), columns=EXPORT_COLUMNS)
+        output = io.BytesIO()
+        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+            df.to_excel(writer, sheet_name="Order History", index=False)
+        with open(out_path, "wb") as f:
+            f.write(output.getvalue())
+    seconds = time.perf_counter() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    print(f"{seconds} {peak_mb}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming Excel export against the DataFrame export.")
+    parser.add_argument("--lines", type=int, default=1_000_000, help="Line items to export.")
+    parser.add_argument("--skip-dataframe", action="store_true", help="Only run the streaming export.")
+    parser.add_argument("--child", nargs=3, metavar=("DB", "MODE", "OUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_export(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        lines = seed(tmp, args.lines)
+        print(f"Seeded {lines:,} line items in {time.perf_counter() - started:.1f} s")
+
+        modes = ["stream"] if args.skip_dataframe else ["stream", "dataframe"]
+        for mode in modes:
+            # Each export runs in a fresh process so peak RSS is measured independently.
+            out_path = os.path.join(tmp, f"{mode}.xlsx")
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", os.path.join(tmp, "export.db"), mode, out_path],
+                check=True, capture_output=True, text=True
+            )
+            seconds, peak_mb = map(float, result.stdout.split()[-2:])
+            size_mb = os.path.getsize(out_path) / 1024 / 1024
+            print(f"{mode:>9}: {seconds:.1f} s, peak RSS {peak_mb:,.0f} MB, "
+                  f"{lines / seconds:,.0f} rows/s, file {size_mb:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
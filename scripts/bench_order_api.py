@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Allow importing from project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from bench_analytics import seed
+
+# (name, share of requests)
+MIX = (("POST /orders", 0.4), ("GET /orders/<id>", 0.3), ("GET /menu", 0.2), ("GET /analytics", 0.1))
+
+
+class Connection:
+    """
+    One keep-alive HTTP/1.1 connection to the API.
+    """
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+
+async def load(host, port, rate, seconds, connections, today):
+    rng = random.Random(7)
+    conns = [Connection(host, port) for _ in range(connections)]
+    idle = asyncio.Queue()
+    for conn in conns:
+        idle.put_nowait(conn)
+    order_ids = [1]
+    samples = {name: [] for name, _ in MIX}
+    errors = {name: 0 for name, _ in MIX}
+
+    async def one(name, scheduled):
+        conn = await idle.get()
+        try:
+            if name == "POST /orders":
+                order = {"mode": "Takeaway", "payment": "Card",
+                         "items": [{"item_id": rng.randint(1, 100), "qty": rng.randint(1, 3)} for _ in range(rng.randint(1, 4))]}
+                status, body = await conn.request("POST", "/orders", order)
+                if status == 201:
+                    order_ids.append(body["order_id"])
+            elif name == "GET /orders/<id>":
+                status, _ = await conn.request("GET", f"/orders/{rng.choice(order_ids)}")
+            elif name == "GET /menu":
+                status, _ = await conn.request("GET", "/menu")
+            else:
+                status, _ = await conn.request("GET", f"/analytics?start={today}&end={today}")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            conn.reader = conn.writer = None
+            status = 0
+        finally:
+            idle.put_nowait(conn)
+        # Latency from the scheduled send time, so queueing behind a slow server counts (open loop).
+        samples[name].append(time.perf_counter() - scheduled)
+        if status >= 400 or status == 0:
+            errors[name] += 1
+
+    names, weights = zip(*MIX)
+    tasks = []
+    started = time.perf_counter()
+    for i in range(int(rate * seconds)):
+        scheduled = started + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(rng.choices(names, weights)[0], scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    for conn in conns:
+        if conn.writer is not None:
+            conn.writer.close()
+    return samples, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load test of the JSON order API with p50/p99 latency.")
+    parser.add_argument("--url", help="host:port of a running server (default: start one on a seeded temp database).")
+    parser.add_argument("--rate", type=float, nargs="+", default=[100, 300, 500], help="Requests per second to offer.")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of each run.")
+    parser.add_argument("--connections", type=int, default=32, help="Keep-alive connections to spread requests over.")
+    parser.add_argument("--seed-orders", type=int, default=10_000, help="Orders in the temp database.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        if args.url:
+            host, _, port = args.url.rpartition(":")
+        else:
+            pool = seed(tmp, args.seed_orders)
+            pool.close()
+            server = subprocess.Popen(
+                [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "order_api_server.py"),
+                 "--db", os.path.join(tmp, f"analytics_{args.seed_orders}.db"), "--port", "0"],
+                stdout=subprocess.PIPE, text=True
+            )
+            host, _, port = server.stdout.readline().strip().rpartition("//")[2].rpartition(":")
+        try:
+            today = datetime.date.today().isoformat()
+            print(f"{'offered':>8} {'achieved':>9}  {'endpoint':<18} {'count':>6} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+            for rate in args.rate:
+                samples, errors, elapsed = asyncio.run(load(host, int(port), rate, args.seconds, args.connections, today))
+                achieved = sum(len(s) for s in samples.values()) / elapsed
+                everything = [latency for s in samples.values() for latency in s]
+                rows = [(name, samples[name], errors[name]) for name, _ in MIX] + [("all", everything, sum(errors.values()))]
+                for i, (name, latencies, failed) in enumerate(rows):
+                    if len(latencies) < 2:
+                        continue
+                    p99 = statistics.quantiles(latencies, n=100)[98]
+                    prefix = f"{rate:>8.0f} {achieved:>9.0f}" if i == 0 else " " * 18
+                    print(f"{prefix}  {name:<18} {len(latencies):>6} {statistics.median(latencies) * 1000:>8.1f} "
+                          f"{p99 * 1000:>8.1f} {failed:>7}")
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
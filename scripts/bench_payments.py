@@ -0,0 +1,53 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Allow importing from project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.payments import FINAL_STATES, PaymentQueue, SimulatedGateway
+
+
+def run(payments, workers, latency, decline_rate, error_rate):
+    queue = PaymentQueue(SimulatedGateway(latency, decline_rate, error_rate, seed=7), workers=workers)
+    started = time.perf_counter()
+    submit_times = []
+    ids = []
+    for i in range(payments):
+        t = time.perf_counter()
+        ids.append(queue.submit("Card" if i % 2 else "UPI", 10_000 + i))
+        submit_times.append(time.perf_counter() - t)
+    statuses = [queue.wait(payment_id) for payment_id in ids]
+    elapsed = time.perf_counter() - started
+    queue.close()
+    assert all(status.state in FINAL_STATES for status in statuses)
+    latencies = sorted(status.finished_at - status.submitted_at for status in statuses)
+    return elapsed, submit_times, latencies, queue.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent simulated payments through PaymentQueue.")
+    parser.add_argument("--payments", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--latency", type=float, nargs=2, default=[0.05, 0.2], metavar=("MIN", "MAX"),
+                        help="Simulated gateway latency range in seconds.")
+    parser.add_argument("--decline-rate", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'payments/s':>11} {'submit p99':>11} {'p50':>8} {'p99':>8} "
+          f"{'approved':>9} {'declined':>9} {'failed':>7}")
+    for workers in args.workers:
+        payments = min(args.payments, workers * 50)  # keep the single-worker run short
+        elapsed, submit_times, latencies, stats = run(payments, workers, tuple(args.latency),
+                                                      args.decline_rate, args.error_rate)
+        submit_p99 = statistics.quantiles(submit_times, n=100)[98]
+        p50 = statistics.median(latencies)
+        p99 = statistics.quantiles(latencies, n=100)[98]
+        print(f"{workers:>8} {payments / elapsed:>11,.0f} {submit_p99 * 1e6:>8.0f} µs {p50:>7.2f}s {p99:>7.2f}s "
+              f"{stats['approved']:>9} {stats['declined']:>9} {stats['failed']:>7}")
+
+
+if __name__ == "__main__":
+    main()
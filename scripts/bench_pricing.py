@@ -0,0 +1,61 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Allow importing from project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.calculator import calculate_item_total, calculate_order_summary, price_orders
+
+
+def make_lines(num_lines, lines_per_order, seed=42):
+    rng = np.random.default_rng(seed)
+    prices = rng.choice([30.0, 55.0, 80.0, 120.0, 250.0, 340.0, 450.0], size=num_lines)
+    gsts = rng.choice([0.0, 5.0, 12.0, 18.0], size=num_lines)
+    qtys = rng.integers(1, 5, size=num_lines)
+    order_index = np.arange(num_lines) // lines_per_order
+    return prices, gsts, qtys, order_index
+
+
+def bench_scalar(prices, gsts, qtys, order_index, lines_per_order):
+    started = time.perf_counter()
+    for start in range(0, len(prices), lines_per_order):
+        items = []
+        for i in range(start, min(start + lines_per_order, len(prices))):
+            _, _, item_total = calculate_item_total(float(prices[i]), float(gsts[i]), int(qtys[i]))
+            items.append({"total": item_total})
+        calculate_order_summary(items, 10.0, 5.0)
+    return time.perf_counter() - started
+
+
+def bench_vectorized(prices, gsts, qtys, order_index):
+    started = time.perf_counter()
+    price_orders(prices, gsts, qtys, order_index, discount_pct=10.0, tip_pct=5.0)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scalar vs vectorized order pricing.")
+    parser.add_argument("--lines", type=int, default=1_000_000, help="Number of line items to price.")
+    parser.add_argument("--lines-per-order", type=int, default=4)
+    parser.add_argument("--scalar-lines", type=int, default=100_000,
+                        help="Lines priced through the scalar API (it is slow; the rate is extrapolated).")
+    args = parser.parse_args()
+
+    prices, gsts, qtys, order_index = make_lines(args.lines, args.lines_per_order)
+
+    vec_time = min(bench_vectorized(prices, gsts, qtys, order_index) for _ in range(3))
+    n = min(args.scalar_lines, args.lines)
+    scalar_time = bench_scalar(prices[:n], gsts[:n], qtys[:n], order_index[:n], args.lines_per_order)
+
+    print(f"Vectorized: {args.lines:,} lines in {vec_time * 1000:.1f} ms "
+          f"({args.lines / vec_time:,.0f} lines/s)")
+    print(f"Scalar:     {n:,} lines in {scalar_time * 1000:.1f} ms "
+          f"({n / scalar_time:,.0f} lines/s)")
+    print(f"Speedup:    {(args.lines / vec_time) / (n / scalar_time):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
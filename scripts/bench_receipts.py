@@ -0,0 +1,82 @@
+import argparse
+import datetime
+import os
+import sys
+import time
+
+# Allow importing from project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.pdf_generator import ReceiptRenderer, _receipt_template, generate_pdf_bill
+from utils.thermal_receipt import render_escpos_receipt, render_text_receipt
+
+ORDER_TIME = datetime.datetime(2025, 1, 1, 12, 0, 0)
+
+
+def make_bill(num_items):
+    items = [
+        {"item": f"Item {i}", "qty": 1 + i % 3, "price": 80.0 + i, "total": round((1 + i % 3) * (80.0 + i) * 1.05, 2)}
+        for i in range(num_items)
+    ]
+    subtotal = sum(item["price"] * item["qty"] for item in items)
+    gst = sum(item["total"] for item in items) - subtotal
+    return dict(order_items=items, subtotal=subtotal, gst=gst, discount=0.0, total=subtotal + gst,
+                payment_method="Cash", mode="Dine-In", order_time=ORDER_TIME)
+
+
+def make_receipt(num_items):
+    # The same order as make_bill, shaped like order_history.get_receipt.
+    items = [
+        {"item_id": i, "item_name": f"Item {i}", "qty": 1 + i % 3, "unit_price_paise": 8000 + 100 * i,
+         "gst_bp": 500, "gst_paise": round((1 + i % 3) * (8000 + 100 * i) * 0.05)}
+        for i in range(num_items)
+    ]
+    for item in items:
+        item["total_paise"] = item["qty"] * item["unit_price_paise"] + item["gst_paise"]
+    total = sum(item["total_paise"] for item in items)
+    return {"order_id": 1, "mode": "Dine-In", "payment": "Cash", "timestamp": ORDER_TIME.strftime("%Y-%m-%d %H:%M:%S"),
+            "total_paise": total, "subtotal_paise": total, "discount_paise": 0, "tip_paise": 0, "items": items}
+
+
+def rate(func, seconds):
+    count, started = 0, time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        func(count)
+        count += 1
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Receipts per second: cold styles, shared styles and memoized PDFs, and thermal text / ESC/POS.")
+    parser.add_argument("--items", type=int, default=6, help="Line items per receipt.")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Time spent on each measurement.")
+    args = parser.parse_args()
+    bill = make_bill(args.items)
+    receipt = make_receipt(args.items)
+
+    def cold(i):
+        # What every call paid before: styles and static flowables rebuilt from scratch.
+        _receipt_template.cache_clear()
+        generate_pdf_bill(order_id=i, **bill)
+
+    def shared(i):
+        generate_pdf_bill(order_id=i, **bill)
+
+    renderer = ReceiptRenderer()
+    renderer.render(1, 0, **bill)
+
+    def memoized(i):
+        # A success screen rerunning: same order, same data version.
+        renderer.render(1, 0, **bill)
+
+    results = [("rebuild styles per call", rate(cold, args.seconds)),
+               ("shared styles", rate(shared, args.seconds)),
+               ("memoized (rerun / re-download)", rate(memoized, args.seconds)),
+               ("thermal text", rate(lambda i: render_text_receipt(receipt), args.seconds)),
+               ("thermal ESC/POS", rate(lambda i: render_escpos_receipt(receipt), args.seconds))]
+    for label, per_second in results:
+        print(f"{label:>32}: {per_second:>12,.0f} receipts/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+
+# Allow importing from project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from bench_analytics import seed
+from utils.receipt_batch import reprint_receipts
+
+START_DATE = datetime.date(2000, 1, 1)
+END_DATE = datetime.date(2100, 1, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Receipt reprint throughput by worker count.")
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--format", choices=("zip", "pdf"), default="zip")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = seed(tmp, args.orders)
+        print(f"{'workers':>8} {'seconds':>9} {'receipts/s':>11} {'speedup':>8}")
+        baseline = None
+        for workers in sorted(set(args.workers)):
+            result = reprint_receipts(START_DATE, END_DATE, os.path.join(tmp, f"out_{workers}.{args.format}"),
+                                      fmt=args.format, workers=workers, pool=pool)
+            baseline = baseline or result.seconds
+            print(f"{workers:>8} {result.seconds:>9.2f} {result.receipts / result.seconds:>11,.0f} "
+                  f"{baseline / result.seconds:>7.2f}x")
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
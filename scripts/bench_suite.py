@@ -0,0 +1,189 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Allow importing from project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from bench_analytics import seed
+from bench_bulk_orders import generate_orders
+from utils.analytics import AnalyticsSnapshot, get_analytics
+from utils.calculator import calculate_item_total, calculate_order_summary
+from utils.db_writer import DbWriter
+from utils.order_export import export_order_csv
+from utils.order_history import count_orders, get_history_page, get_receipt
+from utils.pdf_generator import generate_pdf_bill, receipt_bill
+
+# Microbenchmarks for the hot paths of the order page, order history and the dashboard,
+# run against a throwaway database seeded with --orders orders. Each case calls the same
+# utils function the page does, pointed at the seeded pool. get_analytics is measured as
+# the dashboard calls it (cached, so a rerun with no new orders) and uncached through
+# AnalyticsSnapshot.
+#
+# Results go to a JSON file; compare two runs with scripts/bench_compare.py.
+
+ITEMS = [{"price": 80.0 + i, "gst": 5.0, "qty": 1 + i % 3} for i in range(5)]
+
+
+def measure(func, repeat, min_time):
+    """
+    Times `func` in `repeat` samples of enough calls to take about `min_time` seconds each.
+
+    Returns:
+        dict: Seconds per call (min, median, mean, stdev) and the calls behind them.
+    """
+    calls = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(calls):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / 10 or calls >= 1 << 20:
+            break
+        calls *= 10
+    calls = max(1, int(calls * min_time / max(elapsed, 1e-9)))
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(calls):
+            func()
+        samples.append((time.perf_counter() - started) / calls)
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "calls": calls,
+        "repeat": repeat,
+    }
+
+
+# ----------------- Cases -----------------
+def calculator_cases():
+    def item_total():
+        for item in ITEMS:
+            calculate_item_total(item["price"], item["gst"], item["qty"])
+
+    def order_summary():
+        calculate_order_summary([{"total": calculate_item_total(**item)[2]} for item in ITEMS], 10.0, 5.0)
+
+    return {
+        "calculator.calculate_item_total[5 items]": item_total,
+        "calculator.calculate_order_summary[5 items]": order_summary,
+    }
+
+
+def database_cases(pool):
+    """
+    Returns ({name: callable}, writer) for the cases that read or write the seeded
+    database; close the writer when done.
+    """
+    with pool.connection() as conn:
+        first_day, last_day, order_id = conn.execute(
+            "SELECT MIN(business_date), MAX(business_date), MAX(order_id) FROM orders"
+        ).fetchone()
+    first_day, last_day = datetime.date.fromisoformat(first_day), datetime.date.fromisoformat(last_day)
+    week = (max(first_day, last_day - datetime.timedelta(days=6)), last_day)
+    everything = (first_day, last_day)
+    receipt = get_receipt(order_id, pool=pool)
+    # The cursor of a page deep in the full range, to show keyset pages stay flat.
+    deep_cursor = None
+    for _ in range(40):
+        page = get_history_page(*everything, cursor=deep_cursor, pool=pool)
+        if page.next_cursor is None:
+            break
+        deep_cursor = page.next_cursor
+    writer = DbWriter(pool)
+    new_orders = generate_orders(10 ** 9, seed=11)
+
+    def save_order_to_db():
+        # What the order page's save_order_to_db does: one order through the writer thread.
+        order = next(new_orders)
+        order["timestamp"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        writer.insert_order(order).result()
+
+    cases = {
+        "history.get_history_page[first]": lambda: get_history_page(*everything, pool=pool),
+        "history.get_history_page[page 40]": lambda: get_history_page(*everything, cursor=deep_cursor, pool=pool),
+        "history.count_orders[all]": lambda: count_orders(*everything, pool=pool),
+        "analytics.get_analytics[7 days]": lambda: get_analytics(*week, pool=pool),
+        "analytics.get_analytics[all]": lambda: get_analytics(*everything, pool=pool),
+        "analytics.snapshot[7 days]": lambda: AnalyticsSnapshot(pool).compute(*week),
+        "analytics.snapshot[all]": lambda: AnalyticsSnapshot(pool).compute(*everything),
+        "export.export_order_csv": lambda: export_order_csv(order_id, pool=pool),
+        "pdf.generate_pdf_bill": lambda: generate_pdf_bill(order_id, **receipt_bill(receipt)),
+        # Last, so the orders it adds do not skew the read cases.
+        "db.save_order_to_db": save_order_to_db,
+    }
+    return cases, writer
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the microbenchmark suite and save the results as JSON.")
+    parser.add_argument("--orders", type=int, nargs="+", default=[10_000], help="Seeded database sizes to run at.")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per benchmark.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per sample.")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this.")
+    parser.add_argument("--out", default=None, help="JSON file to write (default: bench_<revision>_<time>.json).")
+    args = parser.parse_args()
+
+    results = {}
+
+    def run(name, func):
+        if args.filter not in name:
+            return
+        results[name] = measure(func, args.repeat, args.min_time)
+        print(f"{name:<52} {results[name]['median'] * 1e6:>12,.1f} µs")
+
+    for name, func in calculator_cases().items():
+        run(name, func)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.orders:
+            print(f"Seeding {size:,} orders...")
+            pool = seed(tmp, size)
+            cases, writer = database_cases(pool)
+            try:
+                for name, func in cases.items():
+                    run(f"{name}@{size}", func)
+            finally:
+                writer.close()
+                pool.close()
+
+    revision = git_revision()
+    report = {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "revision": revision,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "orders": args.orders,
+            "repeat": args.repeat,
+            "min_time": args.min_time,
+        },
+        "benchmarks": results,
+    }
+    out = args.out or f"bench_{revision or 'local'}_{datetime.datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# Allow importing from project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from bench_bulk_orders import fresh_pool, generate_orders
+from utils.db_writer import DbWriter
+from utils.order_store import insert_order
+
+
+def run_sessions(sessions, orders, save):
+    """
+    Runs `sessions` threads that each save their share of `orders` one at a time, like
+    cashiers at the lunch rush. Returns (seconds, lock errors).
+    """
+    errors = [0]
+    lock = threading.Lock()
+
+    def cashier(share):
+        for order in share:
+            try:
+                save(order)
+            except sqlite3.OperationalError:
+                with lock:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=cashier, args=(orders[i::sessions],)) for i in range(sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent order saves: one transaction per session vs the single writer.")
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16, 32])
+    args = parser.parse_args()
+    orders = list(generate_orders(args.orders))
+
+    print(f"{'sessions':>8} {'per-session tx':>15} {'lock errors':>12} {'writer':>10} {'avg batch':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for sessions in args.sessions:
+            direct_pool = fresh_pool(tmp, f"direct_{sessions}.db")
+            writer_pool = fresh_pool(tmp, f"writer_{sessions}.db")
+            # Enough connections that sessions contend on SQLite's write lock, not on the pool.
+            direct_pool.max_connections = max(sessions + 1, direct_pool.max_connections)
+
+            def direct(order):
+                with direct_pool.transaction() as conn:
+                    insert_order(conn, order)
+
+            direct_seconds, lock_errors = run_sessions(sessions, orders, direct)
+
+            writer = DbWriter(writer_pool)
+            writer_seconds, _ = run_sessions(sessions, orders, lambda order: writer.insert_order(order).result())
+            stats = writer.stats()
+            writer.close()
+
+            print(f"{sessions:>8} {len(orders) / direct_seconds:>10,.0f} /s {lock_errors:>12} "
+                  f"{len(orders) / writer_seconds:>7,.0f} /s {stats['avg_batch']:>10.1f}")
+            direct_pool.close()
+            writer_pool.close()
+
+
+if __name__ == "__main__":
+    main()
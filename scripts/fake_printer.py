@@ -0,0 +1,44 @@
+import argparse
+import os
+import socketserver
+import sys
+
+# Allow importing from project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.thermal_receipt import RUPEE_CODE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="A raw-port (9100) thermal printer stand-in that saves each job it receives.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--out", default="printed", help="Directory the jobs are written to.")
+    parser.add_argument("--echo", action="store_true", help="Also print each job's text, without ESC/POS commands.")
+    args = parser.parse_args()
+    os.makedirs(args.out, exist_ok=True)
+
+    class JobHandler(socketserver.StreamRequestHandler):
+        jobs = 0
+
+        def handle(self):
+            data = self.rfile.read()
+            JobHandler.jobs += 1
+            path = os.path.join(args.out, f"job_{JobHandler.jobs:05d}.prn")
+            with open(path, "wb") as f:
+                f.write(data)
+            print(f"{path}: {len(data):,} bytes from {self.client_address[0]}")
+            if args.echo:
+                # Drop control sequences crudely: keep printable text and newlines only.
+                text = data.decode("cp437", errors="replace").replace(chr(RUPEE_CODE), "₹")
+                print("".join(ch for ch in text if ch == "\n" or ch.isprintable()))
+
+    with socketserver.ThreadingTCPServer((args.host, args.port), JobHandler) as server:
+        print(f"Listening on tcp://{args.host}:{args.port}; point a terminal's printer there.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
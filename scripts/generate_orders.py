@@ -0,0 +1,267 @@
+import argparse
+import datetime
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+# Allow importing from project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.business_day import BUSINESS_DAY_CUTOFF_HOURS, to_epoch
+from utils.data_cache import bump_data_version
+from utils.db_pool import DB_PATH, get_pool
+from utils.migrations import bootstrap_schema
+from utils.money import price_lines_paise, rate_to_bp, round_div, to_paise_array
+from utils.order_store import insert_order_rows
+from utils.rollups import clear_rollups, rebuild_rollups
+
+# Synthetic order history for load testing: a seeded generator that writes straight into
+# the database through order_store.insert_order_rows, then rebuilds the rollups for the
+# generated days in one pass. The same seed and arguments always produce the same menu
+# and orders.
+
+# category: (lowest price, highest price, dishes). Price bands follow data/menu.csv.
+CATEGORIES = {
+    "Main Course (Veg)": (200, 350, ("Paneer Masala", "Dal Makhani", "Malai Kofta", "Mix Vegetable", "Chana Masala")),
+    "Main Course (Non-Veg)": (250, 480, ("Butter Chicken", "Rogan Josh", "Fish Curry", "Chicken Korma", "Egg Curry")),
+    "Rice Dish (Veg)": (100, 330, ("Veg Biryani", "Jeera Rice", "Pulao", "Curd Rice")),
+    "Rice Dish (Non-Veg)": (320, 480, ("Chicken Biryani", "Mutton Biryani", "Egg Biryani")),
+    "Tandoor & Grills": (280, 350, ("Tikka", "Seekh Kebab", "Tangri Kebab", "Malai Tikka")),
+    "Bread": (30, 90, ("Naan", "Roti", "Kulcha", "Paratha")),
+    "South Indian": (90, 160, ("Dosa", "Idli", "Uttapam", "Vada")),
+    "Street Food": (65, 160, ("Pani Puri", "Pav Bhaji", "Chaat", "Vada Pav")),
+    "Soup": (120, 150, ("Tomato Shorba", "Sweet Corn Soup", "Manchow Soup")),
+    "Dessert": (90, 140, ("Gulab Jamun", "Rasmalai", "Kulfi", "Gajar Halwa")),
+    "Beverage": (20, 100, ("Lassi", "Masala Chai", "Cold Coffee", "Lime Soda", "Buttermilk")),
+}
+STYLES = ("Classic", "Home-Style", "Spicy", "Smoky", "Royal", "Chef's Special", "Amritsari", "Hyderabadi",
+          "Punjabi", "Kerala", "Tandoori", "Jain")
+MENU_GST = 5.0
+
+# Monday first. Weekends are the busiest days.
+WEEKDAY_WEIGHTS = np.array([0.80, 0.78, 0.85, 0.92, 1.15, 1.40, 1.30])
+# Demand peaks around the festive season (mid-November) and dips in the monsoon.
+SEASON_PEAK_DAY, SEASON_AMPLITUDE = 320, 0.15
+# Minutes after midnight: lunch, evening snacks and dinner as (weight, mean, sd).
+RUSHES = ((0.40, 13 * 60 + 30, 45), (0.12, 17 * 60 + 30, 50), (0.48, 20 * 60 + 45, 70))
+OPEN_MINUTE, CLOSE_MINUTE = 11 * 60, 24 * 60 + 45
+MODES, MODE_WEIGHTS = ("Dine-In", "Takeaway"), (0.62, 0.38)
+PAYMENTS, PAYMENT_WEIGHTS = ("UPI", "Card", "Cash"), (0.55, 0.25, 0.20)
+# Extra dishes per order beyond the first (Poisson mean), by mode.
+EXTRA_ITEMS = {"Dine-In": 2.2, "Takeaway": 1.0}
+MAX_ITEMS = 10
+QTYS, QTY_WEIGHTS = (1, 2, 3), (0.78, 0.17, 0.05)
+DISCOUNTS, DISCOUNT_WEIGHTS = (0, 5, 10, 15), (0.85, 0.05, 0.07, 0.03)
+TIPS, TIP_WEIGHTS = (0, 5, 10), (0.70, 0.20, 0.10)  # dine-in only
+
+# Late orders (up to CLOSE_MINUTE) still belong to the day the service started.
+assert CLOSE_MINUTE < (24 + BUSINESS_DAY_CUTOFF_HOURS) * 60
+
+# "HH:MM:SS" for every second of a day; cheaper than strftime per order.
+CLOCK = [f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}" for second in range(86400)]
+
+
+def generate_menu(count, rng, first_id=1, taken=()):
+    """
+    Returns `count` menu rows (item_id, item_name, category, price, gst) spread across
+    CATEGORIES, with names unique among themselves and `taken`.
+    """
+    categories = list(CATEGORIES)
+    used = set(taken)
+    rows = []
+    for i in range(count):
+        category = categories[i % len(categories)]
+        low, high, dishes = CATEGORIES[category]
+        name = f"{STYLES[rng.integers(len(STYLES))]} {dishes[rng.integers(len(dishes))]}"
+        if name in used:
+            name = f"{name} ({first_id + i})"
+        used.add(name)
+        price = float(round(rng.uniform(low, high) / 5) * 5)
+        rows.append((first_id + i, name, category, price, MENU_GST))
+    return rows
+
+
+def daily_order_counts(start, end, num_orders, growth, rng):
+    """
+    Splits `num_orders` across the days from start to end, weighted by weekday, season
+    and year-on-year `growth`, with some day-to-day noise.
+    """
+    days = (end - start).days + 1
+    day_numbers = np.arange(days)
+    weekdays = (start.weekday() + day_numbers) % 7
+    day_of_year = np.array([(start + datetime.timedelta(days=int(d))).timetuple().tm_yday for d in day_numbers])
+    weights = (
+        WEEKDAY_WEIGHTS[weekdays]
+        * (1 + SEASON_AMPLITUDE * np.cos(2 * math.pi * (day_of_year - SEASON_PEAK_DAY) / 365.25))
+        * (1 + growth) ** (day_numbers / 365.25)
+        * rng.lognormal(0, 0.1, size=days)
+    )
+    return rng.multinomial(num_orders, weights / weights.sum())
+
+
+def times_of_day(count, rng):
+    """
+    Returns `count` sorted order times as seconds after the business day's midnight.
+    """
+    weights, means, sds = zip(*RUSHES)
+    rush = rng.choice(len(RUSHES), size=count, p=weights)
+    minutes = rng.normal(np.array(means)[rush], np.array(sds)[rush])
+    outside = (minutes < OPEN_MINUTE) | (minutes >= CLOSE_MINUTE)
+    minutes[outside] = rng.uniform(OPEN_MINUTE, CLOSE_MINUTE, size=int(outside.sum()))
+    return np.sort((minutes * 60).astype(np.int64))
+
+
+def generate_day(day, count, menu, popularity, rng):
+    """
+    Returns one business day's orders as (order_row, item_rows) pairs laid out as
+    order_store.ORDER_ROW and ITEM_ROW, oldest first.
+    """
+    item_ids, names, categories, prices_paise, gst_bp = menu
+    seconds = times_of_day(count, rng)
+    modes = rng.choice(len(MODES), size=count, p=MODE_WEIGHTS)
+    payments = rng.choice(len(PAYMENTS), size=count, p=PAYMENT_WEIGHTS)
+    extra = np.array([EXTRA_ITEMS[mode] for mode in MODES])[modes]
+    sizes = np.minimum(1 + rng.poisson(extra), MAX_ITEMS)
+
+    # Draw lines by popularity, then merge repeats of a dish within an order into its qty.
+    order_index = np.repeat(np.arange(count), sizes)
+    picks = rng.choice(len(item_ids), size=len(order_index), p=popularity)
+    qtys = rng.choice(QTYS, size=len(order_index), p=QTY_WEIGHTS)
+    keys, inverse = np.unique(order_index * len(item_ids) + picks, return_inverse=True)
+    order_index, picks = keys // len(item_ids), keys % len(item_ids)
+    qtys = np.bincount(inverse, weights=qtys).astype(np.int64)
+
+    _, line_gst, line_total = price_lines_paise(prices_paise[picks], gst_bp[picks], qtys)
+    starts = np.searchsorted(order_index, np.arange(count))
+    subtotals = np.add.reduceat(line_total, starts)
+    discount_bp = np.array(DISCOUNTS)[rng.choice(len(DISCOUNTS), size=count, p=DISCOUNT_WEIGHTS)] * 100
+    tip_bp = np.where(modes == 0, np.array(TIPS)[rng.choice(len(TIPS), size=count, p=TIP_WEIGHTS)], 0) * 100
+    # Same arithmetic as money.settle, for a whole day at once.
+    discounts = round_div(subtotals * discount_bp, 10000)
+    tips = round_div((subtotals - discounts) * tip_bp, 10000)
+    totals = subtotals - discounts + tips
+    txn_suffixes = rng.integers(0, 1 << 16, size=count)
+
+    base_epoch = to_epoch(datetime.datetime.combine(day, datetime.time()))
+    dates = (day.isoformat(), (day + datetime.timedelta(days=1)).isoformat())
+    compact = tuple(date.replace("-", "") for date in dates)
+    ends = np.append(starts[1:], len(picks))
+    line_items = list(zip(picks.tolist(), qtys.tolist(), line_total.tolist(), line_gst.tolist()))
+    rows = []
+    for i, (second, mode, payment, start, end, subtotal, discount, tip, total, suffix) in enumerate(zip(
+        seconds.tolist(), modes.tolist(), payments.tolist(), starts.tolist(), ends.tolist(), subtotals.tolist(),
+        discounts.tolist(), tips.tolist(), totals.tolist(), txn_suffixes.tolist()
+    )):
+        next_day, clock = divmod(second, 86400)
+        timestamp = f"{dates[next_day]} {CLOCK[clock]}"
+        txn_id = None
+        if PAYMENTS[payment] == "UPI":
+            txn_id = f"TXN{compact[next_day]}{CLOCK[clock].replace(':', '')}{i % 1000000:06d}{suffix:04X}"
+        order_row = (MODES[mode], PAYMENTS[payment], timestamp, total / 100, total, base_epoch + second, dates[0],
+                     subtotal, discount, tip, txn_id)
+        item_rows = [
+            [item_ids[pick], qty, line / 100, line, names[pick], categories[pick], int(prices_paise[pick]),
+             int(gst_bp[pick]), gst]
+            for pick, qty, line, gst in line_items[start:end]
+        ]
+        rows.append((order_row, item_rows))
+    return rows
+
+
+def _day(value):
+    return datetime.date.fromisoformat(value)
+
+
+def main():
+    yesterday = datetime.date.today() - datetime.timedelta(days=1)
+    parser = argparse.ArgumentParser(
+        description="Fill a database with a seeded, realistic synthetic order history (and optionally a menu).")
+    parser.add_argument("--db", default=DB_PATH, help="Database file (default: the restaurant database).")
+    parser.add_argument("--orders", type=int, default=1_000_000, help="Orders to generate (about 3 line items each).")
+    parser.add_argument("--start", type=_day, default=yesterday - datetime.timedelta(days=3 * 365),
+                        help="First business day, YYYY-MM-DD (default: three years ago).")
+    parser.add_argument("--end", type=_day, default=yesterday, help="Last business day (default: yesterday).")
+    parser.add_argument("--menu-items", type=int, default=0,
+                        help="Generate a menu of this many items; 0 (default) orders from the existing menu.")
+    parser.add_argument("--growth", type=float, default=0.10, help="Year-on-year growth in orders.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Orders per transaction.")
+    parser.add_argument("--replace", action="store_true",
+                        help="Delete existing orders (and, with --menu-items, the menu) first.")
+    args = parser.parse_args()
+    if args.end < args.start:
+        parser.error("--end is before --start")
+
+    rng = np.random.default_rng(args.seed)
+    pool = get_pool(args.db)
+    bootstrap_schema(pool)
+    with pool.transaction() as conn:
+        if args.replace:
+            conn.execute("DELETE FROM order_items")
+            conn.execute("DELETE FROM orders")
+            clear_rollups(conn)
+            bump_data_version(conn, "orders")
+        if args.menu_items:
+            if args.replace:
+                conn.execute("DELETE FROM menu")
+            taken = [row[0] for row in conn.execute("SELECT item_name FROM menu")]
+            first_id = conn.execute("SELECT COALESCE(MAX(item_id), 0) + 1 FROM menu").fetchone()[0]
+            menu_rows = generate_menu(args.menu_items, rng, first_id, taken)
+            conn.executemany(
+                "INSERT INTO menu (item_id, item_name, category, price, gst, image_url) VALUES (?, ?, ?, ?, ?, '')",
+                menu_rows
+            )
+            bump_data_version(conn, "menu")
+        else:
+            menu_rows = conn.execute("SELECT item_id, item_name, category, price, gst FROM menu ORDER BY item_id").fetchall()
+    if not menu_rows:
+        sys.exit("The menu is empty; pass --menu-items N to generate one.")
+
+    item_ids, names, categories, prices, gsts = zip(*menu_rows)
+    menu = (list(item_ids), list(names), list(categories), to_paise_array(prices), rate_to_bp(gsts))
+    # Zipf-like popularity over a seeded ranking of the dishes.
+    popularity = 1.0 / np.arange(1, len(item_ids) + 1) ** 1.1
+    popularity = rng.permutation(popularity / popularity.sum())
+    counts = daily_order_counts(args.start, args.end, args.orders, args.growth, rng)
+
+    print(f"Generating {args.orders:,} orders over {len(counts):,} days from a {len(item_ids):,}-item menu "
+          f"into {pool.db_path}")
+    started = time.perf_counter()
+    written = lines = 0
+    batch = []
+
+    def flush():
+        nonlocal written, lines
+        with pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                insert_order_rows(conn, batch, update_rollups=False)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        written += len(batch)
+        lines += sum(len(item_rows) for _, item_rows in batch)
+        elapsed = time.perf_counter() - started
+        print(f"\r{written:>12,} orders {lines:>12,} line items  {lines / elapsed:>9,.0f} lines/s", end="", flush=True)
+        batch.clear()
+
+    for offset, count in enumerate(counts.tolist()):
+        if count:
+            batch.extend(generate_day(args.start + datetime.timedelta(days=offset), count, menu, popularity, rng))
+        if len(batch) >= args.batch_size:
+            flush()
+    if batch:
+        flush()
+    print("\nRebuilding rollups...")
+    with pool.transaction() as conn:
+        rebuild_rollups(conn, args.start.isoformat(), args.end.isoformat())
+        bump_data_version(conn, "orders")
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {written:,} orders and {lines:,} line items in {elapsed:.1f} s ({lines / elapsed:,.0f} lines/s)")
+
+
+if __name__ == "__main__":
+    main()
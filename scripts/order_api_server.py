@@ -0,0 +1,37 @@
+import argparse
+import asyncio
+import os
+import sys
+
+# Allow importing from project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.db_pool import DB_PATH, get_pool
+from utils.migrations import bootstrap_schema
+from utils.order_api import OrderApi
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the JSON order API (menu, orders, lookup, analytics).")
+    parser.add_argument("--db", default=DB_PATH, help="Database file (default: the restaurant database).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on; 0 picks a free one.")
+    parser.add_argument("--workers", type=int, help="Database worker threads (default: the pool size).")
+    args = parser.parse_args()
+
+    pool = get_pool(args.db)
+    bootstrap_schema(pool)
+    api = OrderApi(pool, workers=args.workers)
+
+    def ready(address):
+        print(f"Listening on http://{address[0]}:{address[1]}", flush=True)
+
+    try:
+        asyncio.run(api.serve(args.host, args.port, ready=ready))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
+
+
+if __name__ == "__main__":
+    main()
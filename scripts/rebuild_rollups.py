@@ -0,0 +1,39 @@
+import argparse
+import datetime
+import os
+import sys
+import time
+
+# Allow importing from project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.data_cache import bump_data_version
+from utils.db_pool import DB_PATH, get_pool
+from utils.migrations import bootstrap_schema
+from utils.rollups import rebuild_rollups
+
+
+def _day(value):
+    datetime.date.fromisoformat(value)
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute the sales rollup tables from the raw orders.")
+    parser.add_argument("--db", default=DB_PATH, help="Database file (default: the restaurant database).")
+    parser.add_argument("--start", type=_day, help="First day to rebuild, YYYY-MM-DD (default: all).")
+    parser.add_argument("--end", type=_day, help="Last day to rebuild, YYYY-MM-DD (default: all).")
+    args = parser.parse_args()
+
+    pool = get_pool(args.db)
+    bootstrap_schema(pool)
+    started = time.perf_counter()
+    with pool.transaction() as conn:
+        rebuild_rollups(conn, args.start, args.end)
+        # Running dashboards re-read their cached analytics on the next rerun.
+        bump_data_version(conn, "orders")
+    print(f"Rebuilt rollups for {args.start or 'the beginning'} to {args.end or 'the end'} "
+          f"in {time.perf_counter() - started:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
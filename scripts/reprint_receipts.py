@@ -0,0 +1,45 @@
+import argparse
+import datetime
+import os
+import sys
+
+# Allow importing from project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.db_pool import DB_PATH, get_pool
+from utils.migrations import bootstrap_schema
+from utils.receipt_batch import REPRINT_FORMATS, reprint_receipts
+
+
+def _day(value):
+    return datetime.date.fromisoformat(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reprint every receipt in a business-date range into one ZIP or merged PDF.")
+    parser.add_argument("--db", default=DB_PATH, help="Database file (default: the restaurant database).")
+    parser.add_argument("--start", type=_day, required=True, help="First business day, YYYY-MM-DD.")
+    parser.add_argument("--end", type=_day, help="Last business day, YYYY-MM-DD (default: the start day).")
+    parser.add_argument("--format", choices=REPRINT_FORMATS, default="zip",
+                        help="zip: one PDF per receipt; pdf: one merged multi-page PDF (needs pypdf).")
+    parser.add_argument("--out", help="Output file (default: receipts_<start>_<end>.<format>).")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: every CPU).")
+    parser.add_argument("--chunk-size", type=int, default=25, help="Receipts per worker task.")
+    args = parser.parse_args()
+
+    end = args.end or args.start
+    out = args.out or f"receipts_{args.start}_{end}.{args.format}"
+    pool = get_pool(args.db)
+    bootstrap_schema(pool)
+
+    def progress(done, total):
+        print(f"\r{done:,}/{total:,} receipts", end="", file=sys.stderr, flush=True)
+
+    result = reprint_receipts(args.start, end, out, fmt=args.format, workers=args.workers,
+                              chunk_size=args.chunk_size, progress=progress, pool=pool)
+    print(file=sys.stderr)
+    print(f"Wrote {result.receipts:,} receipts to {result.path} in {result.seconds:.1f} s "
+          f"({result.receipts / result.seconds if result.seconds else 0:,.0f}/s on {result.workers} workers)")
+
+
+if __name__ == "__main__":
+    main()
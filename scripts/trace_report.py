@@ -0,0 +1,81 @@
+import argparse
+import glob
+import json
+import os
+import sys
+from collections import defaultdict
+
+import numpy as np
+
+# Allow importing from project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.tracing import TRACE_LOG
+
+
+def read_traces(path):
+    """
+    Yields the traces in a trace log and its rotated backups, oldest file first.
+    """
+    # RotatingFileHandler keeps trace.jsonl.1 (newest backup) up to trace.jsonl.N (oldest).
+    backups = [name for name in glob.glob(f"{path}.*") if name.rsplit(".", 1)[1].isdigit()]
+    backups.sort(key=lambda name: int(name.rsplit(".", 1)[1]), reverse=True)
+    for name in backups + [path]:
+        if not os.path.exists(name):
+            continue
+        with open(name, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize the rerun trace log: per-page rerun times and per-function costs.")
+    parser.add_argument("--log", default=TRACE_LOG, help="Trace log (rotated backups next to it are read too).")
+    parser.add_argument("--page", help="Only reruns of this page.")
+    parser.add_argument("--since", help="Only traces started at or after this ISO time, e.g. 2025-07-28T18:00.")
+    parser.add_argument("--top", type=int, default=20, help="Functions to list.")
+    args = parser.parse_args()
+
+    reruns = defaultdict(list)
+    calls = defaultdict(list)
+    rows = defaultdict(int)
+    per_rerun = defaultdict(list)
+    untraced = []
+    count = 0
+    for trace in read_traces(args.log):
+        page = trace["meta"].get("page", "-")
+        if args.page and page != args.page:
+            continue
+        if args.since and trace["started"] < args.since:
+            continue
+        count += 1
+        reruns[page].append(trace["ms"])
+        own = defaultdict(float)
+        for span in trace["spans"]:
+            calls[span["name"]].append(span["ms"])
+            own[span["name"]] += span["ms"]
+            rows[span["name"]] += span["rows"] or 0
+        for name, ms in own.items():
+            per_rerun[name].append(ms)
+        untraced.append(max(trace["ms"] - sum(span["ms"] for span in trace["spans"] if span["depth"] == 0), 0.0))
+    if not count:
+        sys.exit(f"No traces in {args.log}")
+
+    print(f"{count:,} reruns\n")
+    print(f"{'page':<24} {'reruns':>7} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for page, times in sorted(reruns.items(), key=lambda item: -len(item[1])):
+        p50, p95 = np.percentile(times, [50, 95])
+        print(f"{page:<24} {len(times):>7,} {p50:>9.1f} {p95:>9.1f} {max(times):>9.1f}")
+
+    print(f"\n{'function':<28} {'calls':>8} {'calls/rerun':>11} {'p50 ms':>8} {'p95 ms':>8} {'total s':>8} {'rows':>10}")
+    by_total = sorted(calls.items(), key=lambda item: -sum(item[1]))
+    for name, times in by_total[:args.top]:
+        p50, p95 = np.percentile(times, [50, 95])
+        print(f"{name:<28} {len(times):>8,} {len(times) / len(per_rerun[name]):>11.1f} {p50:>8.2f} {p95:>8.2f} "
+              f"{sum(times) / 1000:>8.2f} {rows[name]:>10,}")
+    print(f"{'(untraced)':<28} {'':>8} {'':>11} {np.percentile(untraced, 50):>8.2f} {np.percentile(untraced, 95):>8.2f} "
+          f"{sum(untraced) / 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
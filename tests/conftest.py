@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+# Allow importing from project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.db_pool import ConnectionPool
+from utils.migrations import run_migrations
+
+# (item_id, item_name, category, price, gst)
+MENU = [
+    (1, "Masala Dosa", "South Indian", 120.0, 5.0),
+    (2, "Idli (2 pcs)", "South Indian", 60.0, 5.0),
+    (3, "Paneer Tikka", "Starters", 220.0, 5.0),
+    (4, "Lassi", "Beverages", 80.0, 12.0),
+]
+
+
+@pytest.fixture
+def app_pool(tmp_path):
+    """
+    A pool on a fresh, fully migrated restaurant database holding MENU.
+    """
+    pool = ConnectionPool(str(tmp_path / "restaurant.db"))
+    with pool.connection() as conn:
+        run_migrations(conn)
+    with pool.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO menu (item_id, item_name, category, price, gst, image_url) VALUES (?, ?, ?, ?, ?, '')", MENU
+        )
+    yield pool
+    pool.close()
@@ -0,0 +1,66 @@
+import datetime
+import sqlite3
+
+import pytest
+
+from utils.business_day import BUSINESS_DAY_CUTOFF_HOURS, business_date, business_day_bounds, to_epoch
+
+
+@pytest.mark.parametrize("timestamp, day", [
+    ("2026-03-01 03:59:59", "2026-02-28"),
+    ("2026-03-01 04:00:00", "2026-03-01"),
+    ("2026-03-01 04:00:01", "2026-03-01"),
+    ("2026-03-01 23:59:59", "2026-03-01"),
+    ("2026-03-02 00:00:00", "2026-03-01"),
+    ("2026-03-02 00:00:01", "2026-03-01"),
+    ("2026-03-02 03:59:59", "2026-03-01"),
+    ("2026-03-02 04:00:00", "2026-03-02"),
+    ("2026-01-01 01:30:00", "2025-12-31"),   # New Year's Eve service
+    ("2028-03-01 02:00:00", "2028-02-29"),   # leap day
+])
+def test_business_date_around_the_cutoff_and_midnight(timestamp, day):
+    assert BUSINESS_DAY_CUTOFF_HOURS == 4
+    assert business_date(timestamp) == day
+    assert business_date(datetime.datetime.fromisoformat(timestamp)) == day
+
+
+def test_bounds_run_from_cutoff_to_cutoff():
+    start, end = business_day_bounds(datetime.date(2026, 3, 1), datetime.date(2026, 3, 1))
+
+    assert start == to_epoch("2026-03-01 04:00:00")
+    assert end == to_epoch("2026-03-02 04:00:00")
+    assert end - start == 24 * 3600
+    assert business_day_bounds(datetime.date(2026, 3, 1), datetime.date(2026, 3, 3)) == (
+        start, to_epoch("2026-03-04 04:00:00")
+    )
+
+
+@pytest.mark.parametrize("start_date, end_date", [
+    (datetime.date(2026, 3, 1), datetime.date(2026, 3, 1)),
+    (datetime.date(2025, 12, 31), datetime.date(2026, 1, 1)),
+    (datetime.date(2028, 2, 28), datetime.date(2028, 2, 29)),
+])
+def test_bounds_agree_with_business_date(start_date, end_date):
+    # Every second within five minutes of each cutoff and of each midnight lands inside the
+    # half-open range exactly when its business date does.
+    start, end = business_day_bounds(start_date, end_date)
+    day = start_date - datetime.timedelta(days=1)
+    while day <= end_date + datetime.timedelta(days=1):
+        for hour in (0, BUSINESS_DAY_CUTOFF_HOURS):
+            edge = datetime.datetime.combine(day, datetime.time(hour))
+            for offset in range(-300, 301):
+                moment = edge + datetime.timedelta(seconds=offset)
+                in_range = start_date.isoformat() <= business_date(moment) <= end_date.isoformat()
+                assert (start <= to_epoch(moment) < end) == in_range, moment
+        day += datetime.timedelta(days=1)
+
+
+@pytest.mark.parametrize("timestamp", [
+    "1970-01-01 00:00:00", "2026-03-01 03:59:59", "2026-03-01 04:00:00", "2026-03-01 23:59:59", "2028-02-29 12:00:00",
+])
+def test_to_epoch_matches_sqlite(timestamp):
+    conn = sqlite3.connect(":memory:")
+    try:
+        assert to_epoch(timestamp) == conn.execute("SELECT CAST(strftime('%s', ?) AS INTEGER)", (timestamp,)).fetchone()[0]
+    finally:
+        conn.close()
@@ -0,0 +1,23 @@
+from utils import db_utils
+
+
+def test_bulk_orders_come_back_from_get_orders(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_utils, "DB_PATH", str(tmp_path / "orders.db"))
+    db_utils.init_db()
+    db_utils.save_order_to_db("2026-10-01 09:00:00", "Dine-In", [{"name": "Tea", "qty": 1}], 20.0, "Cash")
+    orders = [
+        {"timestamp": f"2026-10-01 10:0{i}:00", "order_mode": "Takeaway", "items": [{"name": "Samosa", "qty": i + 1}],
+         "total_amount": 30.0 * (i + 1), "payment_method": "UPI"}
+        for i in range(5)
+    ]
+    orders.insert(2, {"timestamp": "2026-10-01 10:30:00", "order_mode": "Dine-In"})
+    orders.insert(4, dict(orders[0], total_amount="thirty"))
+
+    result = db_utils.save_orders_bulk(orders, batch_size=3)
+
+    assert result.inserted == 5
+    assert [index for index, _ in result.errors] == [2, 4]
+    assert result.order_ids == [2, 3, None, 4, None, 5, 6]
+    rows = db_utils.get_orders()
+    assert [row[0] for row in rows] == [1, 2, 3, 4, 5, 6]
+    assert rows[-1][1:] == ("2026-10-01 10:04:00", "Takeaway", "[{'name': 'Samosa', 'qty': 5}]", 150.0, "UPI")
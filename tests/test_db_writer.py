@@ -0,0 +1,65 @@
+import sqlite3
+
+import pytest
+
+from utils.db_pool import ConnectionPool
+from utils.db_writer import DbWriter
+
+
+def _create(conn, value):
+    conn.execute("CREATE TABLE IF NOT EXISTS t (v INTEGER NOT NULL)")
+    return value
+
+
+def _insert(conn, value):
+    conn.execute("INSERT INTO t (v) VALUES (?)", (value,))
+    return value
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "writer.db"), busy_timeout=0.5)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def writer(pool):
+    writer = DbWriter(pool)
+    writer.submit(_create, None).result(timeout=10)
+    yield writer
+    writer.close()
+
+
+def _count(pool):
+    with pool.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+
+def test_failing_intent_is_rolled_back_alone(pool, writer):
+    futures = [writer.submit(_insert, 1), writer.submit(_insert, None), writer.submit(_insert, 3)]
+
+    assert futures[0].result(timeout=10) == 1
+    with pytest.raises(sqlite3.IntegrityError):
+        futures[1].result(timeout=10)
+    assert futures[2].result(timeout=10) == 3
+    assert _count(pool) == 2
+
+
+def test_locked_database_fails_every_future_in_the_batch(pool, writer):
+    blocker = sqlite3.connect(pool.db_path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        futures = [writer.submit(_insert, i) for i in range(3)]
+        for future in futures:
+            with pytest.raises(sqlite3.OperationalError):
+                future.result(timeout=10)
+    finally:
+        blocker.rollback()
+        blocker.close()
+
+    # The writer thread survives the failed batch and keeps committing.
+    assert writer.submit(_insert, 4).result(timeout=10) == 4
+    assert _count(pool) == 1
+    assert writer.stats()["failed"] >= 3
+
@@ -0,0 +1,81 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.image_validator import ImageUrlValidator
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # path -> (status, headers)
+    routes = {
+        "/image.png": (200, {"Content-Type": "image/png", "ETag": '"v1"'}),
+        "/missing.png": (404, {"Content-Type": "text/html"}),
+        "/moved.png": (302, {"Location": "/image.png"}),
+        "/page.html": (200, {"Content-Type": "text/html; charset=utf-8"}),
+    }
+
+    def do_HEAD(self):
+        self.server.hits.append((self.path, self.headers.get("If-None-Match")))
+        status, headers = self.routes.get(self.path, (404, {}))
+        if status == 200 and self.headers.get("If-None-Match") == headers.get("ETag"):
+            status = 304
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    # Keep requests from routing localhost through a proxy from the environment.
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1,localhost")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.hits = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _url(server, path):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}{path}"
+
+
+def test_verdicts_and_cache(server, tmp_path):
+    validator = ImageUrlValidator(cache_path=str(tmp_path / "image_cache.db"), timeout=5)
+    urls = {path: _url(server, path) for path in ("/image.png", "/missing.png", "/moved.png", "/page.html")}
+
+    verdicts = validator.validate(list(urls.values()))
+
+    assert verdicts == {
+        urls["/image.png"]: True,
+        urls["/missing.png"]: False,
+        urls["/moved.png"]: True,
+        urls["/page.html"]: False,
+    }
+    entries = validator.cached(urls.values())
+    assert entries[urls["/missing.png"]]["status"] == 404
+    assert entries[urls["/moved.png"]]["status"] == 200
+
+    # Fresh entries are answered from the cache without touching the server.
+    hits = len(server.hits)
+    assert validator.validate(list(urls.values())) == verdicts
+    assert len(server.hits) == hits
+
+
+def test_stale_entry_is_revalidated_conditionally(server, tmp_path):
+    validator = ImageUrlValidator(cache_path=str(tmp_path / "image_cache.db"), ttl_seconds=0, timeout=5)
+    url = _url(server, "/image.png")
+
+    assert validator.validate([url]) == {url: True}
+    assert validator.validate([url]) == {url: True}
+
+    assert server.hits == [("/image.png", None), ("/image.png", '"v1"')]
+    assert validator.cached([url])[url]["status"] == 304
@@ -0,0 +1,101 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from utils.money import (GST_ROUNDING_ENV, gst_rounding, price_invoice, price_line_paise, price_lines_paise,
+                         round_div, settle, to_paise, to_paise_array)
+
+
+@pytest.mark.parametrize("rupees, paise", [
+    (1.005, 101),     # stored as 1.00499999..., still rounds half up like its spelling
+    (2.675, 268),
+    (0.125, 13),
+    (0.124, 12),
+    (-1.005, -101),   # half away from zero
+    (10, 1000),
+    ("19.995", 2000),
+    (Decimal("0.005"), 1),
+    (np.float64(99.995), 10000),
+])
+def test_to_paise_rounds_half_up(rupees, paise):
+    assert to_paise(rupees) == paise
+
+
+def test_to_paise_array_matches_scalar():
+    values = [1.005, 2.675, 0.125, 0.124, -1.005, 99.995, 0.0, 1234.5]
+    assert to_paise_array(values).tolist() == [to_paise(value) for value in values]
+    assert to_paise_array(values).dtype == np.int64
+
+
+@pytest.mark.parametrize("numerator, denominator, expected", [
+    (5, 10, 1), (4, 10, 0), (15, 10, 2), (-5, 10, -1), (-15, 10, -2), (0, 7, 0), (10000, 10000, 1),
+])
+def test_round_div_half_away_from_zero(numerator, denominator, expected):
+    assert round_div(numerator, denominator) == expected
+    assert isinstance(round_div(numerator, denominator), int)
+
+
+def test_round_div_arrays():
+    assert round_div(np.array([5, 4, -5, 25]), 10).tolist() == [1, 0, -1, 3]
+
+
+def test_settle_applies_discount_then_tip():
+    # 10% off 1000.00 is 100.00; a 5% tip on the remaining 900.00 is 45.00.
+    assert settle(100000, 10.0, 5.0) == (10000, 4500, 94500)
+    # 2.5% of 0.99 is 2.475 paise -> 2; a 12.5% tip on 97 paise is 12.125 -> 12.
+    assert settle(99, 2.5, 12.5) == (2, 12, 109)
+    assert settle(12345) == (0, 0, 12345)
+
+
+def test_price_lines_paise_rounds_gst_per_line():
+    base, gst, total = price_lines_paise([1050, 999, 33], [500, 1200, 1800], [3, 1, 1])
+    # 3150 * 5% = 157.5 -> 158; 999 * 12% = 119.88 -> 120; 33 * 18% = 5.94 -> 6
+    assert base.tolist() == [3150, 999, 33]
+    assert gst.tolist() == [158, 120, 6]
+    assert total.tolist() == [3308, 1119, 39]
+    assert price_line_paise(10.50, 5.0, 3) == (3150, 158, 3308)
+
+
+def test_invoice_rounding_rounds_once_per_rate_and_lines_add_up():
+    # Three 0.10 lines at 5% carry 0.5 paise GST each: 1 paisa per line when rounded
+    # per line (3 in all), but 1.5 -> 2 paise when the 5% lines are rounded together.
+    prices, gsts, qtys = [0.10, 0.10, 0.10, 1.00], [5, 5, 5, 12], [1, 1, 1, 1]
+
+    line = price_invoice(prices, gsts, qtys, rounding="line")
+    invoice = price_invoice(prices, gsts, qtys, rounding="invoice")
+
+    assert line.gst.tolist() == [1, 1, 1, 12] and line.gst_total == 15
+    assert invoice.gst_total == 14
+    assert invoice.gst.tolist() == [1, 1, 0, 12]  # leftover paisa to the earliest line on ties
+    for totals in (line, invoice):
+        assert int(totals.gst.sum()) == totals.gst_total
+        assert int(totals.line_total.sum()) == totals.subtotal
+        assert totals.subtotal == int(totals.base.sum()) + totals.gst_total
+
+
+def test_invoice_rounding_gives_leftover_to_largest_fractions():
+    # Exact GST 0.35, 0.9 and 0.35 paise (sum 1.6 -> 2): the 0.9 line and then the first 0.35 line.
+    invoice = price_invoice([0.07, 0.18, 0.07], [5, 5, 5], [1, 1, 1], rounding="invoice")
+    assert invoice.gst.tolist() == [1, 1, 0]
+    assert invoice.gst_total == 2
+
+
+def test_price_invoice_settles_discount_and_tip():
+    totals = price_invoice([100.0], [5.0], [2], discount_pct=10.0, tip_pct=5.0)
+    assert (totals.subtotal, totals.discount, totals.tip, totals.final_total) == (21000, 2100, 945, 19845)
+
+
+def test_price_invoice_rejects_unknown_rounding():
+    with pytest.raises(ValueError):
+        price_invoice([1.0], [5.0], [1], rounding="bankers")
+
+
+def test_gst_rounding_from_environment(monkeypatch):
+    monkeypatch.delenv(GST_ROUNDING_ENV, raising=False)
+    assert gst_rounding() == "line"
+    monkeypatch.setenv(GST_ROUNDING_ENV, "Invoice")
+    assert gst_rounding() == "invoice"
+    monkeypatch.setenv(GST_ROUNDING_ENV, "nearest")
+    with pytest.raises(ValueError):
+        gst_rounding()
@@ -0,0 +1,63 @@
+import asyncio
+import datetime
+
+import pytest
+
+from utils.order_api import MAX_PAGE, ApiError, OrderApi
+from utils.order_store import save_orders_bulk
+
+DAY = datetime.date(2026, 10, 1)
+
+
+@pytest.fixture
+def api(app_pool):
+    save_orders_bulk([
+        {"mode": "Dine-In", "payment": "Cash", "timestamp": f"2026-10-01 12:{minute:02d}:00", "total": 126.0,
+         "items": [{"item_id": 1, "qty": 1, "total": 126.0}]}
+        for minute in range(5)
+    ], pool=app_pool)
+    api = OrderApi(app_pool, workers=2)
+    yield api
+    api.close()
+
+
+def _get(api, target):
+    return asyncio.run(api.dispatch("GET", target, b""))
+
+
+@pytest.mark.parametrize("cursor", ["5", "1,2,3", "a,b", ","])
+def test_malformed_cursor_is_rejected(api, cursor):
+    with pytest.raises(ApiError) as e:
+        _get(api, f"/orders?start={DAY}&cursor={cursor}")
+    assert e.value.status == 400
+
+
+def test_cursor_round_trip(api):
+    status, first = _get(api, f"/orders?start={DAY}&limit=3")
+    assert status == 200 and len(first["orders"]) == 3
+    status, second = _get(api, f"/orders?start={DAY}&limit=3&cursor={first['next_cursor']}")
+    assert status == 200 and second["next_cursor"] is None
+    ids = [order["order_id"] for order in first["orders"] + second["orders"]]
+    assert ids == [5, 4, 3, 2, 1]
+
+
+@pytest.mark.parametrize("limit", [0, -1, MAX_PAGE + 1])
+def test_limit_out_of_range_is_rejected(api, limit):
+    with pytest.raises(ApiError) as e:
+        _get(api, f"/orders?start={DAY}&limit={limit}")
+    assert e.value.status == 400
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-5"])
+def test_bad_content_length_gets_400(api, length):
+    async def exchange():
+        server = await asyncio.start_server(api.handle_connection, "127.0.0.1", 0)
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(b"POST /orders HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), timeout=5)
+            writer.close()
+            return response
+
+    assert asyncio.run(exchange()).startswith(b"HTTP/1.1 400 ")
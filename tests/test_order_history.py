@@ -0,0 +1,101 @@
+import datetime
+import json
+
+import pytest
+
+from utils.order_history import count_orders, get_history_page
+from utils.order_store import _order_row, insert_order, insert_order_rows
+
+DAY = datetime.date(2026, 3, 1)
+
+
+def _order(timestamp, item_id=1, qty=1):
+    return {"mode": "Dine-In", "payment": "Cash", "timestamp": timestamp, "total": 126.0 * qty,
+            "items": [{"item_id": item_id, "qty": qty, "total": 126.0 * qty}]}
+
+
+@pytest.fixture
+def history_pool(app_pool):
+    # Runs of orders sharing a second, so pages have to break ties on order_id.
+    timestamps = (["2026-03-01 12:00:00"] * 7 + ["2026-03-01 12:00:01"] * 2 + ["2026-03-01 11:59:59"] * 5
+                  + ["2026-03-02 03:59:59"] * 3)
+    with app_pool.transaction() as conn:
+        insert_order_rows(conn, [_order_row(_order(timestamp, qty=1 + index % 3))
+                                 for index, timestamp in enumerate(timestamps)])
+        # Outside the business day on both sides.
+        insert_order(conn, _order("2026-03-01 03:59:59"))
+        insert_order(conn, _order("2026-03-02 04:00:00"))
+    return app_pool
+
+
+def _newest_first(pool):
+    with pool.connection() as conn:
+        return [row[0] for row in conn.execute(
+            "SELECT order_id FROM orders WHERE business_date = ? ORDER BY ts_epoch DESC, order_id DESC",
+            (DAY.isoformat(),)
+        )]
+
+
+def _walk(pool, page_size, include_items=False):
+    pages, cursor = [], None
+    while True:
+        page = get_history_page(DAY, DAY, page_size=page_size, cursor=cursor, include_items=include_items,
+                                pool=pool)
+        pages.append(page.orders)
+        if page.next_cursor is None:
+            return pages
+        assert page.next_cursor == (page.orders[-1]["ts_epoch"], page.orders[-1]["order_id"])
+        cursor = tuple(page.next_cursor)
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 4, 17, 25])
+def test_pages_cover_ties_without_gaps_or_repeats(history_pool, page_size):
+    expected = _newest_first(history_pool)
+    assert len(expected) == 17
+
+    pages = _walk(history_pool, page_size)
+
+    assert [order["order_id"] for page in pages for order in page] == expected
+    assert all(len(page) == page_size for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= page_size
+    assert len(pages) == -(-len(expected) // page_size)
+
+
+def test_pages_with_items_match_pages_without(history_pool):
+    plain = _walk(history_pool, 4)
+    with_items = _walk(history_pool, 4, include_items=True)
+
+    assert [[o["order_id"] for o in page] for page in with_items] == [[o["order_id"] for o in page] for page in plain]
+    for order in (order for page in with_items for order in page):
+        (line,) = order["items"]
+        assert line["order_id"] == order["order_id"] and line["item_name"] == "Masala Dosa"
+        assert line["total"] == order["total"]
+
+
+def test_cursor_survives_a_json_round_trip(history_pool):
+    # Cursors leave the process as JSON (a list) and must resume exactly where the page ended.
+    first = get_history_page(DAY, DAY, page_size=5, pool=history_pool)
+    cursor = json.loads(json.dumps(first.next_cursor))
+    second = get_history_page(DAY, DAY, page_size=5, cursor=cursor, pool=history_pool)
+
+    assert [o["order_id"] for o in first.orders + second.orders] == _newest_first(history_pool)[:10]
+
+
+def test_count_orders_is_cached_until_the_range_changes(history_pool):
+    cache = count_orders.cache
+    assert count_orders(DAY, DAY, pool=history_pool) == 17
+
+    hits = cache.hits
+    assert count_orders(DAY, DAY, pool=history_pool) == 17
+    assert cache.hits == hits + 1
+
+    # A write on another business day leaves the entry valid.
+    with history_pool.transaction() as conn:
+        insert_order(conn, _order("2026-03-05 12:00:00"))
+    assert count_orders(DAY, DAY, pool=history_pool) == 17
+    assert cache.hits == hits + 2
+
+    with history_pool.transaction() as conn:
+        insert_order(conn, _order("2026-03-02 01:30:00"))
+    assert count_orders(DAY, DAY, pool=history_pool) == 18
+    assert cache.hits == hits + 2
@@ -0,0 +1,150 @@
+import threading
+import time
+
+import pytest
+
+from utils.payments import APPROVED, DECLINED, FAILED, ChargeResult, GatewayError, PaymentGateway, PaymentQueue
+
+
+class ScriptedGateway(PaymentGateway):
+    """
+    Answers charges from a script of outcomes (a ChargeResult, or an exception to raise),
+    recording each call's time and txn_id. Holds every charge while `gate` is clear.
+    """
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def charge(self, method, amount_paise, txn_id):
+        self.gate.wait(5)
+        self.calls.append((time.monotonic(), txn_id))
+        outcome = self.outcomes.pop(0) if self.outcomes else ChargeResult(True, "REF1", None)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def make_queue():
+    queues = []
+
+    def make(gateway, **options):
+        options.setdefault("backoff", 0.02)
+        queues.append(PaymentQueue(gateway, workers=4, **options))
+        return queues[-1]
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+
+def test_transient_errors_are_retried_with_backoff(make_queue):
+    gateway = ScriptedGateway(GatewayError("timeout"), GatewayError("reset"), ChargeResult(True, "REF42", None))
+    queue = make_queue(gateway, retries=2)
+
+    status = queue.wait(queue.submit("Card", 12500, "TXN1"), timeout=5)
+
+    assert (status.state, status.reference, status.attempts) == (APPROVED, "REF42", 3)
+    assert [txn_id for _, txn_id in gateway.calls] == ["TXN1"] * 3
+    gaps = [later - earlier for (earlier, _), (later, _) in zip(gateway.calls, gateway.calls[1:])]
+    # At least half of each backoff step (0.02s, then 0.04s) is always waited.
+    assert gaps[0] >= 0.01 and gaps[1] >= 0.02
+    assert queue.stats() == {"in_flight": 0, "approved": 1, "declined": 0, "failed": 0}
+
+
+def test_exhausted_retries_fail(make_queue):
+    gateway = ScriptedGateway(*[GatewayError("gateway timeout")] * 5)
+    queue = make_queue(gateway, retries=3)
+
+    status = queue.wait(queue.submit("UPI", 9900, "TXN2"), timeout=5)
+
+    assert (status.state, status.message, status.attempts) == (FAILED, "gateway timeout", 4)
+    assert len(gateway.calls) == 4
+    assert status.finished_at is not None
+    assert queue.stats()["failed"] == 1
+
+
+@pytest.mark.parametrize("outcome, state, message", [
+    (ChargeResult(False, None, "Insufficient funds"), DECLINED, "Insufficient funds"),
+    (KeyError("amount"), FAILED, "KeyError: 'amount'"),
+])
+def test_final_outcomes_are_not_retried(make_queue, outcome, state, message):
+    gateway = ScriptedGateway(outcome)
+    queue = make_queue(gateway)
+
+    status = queue.wait(queue.submit("Card", 500, "TXN3"), timeout=5)
+
+    assert (status.state, status.message, status.attempts) == (state, message, 1)
+    assert len(gateway.calls) == 1
+
+
+def test_retry_delay_grows_exponentially_with_jitter():
+    queue = PaymentQueue(ScriptedGateway(), workers=1, backoff=0.5, max_backoff=4.0)
+    try:
+        for attempt, step in [(1, 0.5), (2, 1.0), (3, 2.0), (4, 4.0), (5, 4.0), (12, 4.0)]:
+            delays = [queue.retry_delay(attempt) for _ in range(200)]
+            assert all(step / 2 <= delay <= step for delay in delays)
+            assert len(set(delays)) > 1
+    finally:
+        queue.close()
+
+
+def test_same_txn_id_is_charged_once(make_queue):
+    gateway = ScriptedGateway()
+    gateway.gate.clear()
+    queue = make_queue(gateway)
+
+    first = queue.submit("UPI", 30000, "TXN4")
+    assert queue.submit("UPI", 30000, "TXN4") == first  # in flight
+    with pytest.raises(ValueError):
+        queue.submit("UPI", 31000, "TXN4")
+    with pytest.raises(ValueError):
+        queue.submit("Card", 30000, "TXN4")
+
+    gateway.gate.set()
+    assert queue.wait(first, timeout=5).state == APPROVED
+    assert queue.submit("UPI", 30000, "TXN4") == first  # approved
+    assert len(gateway.calls) == 1
+
+
+def test_txn_id_can_be_charged_again_after_a_decline(make_queue):
+    gateway = ScriptedGateway(ChargeResult(False, None, "Declined"))
+    queue = make_queue(gateway)
+
+    first = queue.submit("Card", 700, "TXN5")
+    assert queue.wait(first, timeout=5).state == DECLINED
+    second = queue.submit("Card", 700, "TXN5")
+
+    assert second != first
+    assert queue.wait(second, timeout=5).state == APPROVED
+    assert [txn_id for _, txn_id in gateway.calls] == ["TXN5", "TXN5"]
+
+
+def test_charges_without_txn_id_get_their_own(make_queue):
+    gateway = ScriptedGateway(GatewayError("timeout"))
+    queue = make_queue(gateway)
+
+    first = queue.wait(queue.submit("Card", 100), timeout=5)
+    second = queue.wait(queue.submit("Card", 100), timeout=5)
+
+    assert first.txn_id and second.txn_id and first.txn_id != second.txn_id
+    # The retry after the timeout reuses the payment's txn_id.
+    assert [txn_id for _, txn_id in gateway.calls] == [first.txn_id, first.txn_id, second.txn_id]
+
+
+def test_close_cuts_a_backoff_short():
+    gateway = ScriptedGateway(GatewayError("timeout"))
+    queue = PaymentQueue(gateway, workers=1, backoff=30.0, max_backoff=30.0)
+    payment_id = queue.submit("Card", 100, "TXN6")
+    deadline = time.monotonic() + 5
+    while not gateway.calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    queue.close()
+
+    assert time.monotonic() - started < 5
+    assert queue.status(payment_id).state == APPROVED
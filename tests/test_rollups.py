@@ -0,0 +1,100 @@
+import pytest
+
+from utils.order_store import _order_row, delete_orders, insert_order, insert_order_rows
+from utils.rollups import ROLLUP_TABLES, clear_rollups, rebuild_rollups
+
+
+def _order(timestamp, mode, payment, items):
+    # items: (item_id, qty, unit price)
+    return {
+        "mode": mode, "payment": payment, "timestamp": timestamp,
+        "total": sum(qty * price for _, qty, price in items),
+        "items": [{"item_id": item_id, "qty": qty, "total": qty * price} for item_id, qty, price in items],
+    }
+
+
+# Spread over two business days, with orders on both sides of the 04:00 cutoff and of midnight.
+ORDERS = [
+    _order("2026-03-01 12:15:00", "Dine-In", "Cash", [(1, 2, 126.0), (4, 1, 89.6)]),
+    _order("2026-03-01 12:40:00", "Dine-In", "Cash", [(1, 1, 126.0)]),
+    _order("2026-03-01 12:55:00", "Takeaway", "UPI", [(3, 1, 231.0), (2, 3, 63.0)]),
+    _order("2026-03-01 23:59:59", "Dine-In", "Card", [(4, 2, 89.6)]),
+    _order("2026-03-02 00:00:00", "Dine-In", "Card", [(3, 2, 231.0)]),
+    _order("2026-03-02 03:59:59", "Takeaway", "Cash", [(2, 1, 63.0)]),
+    _order("2026-03-02 04:00:00", "Takeaway", "Cash", [(2, 1, 63.0), (1, 1, 126.0)]),
+    _order("2026-03-02 19:30:00", "Dine-In", "UPI", [(1, 4, 126.0), (4, 4, 89.6)]),
+]
+
+
+def _snapshot(conn):
+    return {
+        table: conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2, 3").fetchall()
+        for table in ROLLUP_TABLES
+    }
+
+
+def _rebuilt(pool, start_day=None, end_day=None):
+    # What rebuild_rollups makes of the same orders, without keeping it.
+    with pool.connection() as conn:
+        conn.execute("SAVEPOINT rebuild")
+        rebuild_rollups(conn, start_day, end_day)
+        rebuilt = _snapshot(conn)
+        conn.execute("ROLLBACK TO rebuild")
+        conn.execute("RELEASE rebuild")
+    return rebuilt
+
+
+def _insert(pool):
+    with pool.transaction() as conn:
+        order_ids = [insert_order(conn, order) for order in ORDERS[:4]]
+        order_ids += insert_order_rows(conn, [_order_row(order) for order in ORDERS[4:]])
+    return order_ids
+
+
+def test_incremental_rollups_match_a_rebuild_after_inserts(app_pool):
+    _insert(app_pool)
+    with app_pool.connection() as conn:
+        incremental = _snapshot(conn)
+
+    assert incremental == _rebuilt(app_pool)
+    days = [bucket for bucket, *_ in incremental["sales_daily"]]
+    # 00:00 and 03:59:59 on 2 March still belong to the 1 March business day.
+    assert days.count("2026-03-01") == 4 and days.count("2026-03-02") == 2
+    # Rebuilding a single day leaves the other one alone.
+    assert incremental == _rebuilt(app_pool, "2026-03-01", "2026-03-01") == _rebuilt(app_pool, "2026-03-02")
+
+
+@pytest.mark.parametrize("deleted", [
+    [2],              # one of several orders in a bucket
+    [3, 4, 5],        # every Paneer Tikka sale, and the 23:00 and 00:00 hours
+    [4, 5, 6, 7],     # across midnight and both sides of the cutoff
+    list(range(1, 9)),
+])
+def test_incremental_rollups_match_a_rebuild_after_deletes(app_pool, deleted):
+    order_ids = _insert(app_pool)
+    with app_pool.transaction() as conn:
+        assert delete_orders(conn, [order_ids[index - 1] for index in deleted]) == len(deleted)
+    with app_pool.connection() as conn:
+        incremental = _snapshot(conn)
+
+    assert incremental == _rebuilt(app_pool)
+    if len(deleted) == len(ORDERS):
+        assert not any(incremental.values())
+
+
+def test_incremental_rollups_match_a_rebuild_after_clearing(app_pool):
+    _insert(app_pool)
+    with app_pool.transaction() as conn:
+        conn.execute("DELETE FROM order_items")
+        conn.execute("DELETE FROM orders")
+        clear_rollups(conn)
+        assert not any(_snapshot(conn).values())
+
+    with app_pool.transaction() as conn:
+        insert_order(conn, ORDERS[0])
+        insert_order_rows(conn, [_order_row(order) for order in ORDERS[5:]])
+    with app_pool.connection() as conn:
+        incremental = _snapshot(conn)
+
+    assert incremental == _rebuilt(app_pool)
+    assert sum(orders for *_, orders in incremental["sales_daily"]) == 4
@@ -0,0 +1,97 @@
+import socketserver
+import threading
+
+import pytest
+
+from utils.money import format_paise
+from utils.thermal_receipt import (ESC_BOLD_ON, ESC_INIT, GS_FEED_AND_CUT, RUPEE_CODE, Terminal, _escpos_prelude,
+                                   print_receipt, render_escpos_receipt, render_text_receipt, send_to_printer)
+
+RECEIPT = {
+    "order_id": 42, "mode": "Dine-In", "payment": "UPI", "timestamp": "2026-10-01 21:15:07",
+    "total_paise": 54705, "subtotal_paise": 52100, "discount_paise": 2605, "tip_paise": 5210,
+    "txn_id": "TXN2026100121150700001",
+    "items": [
+        {"item_id": 1, "item_name": "Masala Dosa", "qty": 2, "unit_price_paise": 12000, "gst_bp": 500,
+         "gst_paise": 1200, "total_paise": 25200},
+        {"item_id": 3, "item_name": "Paneer Tikka with Mint Chutney and Onion Rings", "qty": 1,
+         "unit_price_paise": 22000, "gst_bp": 500, "gst_paise": 1100, "total_paise": 23100},
+        {"item_id": 4, "item_name": "Lassi", "qty": 1, "unit_price_paise": 3400, "gst_bp": 1200,
+         "gst_paise": 408, "total_paise": 3808},
+    ],
+}
+
+
+def _printable_lines(job):
+    # The text of an ESC/POS job: split on newlines, with the command bytes dropped.
+    text = job.decode("cp437").replace(chr(RUPEE_CODE), "₹")
+    for command in ("\x1b@", "\x1bt\x00", "\x1ba\x00", "\x1ba\x01", "\x1bE\x01", "\x1bE\x00",
+                    "\x1d!\x00", "\x1d!\x11", "\x1dVB\x03", "\x1b%\x01"):
+        text = text.replace(command, "")
+    return text.split("\n")
+
+
+@pytest.mark.parametrize("width", [48, 32])
+def test_text_receipt_fits_the_paper(width):
+    text = render_text_receipt(RECEIPT, width)
+    lines = text.splitlines()
+
+    assert text.endswith("\n")
+    assert max(len(line) for line in lines) <= width
+    assert "Imperial Spice" in lines[0]
+    assert lines.count("-" * width) == 3
+    assert any(line.startswith("Txn ID:") and line.endswith(RECEIPT["txn_id"]) for line in lines)
+    assert any(line.startswith("TOTAL PAYABLE:") and line.endswith(format_paise(54705)) for line in lines)
+    assert any(line.startswith("Tip:") and line.endswith("+" + format_paise(5210)) for line in lines)
+    # Every word of the long item name survives the wrapping.
+    body = " ".join(lines)
+    assert all(word in body for word in RECEIPT["items"][1]["item_name"].split())
+
+
+@pytest.mark.parametrize("width", [48, 32])
+def test_escpos_receipt_is_a_complete_job(width):
+    job = render_escpos_receipt(RECEIPT, width)
+    prelude, symbol = _escpos_prelude()
+
+    assert job.startswith(prelude) and prelude.startswith(ESC_INIT)
+    assert job.endswith(GS_FEED_AND_CUT)
+    total = f"TOTAL PAYABLE:{format_paise(54705, symbol):>{width - len('TOTAL PAYABLE:')}}"
+    assert ESC_BOLD_ON + total.replace("₹", chr(RUPEE_CODE)).encode("cp437") in job
+    # The glyph download itself is binary; only the text after the prelude must fit.
+    lines = _printable_lines(job[len(prelude):])
+    assert max(len(line) for line in lines) <= width
+    if symbol == "₹":
+        assert bytes([RUPEE_CODE]) in job[len(prelude):]
+    else:
+        assert b"Rs." in job
+
+
+def test_send_to_printer_appends_to_a_file(tmp_path):
+    target = tmp_path / "spool" / "counter.prn"
+    first = render_escpos_receipt(RECEIPT, 48)
+    second = render_text_receipt(RECEIPT, 32).encode("utf-8")
+
+    send_to_printer(first, str(target))
+    send_to_printer(second, str(target))
+
+    assert target.read_bytes() == first + second
+
+
+def test_print_receipt_reaches_a_socket_printer():
+    jobs = []
+
+    class JobHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            jobs.append(self.rfile.read())
+
+    with socketserver.TCPServer(("127.0.0.1", 0), JobHandler) as server:
+        thread = threading.Thread(target=server.handle_request, daemon=True)
+        thread.start()
+        host, port = server.server_address[:2]
+        terminal = Terminal("Test Counter", "escpos", 32, f"tcp://{host}:{port}")
+
+        printed = print_receipt(RECEIPT, terminal)
+        thread.join(timeout=5)
+
+    assert jobs == [printed]
+    assert printed == render_escpos_receipt(RECEIPT, 32)
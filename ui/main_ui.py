@@ -1,15 +1,11 @@
 import streamlit as st
-import sqlite3
 import datetime
 import pandas as pd
-import io
 from fpdf import FPDF
 import os
 import sys
 import traceback
 import time
-import qrcode
-from PIL import Image
 import re
 import xlsxwriter
 import hashlib
@@ -29,14 +25,32 @@ def check_credentials(username, password):
 # --- Import custom modules ---
 # Allow importing from project root for the database connection and PDF generator
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.analytics import get_analytics
+from utils.business_day import business_date
+from utils.data_cache import bump_data_version, cache_stats, get_data_versions
+from utils.db_pool import get_pool
+from utils.db_writer import get_writer
+from utils.menu_catalog import get_menu_catalog
+from utils.migrations import bootstrap_schema
+from utils.money import format_paise, from_paise, gst_rounding, price_invoice, price_line_paise, settle
+from utils.order_export import export_order_csv, export_order_history_xlsx
+from utils.order_history import count_orders, get_history_page, get_order_lines, get_receipt
+from utils.payments import APPROVED, FINAL_STATES, get_payment_queue
+from utils.rollups import clear_rollups
+from utils.thermal_receipt import TERMINALS, get_terminal, print_receipt, render_text_receipt
+from utils.thumbnails import get_thumbnail_cache
+from utils.tracing import begin_trace, finish_trace, traced, tracing_default
+from utils.upi_qr import get_upi_qr_cache, pending_payment
 try:
     # Assuming pdf_generator.py is in a 'utils' directory relative to the script
-    from utils.pdf_generator import generate_pdf_bill
+    from utils.pdf_generator import generate_pdf_bill, get_receipt_renderer, receipt_bill
 except ImportError:
     st.error("Error: `utils.pdf_generator` module not found. PDF generation will not work. Please ensure `pdf_generator.py` is in the `utils` folder.")
     def generate_pdf_bill(*args, **kwargs):
         st.warning("PDF generation function is not available.")
         return b"PDF generation not available."
+    def get_receipt_renderer():
+        return None
 
 # --- Try to import Plotly, with a fallback if it's not installed ---
 try:
@@ -71,409 +85,208 @@ if 'logged_in' not in st.session_state:
 if 'username' not in st.session_state:
     st.session_state['username'] = ""
 
+# --- Per-rerun tracing, shown under "Database Debugging" ---
+# A rerun cut short by st.rerun()/st.stop() never reaches the end of the script, so its
+# trace is closed here, on the next run, ending at its last traced call.
+if st.session_state.get('rerun_trace') is not None:
+    finish_trace(st.session_state['rerun_trace'], interrupted=True)
+st.session_state['rerun_trace'] = None
+if st.session_state.get('trace_enabled', tracing_default()):
+    st.session_state['rerun_trace'] = begin_trace("rerun", user=st.session_state['username'])
+trace_panel = None
+
 
 # ----------------- DB Helpers -----------------
 def get_connection():
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    db_path = os.path.join(base_dir, '..', 'db', 'restaurant.db')
-    return sqlite3.connect(db_path)
-
-def setup_database():
     """
-    Sets up the initial database and tables if they don't exist.
+    Checks out this thread's pooled connection to db/restaurant.db.
+    Use as `with get_connection() as conn:`; the connection goes back to the pool afterwards.
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS menu (
-            item_id INTEGER PRIMARY KEY,
-            item_name TEXT NOT NULL UNIQUE,
-            category TEXT NOT NULL,
-            price REAL NOT NULL,
-            gst REAL NOT NULL,
-            image_url TEXT
-        );
-    """)
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS orders (
-            order_id INTEGER PRIMARY KEY,
-            mode TEXT NOT NULL,
-            payment TEXT NOT NULL,
-            timestamp TEXT NOT NULL,
-            total REAL NOT NULL
-        );
-    """)
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS order_items (
-            item_id INTEGER,
-            order_id INTEGER,
-            qty INTEGER NOT NULL,
-            total REAL NOT NULL,
-            FOREIGN KEY (item_id) REFERENCES menu (item_id),
-            FOREIGN KEY (order_id) REFERENCES orders (order_id)
-        );
-    """)
-    conn.commit()
-    conn.close()
+    return get_pool().connection()
+
+def _sanitize_menu_urls(conn, placeholder_image):
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    replaced = []
+    for item_id, image_url in conn.execute("SELECT item_id, image_url FROM menu").fetchall():
+        if isinstance(image_url, str):
+            if image_url.strip().startswith(('http', 'data:image')):
+                continue
+            if os.path.exists(os.path.join(base_dir, '..', image_url)):
+                continue
+        conn.execute("UPDATE menu SET image_url = ? WHERE item_id = ?", (placeholder_image, item_id))
+        replaced.append((item_id, image_url))
+    if replaced:
+        bump_data_version(conn, "menu")
+    return replaced
 
+@traced(rows=None)
 def sanitize_menu_image_urls():
     """
     Finds and replaces any invalid image URLs in the database with a placeholder.
     """
-    conn = get_connection()
-    cur = conn.cursor()
     placeholder_image = "https://placehold.co/100x100/600/fff?text=No+Image"
     
     try:
-        cur.execute("SELECT item_id, image_url FROM menu")
-        items = cur.fetchall()
-        count = 0
-        for item_id, image_url in items:
-            if not isinstance(image_url, str):
-                cur.execute(
-                    "UPDATE menu SET image_url = ? WHERE item_id = ?",
-                    (placeholder_image, item_id)
-                )
-                count += 1
-                continue
-            
-            is_valid_url = image_url.strip().startswith(('http', 'data:image'))
-            
-            if not is_valid_url:
-                base_dir = os.path.dirname(os.path.abspath(__file__))
-                full_path = os.path.join(base_dir, '..', image_url)
-                
-                if not os.path.exists(full_path):
-                    st.warning(f"Invalid local image path found for item {item_id}: {image_url}. Replacing with placeholder.")
-                    cur.execute(
-                        "UPDATE menu SET image_url = ? WHERE item_id = ?",
-                        (placeholder_image, item_id)
-                    )
-                    count += 1
-            
-        conn.commit()
-        if count > 0:
-            st.info(f"Automatically sanitized {count} invalid image URLs in the database on startup.")
+        replaced = get_writer().submit(_sanitize_menu_urls, placeholder_image).result()
+        for item_id, image_url in replaced:
+            if isinstance(image_url, str):
+                st.warning(f"Invalid local image path found for item {item_id}: {image_url}. Replacing with placeholder.")
+        if replaced:
+            st.info(f"Automatically sanitized {len(replaced)} invalid image URLs in the database on startup.")
     except Exception as e:
         st.error(f"Error sanitizing database: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
 
+@traced()
 def get_menu_items():
     """
-    Reads menu items from the database and sanitizes image URLs on the fly.
+    Returns the menu as a DataFrame from the in-memory catalog; reloaded only after a menu write.
     """
-    conn = get_connection()
-    df = pd.read_sql("SELECT * FROM menu", conn)
-    conn.close()
-    return df
+    return get_menu_catalog().dataframe()
 
+@traced(rows=len)
 def get_menu_dict():
     """
     Creates a dictionary of menu items for quick lookup.
     """
-    df = get_menu_items()
-    if not df.empty:
-        return df.set_index('item_id').to_dict('index')
-    return {}
-
-@st.cache_data(ttl=60)
-def get_orders(start_date=None, end_date=None, order_id=None):
-    conn = get_connection()
-    query = "SELECT * FROM orders"
-    params = []
-    where_clauses = []
-    if order_id:
-        where_clauses.append("order_id = ?")
-        params.append(order_id)
-    if start_date:
-        where_clauses.append("timestamp BETWEEN ? AND ?")
-        params.append(start_date.strftime("%Y-%m-%d %H:%M:%S"))
-        params.append(end_date.strftime("%Y-%m-%d 23:59:59"))
-    
-    if where_clauses:
-        query += " WHERE " + " AND ".join(where_clauses)
-    
-    query += " ORDER BY timestamp DESC"
-    df = pd.read_sql(query, conn, params=params)
-    conn.close()
-    return df
-
-def get_order_items(order_id: int):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT item_id, qty, total FROM order_items WHERE order_id = ?", (order_id,))
-    items = cur.fetchall()
-    conn.close()
-    return items
+    return get_menu_catalog().as_dict()
 
+@traced(rows=None)
 def save_order_to_db(order_data: dict) -> int:
-    conn = get_connection()
-    cur = conn.cursor()
-    try:
-        cur.execute(
-            """
-            INSERT INTO orders (mode, payment, timestamp, total)
-            VALUES (?, ?, ?, ?)
-            """,
-            (str(order_data['mode']), str(order_data['payment']),
-             str(order_data['timestamp']), float(order_data['total']))
-        )
-        order_id = cur.lastrowid
-        for item in order_data['items']:
-            cur.execute(
-                """
-                INSERT INTO order_items (item_id, order_id, qty, total)
-                VALUES (?, ?, ?, ?)
-                """,
-                (int(item['item_id']), int(order_id),
-                 int(item['qty']), float(item['total']))
-            )
-        conn.commit()
-        st.cache_data.clear()
-        return order_id
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+    # Queued on the single writer thread and group-committed with other sessions' orders.
+    return get_writer().insert_order(order_data).result()
+
+def _clear_orders(conn):
+    conn.execute("DELETE FROM order_items")
+    conn.execute("DELETE FROM orders")
+    clear_rollups(conn)
+    bump_data_version(conn, "orders")
 
+@traced(rows=None)
 def clear_orders_db():
-    conn = get_connection()
-    cur = conn.cursor()
     try:
-        cur.execute("DELETE FROM order_items")
-        cur.execute("DELETE FROM orders")
-        conn.commit()
-        st.success("All orders cleared successfully!")
-        st.cache_data.clear()
-        st.rerun()
+        get_writer().submit(_clear_orders).result()
     except Exception as e:
         st.error(f"Error clearing orders: {e}")
         st.code(traceback.format_exc())
-    finally:
-        conn.close()
+        return
+    st.success("All orders cleared successfully!")
+    st.rerun()
 
+def _write_menu(conn, query, params):
+    conn.execute(query, params)
+    bump_data_version(conn, "menu")
+
+@traced(rows=None)
 def add_menu_item_to_db(item_name, category, price, gst, image_url):
-    conn = get_connection()
-    cur = conn.cursor()
     try:
-        cur.execute(
+        get_writer().submit(
+            _write_menu,
             "INSERT INTO menu (item_name, category, price, gst, image_url) VALUES (?, ?, ?, ?, ?)",
             (item_name, category, price, gst, image_url)
-        )
-        conn.commit()
-        st.success(f"Item '{item_name}' added successfully!")
-        st.cache_data.clear()
-        st.rerun()
+        ).result()
     except Exception as e:
         st.error(f"Error adding menu item: {e}")
-    finally:
-        conn.close()
+        return
+    st.success(f"Item '{item_name}' added successfully!")
+    st.rerun()
 
+@traced(rows=None)
 def update_menu_item_in_db(item_id, item_name, category, price, gst, image_url):
-    conn = get_connection()
-    cur = conn.cursor()
     try:
-        cur.execute(
+        get_writer().submit(
+            _write_menu,
             """
             UPDATE menu
             SET item_name = ?, category = ?, price = ?, gst = ?, image_url = ?
             WHERE item_id = ?
             """,
             (item_name, category, price, gst, image_url, item_id)
-        )
-        conn.commit()
-        st.success(f"Item '{item_name}' updated successfully!")
-        st.cache_data.clear()
-        st.rerun()
+        ).result()
     except Exception as e:
         st.error(f"Error updating menu item: {e}")
-    finally:
-        conn.close()
+        return
+    st.success(f"Item '{item_name}' updated successfully!")
+    st.rerun()
 
+@traced(rows=None)
 def delete_menu_item_from_db(item_id):
-    conn = get_connection()
-    cur = conn.cursor()
     try:
-        cur.execute("DELETE FROM menu WHERE item_id = ?", (item_id,))
-        conn.commit()
-        st.success("Item deleted successfully!")
-        st.cache_data.clear()
-        st.rerun()
+        get_writer().submit(_write_menu, "DELETE FROM menu WHERE item_id = ?", (item_id,)).result()
     except Exception as e:
         st.error(f"Error deleting menu item: {e}")
-    finally:
-        conn.close()
-
-# --- Analytics Functions using DataFrames ---
-def get_sales_by_date(start_date, end_date):
-    conn = get_connection()
-    query = """
-    SELECT
-        DATE(timestamp) AS order_date,
-        SUM(total) AS daily_sales
-    FROM
-        orders
-    WHERE
-        timestamp BETWEEN ? AND ?
-    GROUP BY
-        order_date
-    ORDER BY
-        order_date
-    """
-    params = [start_date.strftime("%Y-%m-%d %H:%M:%S"), end_date.strftime("%Y-%m-%d 23:59:59")]
-    df = pd.read_sql(query, conn, params=params)
-    conn.close()
-    return df
-
-def get_sales_by_payment_method(start_date, end_date):
-    conn = get_connection()
-    query = """
-    SELECT
-        payment,
-        SUM(total) AS total_sales
-    FROM
-        orders
-    WHERE
-        timestamp BETWEEN ? AND ?
-    GROUP BY
-        payment
+        return
+    st.success("Item deleted successfully!")
+    st.rerun()
+
+# --- Payment Status Polling ---
+@st.fragment(run_every=1.0)
+def payment_status_poller(payment_id):
     """
-    params = [start_date.strftime("%Y-%m-%d %H:%M:%S"), end_date.strftime("%Y-%m-%d 23:59:59")]
-    df = pd.read_sql(query, conn, params=params)
-    conn.close()
-    return df
-
-def get_total_revenue(start_date, end_date):
-    conn = get_connection()
-    query = "SELECT SUM(total) FROM orders WHERE timestamp BETWEEN ? AND ?"
-    params = [start_date.strftime("%Y-%m-%d %H:%M:%S"), end_date.strftime("%Y-%m-%d 23:59:59")]
-    total_revenue = pd.read_sql(query, conn, params=params).iloc[0, 0]
-    conn.close()
-    return total_revenue if total_revenue is not None else 0
-
-def get_num_orders(start_date, end_date):
-    conn = get_connection()
-    query = "SELECT COUNT(*) FROM orders WHERE timestamp BETWEEN ? AND ?"
-    params = [start_date.strftime("%Y-%m-%d %H:%M:%S"), end_date.strftime("%Y-%m-%d 23:59:59")]
-    num_orders = pd.read_sql(query, conn, params=params).iloc[0, 0]
-    conn.close()
-    return num_orders
-
-def get_sales_by_category(start_date, end_date):
-    conn = get_connection()
-    menu_items_df = get_menu_items()
-    
-    query = """
-    SELECT
-        oi.item_id,
-        oi.qty
-    FROM
-        order_items oi
-    JOIN
-        orders o ON oi.order_id = o.order_id
-    WHERE
-        o.timestamp BETWEEN ? AND ?
+    Re-checks a queued payment every second without rerunning the page, then reruns the
+    page once the payment has an outcome.
     """
-    params = [start_date.strftime("%Y-%m-%d %H:%M:%S"), end_date.strftime("%Y-%m-%d %H:%M:%S")]
-    order_items_df = pd.read_sql(query, conn, params=params)
-    conn.close()
-    
-    if order_items_df.empty:
-        return pd.DataFrame(columns=['category', 'total_sales'])
-        
-    merged_df = pd.merge(order_items_df, menu_items_df, on='item_id')
-    merged_df['total_sales'] = merged_df['qty'] * merged_df['price']
-    
-    category_sales = merged_df.groupby('category')['total_sales'].sum().reset_index()
-    return category_sales
-
-@st.cache_data
-def get_most_sold_items(start_date=None, end_date=None, top_n=5):
-    conn = get_connection()
-    cur = conn.cursor()
-    query = """
-    SELECT
-        oi.item_id,
-        SUM(oi.qty) as total_qty_sold
-    FROM
-        order_items oi
-    JOIN
-        orders o ON oi.order_id = o.order_id
+    status = get_payment_queue().status(payment_id)
+    if status is None or status.state in FINAL_STATES:
+        st.rerun()
+    st.caption(f"⏳ Waiting for the payment gateway ({status.state})...")
+
+def live_gateway_payment():
     """
-    params = []
-    if start_date and end_date:
-        query += " WHERE o.timestamp BETWEEN ? AND ?"
-        params.append(start_date.strftime("%Y-%m-%d %H:%M:%S"))
-        params.append(end_date.strftime("%Y-%m-%d 23:59:59"))
-    query += """
-    GROUP BY
-        oi.item_id
-    ORDER BY
-        total_qty_sold DESC
-    LIMIT ?
+    Returns the PaymentStatus of this order's card charge or UPI collect while it is in
+    flight or approved, else None. Such a payment pins the order's amount and payment
+    method until it is finalized or explicitly cancelled.
     """
-    params.append(top_n)
-    cur.execute(query, tuple(params))
-    most_sold = cur.fetchall()
-    conn.close()
-    
-    menu_df = get_menu_items()
-    menu_dict = menu_df.set_index('item_id')['item_name'].to_dict() if not menu_df.empty else {}
-    
-    return [(menu_dict.get(item_id, f"Item {item_id}"), qty) for item_id, qty in most_sold]
-
-# --- UPI QR Code Generation Function ---
-def generate_upi_qr_code(amount):
+    payments = get_payment_queue()
+    if payments is None:
+        return None
+    for key in ('card_payment_id', 'upi_payment_id'):
+        status = payments.status(st.session_state.get(key))
+        if status is not None and (status.state == APPROVED or status.state not in FINAL_STATES):
+            return status
+    return None
+
+def cancel_payment_controls(status):
     """
-    Generates a UPI payment QR code as a PIL Image.
+    Offers to drop a live gateway payment so the order can be changed and paid again,
+    telling the cashier what has to be voided with the provider by hand.
     """
-    upi_id = "your_upi_id@bank"
-    business_name = "Imperial Spice"
-    
-    txn_id = f"TXN{datetime.datetime.now().strftime('%Y%m%d%H%M%S%f')}"
-    
-    upi_link = f"upi://pay?pa={upi_id}&pn={business_name}&am={amount:.2f}&tid={txn_id}&cu=INR"
-    
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(upi_link)
-    qr.make(fit=True)
-    
-    img = qr.make_image(fill_color="black", back_color="white")
-    return img
+    amount = format_paise(status.amount_paise)
+    if status.state == APPROVED:
+        st.warning(f"The {status.method} payment of {amount} was approved (reference {status.reference}). Cancelling it here does not refund it: void it with the payment provider.")
+    else:
+        st.warning(f"The {status.method} payment of {amount} is still {status.state}. If it is approved after you cancel, void transaction {status.txn_id} with the payment provider.")
+    if st.button("Cancel Payment", key="cancel_gateway_payment"):
+        for key in ('upi_payment', 'upi_payment_id', 'card_payment_id'):
+            st.session_state.pop(key, None)
+        st.session_state['payment_method_selected'] = None
+        st.rerun()
 
-def pil_to_bytes(img):
+# --- UPI QR Code Generation Function ---
+@traced(rows=None)
+def generate_upi_qr_code(payment):
     """
-    Converts a PIL Image object to a byte stream.
+    Returns the UPI payment QR for a PendingPayment as PNG bytes, encoded once per
+    (amount, txn id) and served from the QR cache on reruns.
     """
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    buf.seek(0)
-    return buf
+    return get_upi_qr_cache().png(payment.link)
 
 # ----------------- CSV & PDF Download -----------------
-def generate_csv(order_id: int) -> str:
-    conn = get_connection()
-    query = """
-    SELECT m.item_name, oi.qty, oi.total
-    FROM order_items oi
-    JOIN menu m ON oi.item_id = m.item_id
-    WHERE oi.order_id = ?
+@traced(rows=None)
+def get_receipt_pdf(receipt):
+    """
+    Returns the PDF receipt for a stored order, rendered once per (order_id, data version).
     """
-    df = pd.read_sql(query, conn, params=(order_id,))
-    conn.close()
-    return df.to_csv(index=False)
+    renderer = get_receipt_renderer()
+    if renderer is None:
+        return generate_pdf_bill()
+    day = business_date(receipt["timestamp"])
+    with get_connection() as conn:
+        version = get_data_versions(conn, ("orders",), day, day)
+    return renderer.render(receipt["order_id"], version, **receipt_bill(receipt))
 
-# --- Ensure DB setup runs on first load ---
-setup_database()
-sanitize_menu_image_urls()
+# --- Ensure DB setup runs once per process, not on every rerun ---
+if bootstrap_schema(get_pool()):
+    sanitize_menu_image_urls()
 
 
 # ----------------- UI -----------------
@@ -601,16 +414,36 @@ else:
     st.sidebar.markdown("---")
     st.sidebar.title("Navigation")
     page = st.sidebar.radio("Go to", ["Place Order", "Menu Management", "Order History", "Analytics Dashboard"], key='navigation_radio')
+    terminal = get_terminal(st.sidebar.selectbox("Receipt Printer", list(TERMINALS), key='terminal_select'))
+    if st.session_state['rerun_trace'] is not None:
+        st.session_state['rerun_trace'].meta['page'] = page
 
     st.sidebar.markdown("---")
     st.sidebar.subheader("Database Debugging")
     if st.sidebar.button("Show Raw Menu Data"):
-        conn = get_connection()
-        raw_menu_df = pd.read_sql("SELECT * FROM menu", conn)
-        conn.close()
+        with get_connection() as conn:
+            raw_menu_df = pd.read_sql("SELECT * FROM menu", conn)
         st.session_state.debug_menu = raw_menu_df
     if st.session_state.debug_menu is not None:
         st.sidebar.dataframe(st.session_state.debug_menu)
+    with st.sidebar.expander("Connection Pool Stats"):
+        st.json(get_pool().stats())
+    with st.sidebar.expander("Writer Queue"):
+        st.json(get_writer().stats())
+    if get_payment_queue() is not None:
+        with st.sidebar.expander("Payment Queue"):
+            st.json(get_payment_queue().stats())
+    with st.sidebar.expander("Cache Stats"):
+        st.dataframe(pd.DataFrame(cache_stats()), hide_index=True)
+        if get_receipt_renderer() is not None:
+            st.caption("Receipt PDFs")
+            st.json(get_receipt_renderer().stats())
+        st.caption("UPI QR codes")
+        st.json(get_upi_qr_cache().stats())
+    st.sidebar.toggle("Trace reruns", value=tracing_default(), key='trace_enabled',
+                      help="Time database, analytics, PDF and QR calls on every rerun; also logged to logs/trace.jsonl.")
+    # Filled at the end of the script, once this rerun's trace is complete.
+    trace_panel = st.sidebar.container()
     
     # ----------------- Place Order Page -----------------
     if page == "Place Order":
@@ -624,52 +457,32 @@ else:
                 order_id = st.session_state['last_order_id']
                 st.download_button(
                     label="📥 Download Receipt (CSV)",
-                    data=generate_csv(order_id),
+                    data=export_order_csv(order_id),
                     file_name=f"receipt_order_{order_id}.csv",
                     mime="text/csv"
                 )
                 
-                orders_df = get_orders(order_id=order_id)
-                if not orders_df.empty:
-                    order_details = orders_df.iloc[0]
-                    items_raw = get_order_items(order_id)
-                    menu_dict = get_menu_dict()
-
-                    order_items_for_pdf = []
-                    subtotal_before_gst = 0
-                    gst_amount = 0
-                    for item_id, qty, item_total_with_gst in items_raw:
-                        item_details = menu_dict.get(item_id, {})
-                        unit_price = item_details.get("price", 0)
-                        item_name = item_details.get("item_name", f"Item {item_id}")
-                        
-                        base_total_for_item = unit_price * qty
-                        gst_for_item = item_total_with_gst - base_total_for_item
-                        
-                        subtotal_before_gst += base_total_for_item
-                        gst_amount += gst_for_item
-
-                        order_items_for_pdf.append({
-                            "item": item_name,
-                            "qty": qty,
-                            "price": unit_price,
-                            "total": item_total_with_gst
-                        })
-
-                    final_total_from_db = float(order_details['total'])
-                    discount_for_pdf = 0
-                    
+                receipt = get_receipt(order_id)
+                if receipt is not None and terminal.backend != "pdf":
                     try:
-                        pdf_bytes = generate_pdf_bill(
-                            order_id=order_id,
-                            order_items=order_items_for_pdf,
-                            subtotal=subtotal_before_gst, 
-                            gst=gst_amount,
-                            discount=discount_for_pdf,
-                            total=final_total_from_db,
-                            payment_method=order_details['payment'],
-                            mode=order_details['mode']
+                        # Print once per order; reruns of this screen only reprint on request.
+                        reprint = st.button("🖨️ Reprint Receipt")
+                        if reprint or st.session_state.get('printed_order_id') != order_id:
+                            print_receipt(receipt, terminal)
+                            st.session_state['printed_order_id'] = order_id
+                            if terminal.printer:
+                                st.info(f"🖨️ Receipt sent to {terminal.name}.")
+                        st.download_button(
+                            label="📥 Download Receipt (Text)",
+                            data=render_text_receipt(receipt, terminal.width),
+                            file_name=f"receipt_order_{order_id}.txt",
+                            mime="text/plain"
                         )
+                    except OSError as e:
+                        st.error(f"Could not reach the {terminal.name} printer: {e}")
+                elif receipt is not None:
+                    try:
+                        pdf_bytes = get_receipt_pdf(receipt)
                         
                         st.download_button(
                             label="📥 Download Receipt (PDF)",
@@ -689,124 +502,185 @@ else:
                     st.session_state['payment_method_selected'] = None
                     st.session_state['is_order_submitted'] = False
                     st.session_state.pop('last_order_id', None)
-                    st.cache_data.clear()
                     st.rerun()
         else:
+            # A card charge or UPI collect that is in flight or approved locks the cart, discount,
+            # tip and payment method, so the order cannot drift away from what was charged.
+            live_payment = live_gateway_payment()
+            order_locked = live_payment is not None
+
             order_mode = st.radio("Select Order Mode:", ["Dine-In", "Takeaway"], key='order_mode_radio')
             st.write(f"📝 Current Mode: **{order_mode}**")
         
-            menu_items_df = get_menu_items()
+            # One version check per rerun; every lookup below reads this snapshot.
+            menu = get_menu_catalog().snapshot()
         
             st.subheader("📋 Select Items")
-            all_categories = sorted(list(set(menu_items_df['category'])))
+            all_categories = menu.categories
             selected_category = st.selectbox("Select a Category:", all_categories, index=0, key='category_select')
-            display_items = menu_items_df[menu_items_df['category'] == selected_category]
+            display_items = menu.by_category.get(selected_category, [])
             
             base_dir = os.path.dirname(os.path.abspath(__file__))
 
-            for index, row in display_items.iterrows():
+            # Resolve every row's image source first so all thumbnail misses download in one parallel batch.
+            image_sources = {}
+            for row in display_items:
+                image_url = row['image_url']
+                if isinstance(image_url, str) and image_url.strip().startswith(('http', 'data:image')):
+                    image_sources[row['item_id']] = image_url.strip()
+                else:
+                    local_path_candidate = os.path.join(base_dir, '..', image_url if isinstance(image_url, str) else "")
+                    image_sources[row['item_id']] = local_path_candidate if os.path.isfile(local_path_candidate) else None
+            thumbnails = get_thumbnail_cache().get_many(image_sources.values())
+
+            for row in display_items:
                 item_id = row['item_id']
                 if item_id not in st.session_state['selected_quantities']:
                     st.session_state['selected_quantities'][item_id] = 0
                 
                 col_img, col_info, col_qty = st.columns([1, 3, 2])
                 
-                image_url = row['image_url']
-                if isinstance(image_url, str) and image_url.strip().startswith(('http', 'data:image')):
-                    image_to_display = image_url
-                else:
-                    local_path_candidate = os.path.join(base_dir, '..', image_url if isinstance(image_url, str) else "")
-                    if os.path.exists(local_path_candidate):
-                        image_to_display = local_path_candidate
-                    else:
-                        image_to_display = "https://placehold.co/100x100/600/fff?text=No+Image"
-                
                 with col_img:
-                    st.image(image_to_display, width=80, caption=row['item_name'])
+                    st.image(thumbnails[image_sources[item_id]], width=80, caption=row['item_name'])
                 with col_info:
                     st.markdown(f"**{row['item_name']}** - ₹{row['price']}")
                 with col_qty:
-                    qty = st.number_input(f"Qty for {row['item_name']}", min_value=0, max_value=20, step=1, key=f"qty_{item_id}", value=st.session_state['selected_quantities'][item_id])
+                    qty = st.number_input(f"Qty for {row['item_name']}", min_value=0, max_value=20, step=1, key=f"qty_{item_id}", value=st.session_state['selected_quantities'][item_id], disabled=order_locked)
                     st.session_state['selected_quantities'][item_id] = qty
                 
                 if qty > 0:
-                    base_total = float(row['price']) * int(qty)
-                    gst_amount = base_total * float(row['gst']) / 100.0
-                    item_total = base_total + gst_amount
-                    st.markdown(f"**Price:** ₹{base_total:.2f} + **GST ({row['gst']}%):** ₹{gst_amount:.2f} = **₹{item_total:.2f}**")
+                    base_paise, gst_paise, item_total_paise = price_line_paise(row['price'], row['gst'], qty)
+                    st.markdown(f"**Price:** {format_paise(base_paise)} + **GST ({row['gst']}%):** {format_paise(gst_paise)} = **{format_paise(item_total_paise)}**")
         
-            selected_items = []
+            selected_lines = []
             for item_id, qty in st.session_state['selected_quantities'].items():
-                if qty > 0:
-                    item_details = menu_items_df[menu_items_df['item_id'] == item_id].iloc[0]
-                    base_total = float(item_details['price']) * int(qty)
-                    gst_amount = base_total * float(item_details['gst']) / 100.0
-                    item_total = base_total + gst_amount
-                    selected_items.append({
-                        "item_id": int(item_id),
-                        "name": str(item_details['item_name']),
-                        "qty": int(qty),
-                        "unit_price": float(item_details['price']),
-                        "gst": float(item_details['gst']),
-                        "gst_amount": round(gst_amount, 2),
-                        "total": round(item_total, 2),
-                    })
+                item_details = menu.by_id.get(item_id) if qty > 0 else None
+                if item_details is not None:
+                    selected_lines.append((item_id, qty, item_details))
+
+            # Price every selected line in one vectorized call, exactly in paise, under the
+            # configured GST rounding policy.
+            invoice = price_invoice(
+                [details['price'] for _, _, details in selected_lines],
+                [details['gst'] for _, _, details in selected_lines],
+                [qty for _, qty, _ in selected_lines],
+                rounding=gst_rounding(),
+            )
+            selected_items = []
+            for (item_id, qty, item_details), gst_paise, total_paise in zip(selected_lines, invoice.gst.tolist(), invoice.line_total.tolist()):
+                selected_items.append({
+                    "item_id": int(item_id),
+                    "name": str(item_details['item_name']),
+                    "qty": int(qty),
+                    "category": str(item_details['category']),
+                    "unit_price": float(item_details['price']),
+                    "gst": float(item_details['gst']),
+                    "gst_amount": from_paise(gst_paise),
+                    "total": from_paise(total_paise),
+                    "total_paise": total_paise,
+                })
 
             if selected_items:
                 st.subheader("🧾 Order Summary")
                 for item in selected_items:
-                    st.write(f"{item['name']} x {item['qty']} = ₹{item['total']} (incl. ₹{item['gst_amount']} GST)")
-                grand_total = sum(item["total"] for item in selected_items)
+                    st.write(f"{item['name']} x {item['qty']} = ₹{item['total']:.2f} (incl. ₹{item['gst_amount']:.2f} GST)")
                 
                 st.markdown("---")
-                discount_pct = st.number_input("💸 Enter Discount % (if any)", min_value=0.0, max_value=100.0, value=0.0, step=0.5, key='discount_input')
-                discount_amount = grand_total * discount_pct / 100.0
-                total_after_discount = grand_total - discount_amount
-                tip_pct = st.number_input("💰 Enter Tip % (optional)", min_value=0.0, max_value=100.0, value=0.0, step=0.5, key='tip_input')
-                tip_amount = total_after_discount * tip_pct / 100.0
-                final_total = total_after_discount + tip_amount
+                discount_pct = st.number_input("💸 Enter Discount % (if any)", min_value=0.0, max_value=100.0, value=0.0, step=0.5, key='discount_input', disabled=order_locked)
+                tip_pct = st.number_input("💰 Enter Tip % (optional)", min_value=0.0, max_value=100.0, value=0.0, step=0.5, key='tip_input', disabled=order_locked)
+                grand_total_paise = sum(item["total_paise"] for item in selected_items)
+                discount_paise, tip_paise, final_total_paise = settle(grand_total_paise, discount_pct, tip_pct)
+                final_total = from_paise(final_total_paise)
                 
-                st.markdown(f"### 💵 Total before discount: ₹{grand_total:.2f}")
-                st.markdown(f"### 🔖 Discount ({discount_pct}%): -₹{discount_amount:.2f}")
-                st.markdown(f"### 💸 Tip ({tip_pct}%): +₹{tip_amount:.2f}")
-                st.markdown(f"### 💰 Total Payable: ₹{final_total:.2f}")
+                st.markdown(f"### 💵 Total before discount: {format_paise(grand_total_paise)}")
+                st.markdown(f"### 🔖 Discount ({discount_pct}%): -{format_paise(discount_paise)}")
+                st.markdown(f"### 💸 Tip ({tip_pct}%): +{format_paise(tip_paise)}")
+                st.markdown(f"### 💰 Total Payable: {format_paise(final_total_paise)}")
                 
                 st.markdown("---")
                 st.subheader("💳 Select Payment Method")
                 
                 col_cash, col_card, col_upi = st.columns(3)
                 with col_cash:
-                    if st.button("Pay with Cash", use_container_width=True, key="pay_cash_button"):
+                    if st.button("Pay with Cash", use_container_width=True, key="pay_cash_button", disabled=order_locked):
                         st.session_state['payment_method_selected'] = "Cash"
                 with col_card:
-                    if st.button("Pay with Card", use_container_width=True, key="pay_card_button"):
+                    if st.button("Pay with Card", use_container_width=True, key="pay_card_button", disabled=order_locked):
                         st.session_state['payment_method_selected'] = "Card"
                 with col_upi:
-                    if st.button("Pay with UPI", use_container_width=True, key="pay_upi_button"):
+                    if st.button("Pay with UPI", use_container_width=True, key="pay_upi_button", disabled=order_locked):
                         st.session_state['payment_method_selected'] = "UPI"
-                
-                if st.session_state['payment_method_selected'] == "UPI" and not st.session_state['is_order_submitted']:
+                if order_locked:
+                    st.session_state['payment_method_selected'] = live_payment.method
+
+                if order_locked and live_payment.amount_paise != final_total_paise:
+                    # An edit made just before the lock took effect, or a menu price change, can
+                    # still move the total. Never charge again on top of the live payment; the
+                    # cashier cancels it below instead.
+                    st.error(f"The total is now {format_paise(final_total_paise)}, but the {live_payment.method} payment was for {format_paise(live_payment.amount_paise)}. Cancel the payment to charge the new total.")
+
+                elif st.session_state['payment_method_selected'] == "UPI" and not st.session_state['is_order_submitted']:
                     st.info("Scan the QR code to pay with UPI")
+                    # The txn id is minted once per pending payment and only changes with the amount.
+                    upi_payment = pending_payment(st.session_state.get('upi_payment'), final_total_paise)
+                    st.session_state['upi_payment'] = upi_payment
                     try:
-                        qr_img = generate_upi_qr_code(final_total)
-                        st.image(pil_to_bytes(qr_img), width=250, caption="Scan to Pay")
+                        st.image(generate_upi_qr_code(upi_payment), width=250, caption=f"Scan to Pay · {upi_payment.txn_id}")
                     except Exception as e:
                         st.error(f"Error generating QR code: {e}")
                     
+                    # Without a gateway the cashier confirms with the button below. With one, the
+                    # collect request's outcome is watched in the background and the button is
+                    # the fallback for payments the gateway cannot see. A new txn id, and so a
+                    # new collect, only comes with a new amount, which cannot happen while a
+                    # collect is live (see the mismatch check above).
+                    payments = get_payment_queue()
+                    if payments is not None:
+                        upi_status = payments.status(st.session_state.get('upi_payment_id'))
+                        if upi_status is None or upi_status.txn_id != upi_payment.txn_id:
+                            st.session_state['upi_payment_id'] = payments.submit("UPI", final_total_paise, upi_payment.txn_id)
+                            upi_status = payments.status(st.session_state['upi_payment_id'])
+                        if upi_status.state == APPROVED:
+                            st.session_state['is_order_submitted'] = True
+                            st.session_state['payment_method'] = "UPI"
+                        elif upi_status.state in FINAL_STATES:
+                            st.warning(f"UPI payment not confirmed by the gateway ({upi_status.message}). Confirm it manually once the customer shows the payment.")
+                        else:
+                            payment_status_poller(upi_status.payment_id)
+
                     st.markdown("---")
                     
                     if st.button("Confirm UPI Payment", key="confirm_upi_payment"):
                         st.session_state['is_order_submitted'] = True
                         st.session_state['payment_method'] = "UPI"
                 
-                elif st.session_state['payment_method_selected'] == "Card":
-                    st.info("Simulating card payment...")
-                    with st.spinner('Processing payment...'):
-                        time.sleep(2)
-                    st.success("Card payment successful!")
-                    if st.button("Finalize Order", key="finalize_card_payment"):
+                elif st.session_state['payment_method_selected'] == "Card" and get_payment_queue() is None:
+                    st.info("Charge the card on the terminal, then confirm.")
+                    if st.button("Confirm Card Payment", key="confirm_card_payment"):
                         st.session_state['is_order_submitted'] = True
                         st.session_state['payment_method'] = "Card"
+
+                elif st.session_state['payment_method_selected'] == "Card":
+                    payments = get_payment_queue()
+                    card_status = payments.status(st.session_state.get('card_payment_id'))
+                    # Charged once per click of Pay with Card or Retry; an amount change never
+                    # resubmits, since the order is locked while the charge is live.
+                    if card_status is None:
+                        st.session_state['card_payment_id'] = payments.submit("Card", final_total_paise)
+                        card_status = payments.status(st.session_state['card_payment_id'])
+                    if card_status.state == APPROVED:
+                        st.success("Card payment successful!")
+                        if st.button("Finalize Order", key="finalize_card_payment"):
+                            st.session_state['is_order_submitted'] = True
+                            st.session_state['payment_method'] = "Card"
+                    elif card_status.state in FINAL_STATES:
+                        st.error(f"Card payment {card_status.state}: {card_status.message}")
+                        if st.button("Retry Card Payment", key="retry_card_payment"):
+                            st.session_state.pop('card_payment_id', None)
+                            st.rerun()
+                    else:
+                        st.info("Processing card payment...")
+                        payment_status_poller(card_status.payment_id)
                 
                 elif st.session_state['payment_method_selected'] == "Cash":
                     st.info("Waiting for cash payment...")
@@ -814,6 +688,11 @@ else:
                         st.session_state['is_order_submitted'] = True
                         st.session_state['payment_method'] = "Cash"
 
+                live_payment = live_gateway_payment()
+                if live_payment is not None and not st.session_state['is_order_submitted']:
+                    with st.expander("Change the order or payment method", expanded=live_payment.amount_paise != final_total_paise):
+                        cancel_payment_controls(live_payment)
+
                 if st.session_state['is_order_submitted']:
                     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
@@ -821,7 +700,12 @@ else:
                         "mode": order_mode,
                         "payment": st.session_state['payment_method'],
                         "timestamp": timestamp,
-                        "total": round(final_total, 2),
+                        "total": final_total,
+                        "total_paise": final_total_paise,
+                        "subtotal_paise": grand_total_paise,
+                        "discount_paise": discount_paise,
+                        "tip_paise": tip_paise,
+                        "txn_id": st.session_state['upi_payment'].txn_id if st.session_state['payment_method'] == "UPI" else None,
                         "items": selected_items,
                     }
         
@@ -832,7 +716,8 @@ else:
                         
                         st.session_state['is_order_submitted'] = False
                         st.session_state['payment_method_selected'] = None
-                        st.cache_data.clear()
+                        for key in ('upi_payment', 'upi_payment_id', 'card_payment_id'):
+                            st.session_state.pop(key, None)
                         st.rerun()
         
                     except Exception as e:
@@ -847,13 +732,11 @@ else:
 
         st.subheader("Add / Edit Menu Item")
 
-        menu_df = get_menu_items()
+        menu = get_menu_catalog().snapshot()
         edit_item = None
         if st.session_state['edit_item_id']:
-            edit_items_filtered = menu_df[menu_df['item_id'] == st.session_state['edit_item_id']]
-            if not edit_items_filtered.empty:
-                edit_item = edit_items_filtered.iloc[0]
-            else:
+            edit_item = menu.by_id.get(st.session_state['edit_item_id'])
+            if edit_item is None:
                 st.session_state['edit_item_id'] = None
                 st.warning("Selected item for editing was not found. Please select an existing item.")
 
@@ -887,8 +770,8 @@ else:
 
         st.subheader("Current Menu Items")
 
-        menu_items = get_menu_items()
-        if menu_items.empty:
+        menu_items = menu.items
+        if not menu_items:
             st.info("No menu items found. Add one using the form above.")
         else:
             header_cols = st.columns([0.5, 3, 1, 1, 1, 1, 1])
@@ -902,7 +785,7 @@ else:
             
             st.markdown("---")
 
-            for index, row in menu_items.iterrows():
+            for row in menu_items:
                 cols = st.columns([0.5, 3, 1, 1, 1, 1, 1])
 
                 item_id = row['item_id']
@@ -937,79 +820,74 @@ else:
     elif page == "Order History":
         st.title("🕘 Order History")
         
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns([2, 2, 1])
         with col1:
             start_date = st.date_input("Start Date", value=datetime.date.today() - datetime.timedelta(days=7), key="history_start_date")
         with col2:
             end_date = st.date_input("End Date", value=datetime.date.today(), key="history_end_date")
+        with col3:
+            page_size = st.selectbox("Per page", [10, 25, 50, 100], index=1, key="history_page_size")
+
+        # Cursors of the pages visited so far; reset whenever the filter changes.
+        history_filter = (start_date, end_date, page_size)
+        if st.session_state.get("history_filter") != history_filter:
+            st.session_state.history_filter = history_filter
+            st.session_state.history_cursors = [None]
+        cursors = st.session_state.history_cursors
+
+        total_orders = count_orders(start_date, end_date)
         
-        orders_df = get_orders(start_date=start_date, end_date=end_date)
-        
-        if orders_df.empty:
+        if total_orders == 0:
             st.info("No orders found for the selected period.")
         else:
+            history_page = get_history_page(start_date, end_date, page_size=page_size, cursor=cursors[-1])
+            page_number = len(cursors)
+            first = (page_number - 1) * page_size + 1
+
             st.subheader("📋 Filtered Order Details")
-            st.write(f"Showing {len(orders_df)} orders from {start_date} to {end_date}")
-            menu_dict_full = get_menu_dict()
-            
-            all_orders_data = []
+            st.write(f"Showing orders {first}–{first + len(history_page.orders) - 1} of {total_orders} from {start_date} to {end_date}")
 
-            for _, order in orders_df.iterrows():
+            # Line items are only fetched for the orders whose items are toggled open, in one query.
+            shown_ids = [o["order_id"] for o in history_page.orders if st.session_state.get(f"history_items_{o['order_id']}")]
+            order_lines = get_order_lines(shown_ids)
+
+            for order in history_page.orders:
                 with st.expander(
                     f"Order #{order['order_id']} | {order['mode']} | {order['payment']} | ₹{order['total']:.2f}"
                 ):
                     st.write(f"Timestamp: {order['timestamp']}")
-                    items_raw = get_order_items(int(order['order_id']))
-                    
-                    order_items_for_display = []
-                    subtotal_before_gst = 0
-                    gst_amount = 0
-                    
-                    for item_id, qty, total_item_with_gst in items_raw:
-                        item_name = menu_dict_full.get(item_id, {}).get("item_name", f"Item {item_id}")
-                        unit_price = menu_dict_full.get(item_id, {}).get("price", 0)
-
-                        base_total_for_item = unit_price * qty
-                        gst_for_item = total_item_with_gst - base_total_for_item
-                        
-                        subtotal_before_gst += base_total_for_item
-                        gst_amount += gst_for_item
-                        
-                        order_items_for_display.append({
-                            "Item Name": item_name,
-                            "Qty": qty,
-                            "Unit Price": unit_price,
-                            "Item Total": total_item_with_gst
-                        })
-
-                        all_orders_data.append({
-                            "Order ID": order['order_id'],
-                            "Timestamp": order['timestamp'],
-                            "Mode": order['mode'],
-                            "Payment": order['payment'],
-                            "Item Name": item_name,
-                            "Qty": qty,
-                            "Unit Price": unit_price,
-                            "Total (with GST)": total_item_with_gst,
-                            "Order Total": order['total']
-                        })
-                    
-                    st.dataframe(pd.DataFrame(order_items_for_display), use_container_width=True, hide_index=True)
+                    if st.toggle("Show items", key=f"history_items_{order['order_id']}"):
+                        order_items_for_display = [
+                            {
+                                "Item Name": line["item_name"],
+                                "Qty": line["qty"],
+                                "Unit Price": line["unit_price"],
+                                "Item Total": line["total"]
+                            }
+                            for line in order_lines.get(order["order_id"], [])
+                        ]
+                        st.dataframe(pd.DataFrame(order_items_for_display), use_container_width=True, hide_index=True)
                     st.markdown(f"**Order Total:** ₹{order['total']:.2f}")
 
-            if not orders_df.empty:
-                full_export_df = pd.DataFrame(all_orders_data)
-                
-                output = io.BytesIO()
-                with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                    full_export_df.to_excel(writer, sheet_name='Order History', index=False)
-                
-                st.download_button(
-                    label="📥 Download Order History (Excel)",
-                    data=output.getvalue(),
-                    file_name=f"order_history_{start_date}_to_{end_date}.xlsx",
-                    mime="application/vnd.ms-excel"
-                )
+            prev_col, page_col, next_col = st.columns([1, 2, 1])
+            with prev_col:
+                if st.button("⬅️ Previous", disabled=page_number == 1, key="history_prev"):
+                    cursors.pop()
+                    st.rerun()
+            with page_col:
+                st.markdown(f"Page {page_number} of {-(-total_orders // page_size)}")
+            with next_col:
+                if st.button("Next ➡️", disabled=history_page.next_cursor is None, key="history_next"):
+                    cursors.append(history_page.next_cursor)
+                    st.rerun()
+
+            # The workbook is only built when the button is clicked, streamed from the database.
+            st.download_button(
+                label="📥 Download Order History (Excel)",
+                data=lambda: export_order_history_xlsx(start_date, end_date),
+                file_name=f"order_history_{start_date}_to_{end_date}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
 
     # ----------------- Analytics Dashboard -----------------
     elif page == "Analytics Dashboard":
@@ -1022,8 +900,9 @@ else:
         with col2:
             end_date = st.date_input("End Date", value=datetime.date.today(), key="analytics_end_date")
         
-        total_revenue = get_total_revenue(start_date, end_date)
-        num_orders = get_num_orders(start_date, end_date)
+        analytics = get_analytics(start_date, end_date, top_n=5)
+        total_revenue = analytics.total_revenue
+        num_orders = analytics.num_orders
         
         col_rev, col_orders, col_avg = st.columns(3)
         with col_rev:
@@ -1031,13 +910,12 @@ else:
         with col_orders:
             st.metric(label="Total Orders", value=num_orders)
         with col_avg:
-            avg_order_value = total_revenue / num_orders if num_orders > 0 else 0
-            st.metric(label="Avg. Order Value", value=f"₹{avg_order_value:,.2f}")
+            st.metric(label="Avg. Order Value", value=f"₹{analytics.avg_order_value:,.2f}")
 
         st.markdown("---")
         
         st.subheader("Daily Sales Trend")
-        sales_by_date_df = get_sales_by_date(start_date, end_date)
+        sales_by_date_df = analytics.daily_sales
         if not sales_by_date_df.empty:
             if plotly_available:
                 fig_daily_sales = px.line(sales_by_date_df, x='order_date', y='daily_sales', markers=True, title="Daily Sales")
@@ -1053,7 +931,7 @@ else:
         col_charts_1, col_charts_2 = st.columns(2)
         with col_charts_1:
             st.subheader("Sales by Payment Method")
-            sales_by_payment_df = get_sales_by_payment_method(start_date, end_date)
+            sales_by_payment_df = analytics.payment_sales
             if not sales_by_payment_df.empty:
                 if plotly_available:
                     fig_payment = px.pie(sales_by_payment_df, values='total_sales', names='payment', title='Sales by Payment Method')
@@ -1065,7 +943,7 @@ else:
 
         with col_charts_2:
             st.subheader("Sales by Category")
-            sales_by_category_df = get_sales_by_category(start_date, end_date)
+            sales_by_category_df = analytics.category_sales
             if not sales_by_category_df.empty:
                 if plotly_available:
                     fig_category = px.bar(sales_by_category_df, x='category', y='total_sales', title='Sales by Category')
@@ -1079,7 +957,7 @@ else:
         st.markdown("---")
         
         st.subheader("Top 5 Most Sold Items")
-        most_sold_items = get_most_sold_items(start_date, end_date, top_n=5)
+        most_sold_items = analytics.top_items
         if most_sold_items:
             most_sold_df = pd.DataFrame(most_sold_items, columns=["Item Name", "Total Quantity Sold"])
             if plotly_available:
@@ -1088,4 +966,14 @@ else:
             else:
                 st.bar_chart(most_sold_df.set_index('Item Name'))
         else:
-            st.info("No sales data available to determine most sold items.")
\ No newline at end of file
+            st.info("No sales data available to determine most sold items.")
+
+# --- Close this rerun's trace and show it under "Database Debugging" ---
+if st.session_state['rerun_trace'] is not None:
+    rerun_trace = finish_trace(st.session_state['rerun_trace'])
+    st.session_state['rerun_trace'] = None
+    if trace_panel is not None:
+        with trace_panel.expander("Rerun Timings", expanded=True):
+            st.caption(f"{rerun_trace.seconds * 1000:.0f} ms, {len(rerun_trace.spans)} traced calls")
+            st.dataframe(pd.DataFrame(rerun_trace.summary()).round(1).astype({'calls': 'Int64', 'rows': 'Int64'}), hide_index=True)
+            st.code("\n".join(rerun_trace.flame()), language=None)
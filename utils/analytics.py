@@ -0,0 +1,120 @@
+from collections import defaultdict, namedtuple
+
+import pandas as pd
+
+from utils.data_cache import cached
+from utils.db_pool import get_pool
+from utils.tracing import traced
+
+# Everything the Analytics Dashboard shows for one date range. Amounts are rupees;
+# the DataFrames are shaped for the dashboard charts.
+AnalyticsResult = namedtuple("AnalyticsResult", [
+    "start_date", "end_date",
+    "total_revenue", "num_orders", "avg_order_value",
+    "daily_sales",       # DataFrame: order_date, daily_sales
+    "payment_sales",     # DataFrame: payment, total_sales
+    "category_sales",    # DataFrame: category, total_sales
+    "top_items",         # list of (item_name, total_qty_sold), best seller first
+])
+
+
+class AnalyticsSnapshot:
+    """
+    Computes every dashboard figure for a date range from one consistent read.
+
+    Both rollup tables are read once, on one connection and inside one read transaction,
+    so the KPIs, trend, payment split, category sales and top items always agree with
+    each other even while orders are being written:
+
+    - sales_daily grouped by (day, payment) yields revenue, order count, the daily trend
+      and the payment split;
+    - item_sales_daily grouped by (item, category) yields category sales and the top
+      sellers, using the names and categories snapshotted at sale time.
+    """
+
+    def __init__(self, pool=None, top_n=5):
+        self._pool = pool or get_pool()
+        self.top_n = top_n
+
+    @traced(rows=None)
+    def compute(self, start_date, end_date):
+        """
+        Returns:
+            AnalyticsResult: The dashboard figures for the inclusive date range.
+        """
+        days = (start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
+        with self._pool.connection() as conn:
+            own_transaction = not conn.in_transaction
+            if own_transaction:
+                conn.execute("BEGIN")
+            try:
+                sales_rows = conn.execute(
+                    """
+                    SELECT bucket, payment, SUM(revenue_paise), SUM(orders)
+                    FROM sales_daily
+                    WHERE bucket BETWEEN ? AND ?
+                    GROUP BY bucket, payment
+                    ORDER BY bucket
+                    """,
+                    days
+                ).fetchall()
+                item_rows = conn.execute(
+                    """
+                    SELECT item_id, MAX(item_name), category, SUM(qty), SUM(revenue_paise)
+                    FROM item_sales_daily
+                    WHERE bucket BETWEEN ? AND ?
+                    GROUP BY item_id, category
+                    """,
+                    days
+                ).fetchall()
+            finally:
+                if own_transaction:
+                    conn.rollback()
+
+        revenue, orders = 0, 0
+        by_day = {}
+        by_payment = defaultdict(int)
+        for day, payment, day_revenue, day_orders in sales_rows:
+            revenue += day_revenue
+            orders += day_orders
+            by_day[day] = by_day.get(day, 0) + day_revenue
+            by_payment[payment] += day_revenue
+
+        by_category = defaultdict(int)
+        sold = {}
+        for item_id, item_name, category, qty, item_revenue in item_rows:
+            if category is not None:
+                # Old sales of items deleted before snapshots existed have no category.
+                by_category[category] += item_revenue
+            name, total_qty = sold.get(item_id, (item_name or f"Item {item_id}", 0))
+            sold[item_id] = (name, total_qty + qty)
+        sold = sorted(sold.values(), key=lambda item: item[1], reverse=True)
+
+        return AnalyticsResult(
+            start_date=start_date,
+            end_date=end_date,
+            total_revenue=revenue / 100.0,
+            num_orders=orders,
+            avg_order_value=revenue / 100.0 / orders if orders else 0,
+            daily_sales=pd.DataFrame(
+                [(day, paise / 100.0) for day, paise in by_day.items()], columns=["order_date", "daily_sales"]
+            ),
+            payment_sales=pd.DataFrame(
+                [(payment, paise / 100.0) for payment, paise in by_payment.items()], columns=["payment", "total_sales"]
+            ),
+            category_sales=pd.DataFrame(
+                [(category, paise / 100.0) for category, paise in sorted(by_category.items())],
+                columns=["category", "total_sales"]
+            ),
+            top_items=sold[:self.top_n],
+        )
+
+
+@traced(rows=None)
+@cached(depends_on=("orders",), date_range=("start_date", "end_date"))
+def get_analytics(start_date, end_date, top_n=5, pool=None):
+    """
+    Returns every dashboard figure for the range from one AnalyticsSnapshot read, cached
+    until an order in the range changes.
+    """
+    return AnalyticsSnapshot(pool, top_n=top_n).compute(start_date, end_date)
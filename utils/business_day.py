@@ -0,0 +1,41 @@
+import datetime
+
+# Orders placed before this hour count towards the previous business day, so a service
+# that runs past midnight stays on one day's sales.
+BUSINESS_DAY_CUTOFF_HOURS = 4
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_CUTOFF = datetime.timedelta(hours=BUSINESS_DAY_CUTOFF_HOURS)
+_SECOND = datetime.timedelta(seconds=1)
+
+
+def to_epoch(moment):
+    """
+    Converts a naive outlet-local datetime (or "YYYY-MM-DD HH:MM:SS" string) to integer
+    seconds since 1970-01-01 00:00 on the same wall clock.
+
+    No timezone conversion is applied, which matches SQLite's strftime('%s', timestamp)
+    on the stored text and keeps the value monotonic with the timestamp column.
+    """
+    if isinstance(moment, str):
+        moment = datetime.datetime.fromisoformat(moment)
+    return (moment - _EPOCH) // _SECOND
+
+
+def business_date(moment):
+    """
+    Returns the 'YYYY-MM-DD' business date an outlet-local datetime (or timestamp string) belongs to.
+    """
+    if isinstance(moment, str):
+        moment = datetime.datetime.fromisoformat(moment)
+    return (moment - _CUTOFF).date().isoformat()
+
+
+def business_day_bounds(start_date, end_date):
+    """
+    Returns the half-open epoch range [start, end) covering business days start_date
+    through end_date inclusive, for `ts_epoch >= ? AND ts_epoch < ?` seeks.
+    """
+    start = datetime.datetime.combine(start_date, datetime.time()) + _CUTOFF
+    end = datetime.datetime.combine(end_date + datetime.timedelta(days=1), datetime.time()) + _CUTOFF
+    return to_epoch(start), to_epoch(end)
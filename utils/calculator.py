@@ -1,46 +1,117 @@
+import numpy as np
+
+
+def price_lines(prices, gsts, qtys):
+    """
+    Prices many order lines in one vectorized pass.
+
+    Args:
+        prices (array-like): Unit price of each line.
+        gsts (array-like): GST percentage of each line.
+        qtys (array-like): Quantity of each line.
+
+    Returns:
+        tuple: NumPy arrays (base_total, gst_amount, item_total), one entry per line.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    gsts = np.asarray(gsts, dtype=np.float64)
+    qtys = np.asarray(qtys, dtype=np.float64)
+
+    base_total = prices * qtys
+    gst_amount = base_total * (gsts / 100.0)
+    item_total = base_total + gst_amount
+    return base_total, gst_amount, item_total
+
+
+def summarize_orders(line_totals, order_index, discount_pct=0.0, tip_pct=0.0, num_orders=None):
+    """
+    Rolls line totals up into per-order subtotals, discounts, tips and final totals.
+
+    Args:
+        line_totals (array-like): Total (with GST) of each line.
+        order_index (array-like): For each line, the 0-based position of its order.
+        discount_pct (float or array-like): Discount percentage, either one value for all
+                                            orders or one per order.
+        tip_pct (float or array-like): Tip percentage, one value or one per order.
+        num_orders (int): Number of orders; defaults to max(order_index) + 1.
+
+    Returns:
+        dict: NumPy arrays "subtotal", "discount_amount", "tip_amount" and "final_total",
+              one entry per order.
+    """
+    line_totals = np.asarray(line_totals, dtype=np.float64)
+    order_index = np.asarray(order_index, dtype=np.intp)
+    if num_orders is None:
+        num_orders = int(order_index.max()) + 1 if order_index.size else 0
+
+    subtotal = np.bincount(order_index, weights=line_totals, minlength=num_orders)
+
+    discount_amount = subtotal * (np.asarray(discount_pct, dtype=np.float64) / 100.0)
+    total_after_discount = subtotal - discount_amount
+
+    tip_amount = total_after_discount * (np.asarray(tip_pct, dtype=np.float64) / 100.0)
+    final_total = total_after_discount + tip_amount
+
+    return {
+        "subtotal": subtotal,
+        "discount_amount": discount_amount,
+        "tip_amount": tip_amount,
+        "final_total": final_total,
+    }
+
+
+def price_orders(prices, gsts, qtys, order_index, discount_pct=0.0, tip_pct=0.0, num_orders=None):
+    """
+    Prices the lines of many orders and their order-level totals in one call.
+
+    Useful for re-pricing and backfills; a single order is just `order_index` of all zeros.
+
+    Returns:
+        dict: "lines" -> (base_total, gst_amount, item_total) arrays per line, plus the
+              per-order arrays from `summarize_orders`.
+    """
+    base_total, gst_amount, item_total = price_lines(prices, gsts, qtys)
+    summary = summarize_orders(item_total, order_index, discount_pct, tip_pct, num_orders)
+    summary["lines"] = (base_total, gst_amount, item_total)
+    return summary
+
+
 def calculate_item_total(price, gst, qty):
     """
     Calculates the total for a single item, including GST.
-    
+
     Args:
         price (float): The unit price of the item.
         gst (float): The GST percentage.
         qty (int): The quantity of the item.
-        
+
     Returns:
         tuple: A tuple containing the base total, GST amount, and total with GST.
     """
-    base_total = price * qty
-    gst_amount = base_total * (gst / 100.0)
-    item_total = base_total + gst_amount
-    return base_total, gst_amount, item_total
+    base_total, gst_amount, item_total = price_lines(price, gst, qty)
+    return float(base_total), float(gst_amount), float(item_total)
 
 
 def calculate_order_summary(selected_items, discount_pct, tip_pct):
     """
     Calculates the complete summary for an order, including totals, discounts, and tips.
-    
+
     Args:
         selected_items (list): A list of dictionaries, where each dictionary
                                represents a selected item and its calculated details.
         discount_pct (float): The discount percentage to apply.
         tip_pct (float): The tip percentage to apply.
-        
+
     Returns:
         dict: A dictionary containing the subtotal, grand total, discount amount,
               tip amount, and the final payable amount.
     """
-    grand_total_before_discount = sum(item["total"] for item in selected_items)
-    
-    discount_amount = grand_total_before_discount * (discount_pct / 100.0)
-    total_after_discount = grand_total_before_discount - discount_amount
-    
-    tip_amount = total_after_discount * (tip_pct / 100.0)
-    final_total = total_after_discount + tip_amount
-    
+    line_totals = [item["total"] for item in selected_items]
+    summary = summarize_orders(line_totals, np.zeros(len(line_totals), dtype=np.intp), discount_pct, tip_pct, num_orders=1)
+
     return {
-        "subtotal": grand_total_before_discount,
-        "discount_amount": discount_amount,
-        "tip_amount": tip_amount,
-        "final_total": final_total,
+        "subtotal": float(summary["subtotal"][0]),
+        "discount_amount": float(summary["discount_amount"][0]),
+        "tip_amount": float(summary["tip_amount"][0]),
+        "final_total": float(summary["final_total"][0]),
     }
@@ -0,0 +1,180 @@
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+
+from utils.db_pool import get_pool
+
+# Caches by function name. Streamlit re-executes the page script on every rerun, which
+# re-applies @cached; reusing the existing cache keeps its entries across reruns.
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def _day(value):
+    return value if isinstance(value, str) else value.strftime("%Y-%m-%d")
+
+
+def bump_data_version(conn, tag, day=None):
+    """
+    Marks data under `tag` as changed. Call inside the write's own transaction.
+
+    With `day` (a date or "YYYY-MM-DD"), only the `tag@day` counter moves, so caches whose
+    date range excludes that day stay valid.
+    """
+    key = tag if day is None else f"{tag}@{_day(day)}"
+    conn.execute(
+        """
+        INSERT INTO data_versions (tag, version) VALUES (?, 1)
+        ON CONFLICT (tag) DO UPDATE SET version = version + 1
+        """,
+        (key,)
+    )
+
+
+def get_data_version(conn, tag):
+    """
+    Returns the counter for a single tag (ignoring any per-day counters).
+    """
+    row = conn.execute("SELECT version FROM data_versions WHERE tag = ?", (tag,)).fetchone()
+    return row[0] if row else 0
+
+
+def get_data_versions(conn, tags, start_day=None, end_day=None):
+    """
+    Returns a tuple that changes whenever data under any of `tags` changes within the range.
+
+    For each tag this is the tag's own counter plus the sum of its per-day counters between
+    `start_day` and `end_day` (all days when no range is given). Counters only ever grow
+    and day rows are only ever added, so the sum moves on every relevant write.
+    """
+    low = f"@{_day(start_day)}" if start_day else "@"
+    high = f"@{_day(end_day)}" if end_day else "@\uffff"
+    versions = []
+    for tag in tags:
+        row = conn.execute(
+            """
+            SELECT
+                COALESCE(SUM(CASE WHEN tag = ? THEN version END), 0),
+                COALESCE(SUM(CASE WHEN tag != ? THEN version END), 0)
+            FROM data_versions
+            WHERE tag = ? OR tag BETWEEN ? AND ?
+            """,
+            (tag, tag, tag, tag + low, tag + high)
+        ).fetchone()
+        versions.append(row)
+    return tuple(versions)
+
+
+class DataCache:
+    """
+    Memoizes one function's results, keyed by its arguments plus the data versions it depends on.
+
+    Writes bump versions in SQLite, so a cached entry is reused only while nothing it
+    depends on has changed, in this process or any other. Versions are read from the
+    call's `pool` argument when the function takes one and it is given, else from the
+    cache's own pool.
+    """
+
+    def __init__(self, func, depends_on, date_range=None, maxsize=128, pool=None):
+        self.func = func
+        self.name = func.__name__
+        self.depends_on = tuple(depends_on)
+        self.date_range = date_range
+        self.maxsize = maxsize
+        self._pool = pool
+        self._signature = inspect.signature(func)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _versions(self, arguments):
+        start_day = end_day = None
+        if self.date_range:
+            start_day = arguments.get(self.date_range[0])
+            end_day = arguments.get(self.date_range[1])
+            if not (start_day and end_day):
+                start_day = end_day = None
+        pool = arguments.get("pool") or self._pool or get_pool()
+        with pool.connection() as conn:
+            return get_data_versions(conn, self.depends_on, start_day, end_day)
+
+    def __call__(self, *args, **kwargs):
+        bound = self._signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = tuple(bound.arguments.items())
+        versions = self._versions(bound.arguments)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == versions:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Stored under the versions read *before* running, so a write that lands
+        # mid-computation makes the entry stale on the next call.
+        value = self.func(*args, **kwargs)
+        with self._lock:
+            self._entries[key] = (versions, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        calls = self.hits + self.misses
+        return {
+            "cache": self.name,
+            "depends_on": ", ".join(self.depends_on),
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / calls if calls else 0.0,
+        }
+
+
+def cached(depends_on, date_range=None, maxsize=128, pool=None):
+    """
+    Decorator that caches a function until data it depends on changes.
+
+    Args:
+        depends_on (tuple): Data tags the result is derived from, e.g. ("orders", "menu").
+        date_range (tuple): Names of the (start, end) date arguments. Per-day writes outside
+                            that range leave the entry valid. None means any day counts.
+        maxsize (int): Maximum number of argument combinations kept per function.
+        pool (ConnectionPool): Pool holding the data_versions table; the app database by default.
+                               A `pool` argument passed to the function takes precedence.
+    """
+    def decorate(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        with _caches_lock:
+            cache = _caches.get(name)
+            if cache is None:
+                cache = DataCache(func, depends_on, date_range=date_range, maxsize=maxsize, pool=pool)
+                _caches[name] = cache
+            else:
+                if cache.func.__code__.co_code != func.__code__.co_code:
+                    cache.clear()
+                cache.func = func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return cache(*args, **kwargs)
+
+        wrapper.cache = cache
+        return wrapper
+    return decorate
+
+
+def cache_stats():
+    """
+    Returns hit/miss counters for every @cached function.
+    """
+    return [cache.stats() for cache in _caches.values()]
@@ -0,0 +1,197 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Path to the restaurant database used by the Streamlit app
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "restaurant.db")
+
+# Applied to every new connection. WAL lets readers and the writer work side by side,
+# and NORMAL sync is safe under WAL while avoiding an fsync on every commit.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256 MB
+    "PRAGMA cache_size=-32000",    # ~32 MB page cache per connection
+)
+
+
+class ConnectionPool:
+    """
+    A bounded pool of SQLite connections that lives for the whole process.
+
+    A thread checks a connection out with `connection()` and gets the same one back on
+    nested calls, so helpers that call other helpers share a single connection. Each
+    connection keeps its own statement cache, so repeated SQL text is prepared once and
+    reused on later calls.
+    """
+
+    def __init__(self, db_path=DB_PATH, max_connections=8, busy_timeout=5.0, statement_cache_size=256):
+        self.db_path = db_path
+        self.max_connections = max_connections
+        self.busy_timeout = busy_timeout
+        self.statement_cache_size = statement_cache_size
+
+        self._idle = []
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+        self._checkouts = 0
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        if not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size,
+        )
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire(self):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Connection pool has been closed.")
+            self._checkouts += 1
+            if not self._idle and self._open >= self.max_connections:
+                self._waits += 1
+                started = time.perf_counter()
+                while not self._idle and self._open >= self.max_connections:
+                    self._cond.wait()
+                waited = time.perf_counter() - started
+                self._wait_time += waited
+                self._max_wait = max(self._max_wait, waited)
+            if self._idle:
+                self._hits += 1
+                return self._idle.pop()
+            self._misses += 1
+            self._open += 1
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, conn):
+        if conn.in_transaction:
+            # Never hand out a connection with a half-finished transaction.
+            conn.rollback()
+        with self._cond:
+            if self._closed:
+                self._open -= 1
+                conn.close()
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Checks out a connection for the calling thread.
+
+        Re-entrant: a thread that already holds a connection gets the same one back.
+        """
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            with self._cond:
+                self._checkouts += 1
+                self._hits += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Checks out a connection and commits on success or rolls back on error.
+
+        Nested calls join the outer transaction instead of committing early.
+        """
+        with self.connection() as conn:
+            if conn.in_transaction:
+                yield conn
+                return
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def stats(self):
+        """
+        Returns a snapshot of pool usage counters.
+        """
+        with self._cond:
+            return {
+                "db_path": self.db_path,
+                "max_connections": self.max_connections,
+                "open_connections": self._open,
+                "idle_connections": len(self._idle),
+                "checkouts": self._checkouts,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / self._checkouts if self._checkouts else 0.0,
+                "waits": self._waits,
+                "total_wait_ms": self._wait_time * 1000.0,
+                "max_wait_ms": self._max_wait * 1000.0,
+            }
+
+    def close(self):
+        """
+        Closes idle connections; connections still checked out close when released.
+        """
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._idle.pop().close()
+                self._open -= 1
+            self._cond.notify_all()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path=DB_PATH):
+    """
+    Returns the process-wide pool for `db_path`, creating it on first use.
+    """
+    key = os.path.abspath(db_path)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(key)
+                _pools[key] = pool
+    return pool
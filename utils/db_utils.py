@@ -1,7 +1,12 @@
 import os
 import sqlite3
+import time
+from itertools import islice
+
 import pandas as pd
-import requests  # Required to validate image URLs
+
+from utils.image_validator import get_validator
+from utils.order_store import BulkResult
 
 # Path to your database
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "db", "orders.db")
@@ -25,42 +30,37 @@ def init_db():
     conn.commit()
     conn.close()
 
-def sanitize_menu_image_urls():
+def sanitize_menu_image_urls(wait=True, validator=None):
     """
     Checks if image URLs in menu.csv are valid.
     If not, replaces them with a placeholder image.
+
+    URL checks go through the cached, concurrent validator in utils.image_validator, so
+    only URLs whose cache entry is missing or stale touch the network. With `wait=False`
+    the check uses cached results only and refreshes stale entries in the background.
     """
     csv_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "menu.csv")
     placeholder_image = "https://placehold.co/100x100/600/fff?text=No+Image"
+    validator = validator or get_validator()
 
     df = pd.read_csv(csv_path)
-    updated = False
+    image_urls = df["image_url"].fillna("").astype(str).str.strip()
+    is_http = image_urls.str.startswith("http")
 
-    for index, row in df.iterrows():
-        image_url = str(row.get("image_url", "")).strip()
+    verdicts = validator.validate(image_urls[is_http & (image_urls != placeholder_image)].tolist(), wait=wait)
+    is_valid = image_urls.map(lambda url: url == placeholder_image or verdicts.get(url, False))
 
-        if image_url.startswith("http"):
-            try:
-                response = requests.head(image_url, timeout=3)
-                if response.status_code >= 400:
-                    df.at[index, "image_url"] = placeholder_image
-                    updated = True
-            except:
-                df.at[index, "image_url"] = placeholder_image
-                updated = True
-        else:
-            df.at[index, "image_url"] = placeholder_image
-            updated = True
-
-    if updated:
+    if not is_valid.all():
+        df.loc[~is_valid, "image_url"] = placeholder_image
         df.to_csv(csv_path, index=False)
 
 def load_menu_from_csv():
     """
     Loads and sanitizes menu items from menu.csv.
     Returns a list of dicts.
+    Image URLs are checked against the cache only; stale ones are revalidated in the background.
     """
-    sanitize_menu_image_urls()
+    sanitize_menu_image_urls(wait=False)
     csv_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "menu.csv")
     df = pd.read_csv(csv_path)
     return df.to_dict(orient="records")
@@ -78,6 +78,61 @@ def save_order_to_db(timestamp, order_mode, items, total_amount, payment_method)
     conn.commit()
     conn.close()
 
+def save_orders_bulk(orders, batch_size=1000, db_path=None):
+    """
+    Saves many orders to this module's orders table, one executemany and commit per batch.
+
+    Each order is a dict with timestamp, order_mode, items, total_amount and payment_method,
+    as save_order_to_db takes them. An order missing a field or with a non-numeric total
+    is reported in `errors` and skipped without aborting its batch.
+    Returns an order_store.BulkResult: assigned ids in input order (None where rejected),
+    (input index, message) per rejected order, count inserted and elapsed seconds.
+    """
+    started = time.perf_counter()
+    order_ids, errors, inserted = [], [], 0
+    conn = sqlite3.connect(db_path or DB_PATH, isolation_level=None)
+    try:
+        orders = iter(orders)
+        while True:
+            chunk = list(islice(orders, batch_size))
+            if not chunk:
+                break
+            offset = len(order_ids)
+            rows, positions = [], []
+            for i, order in enumerate(chunk):
+                try:
+                    rows.append((order["timestamp"], order["order_mode"], str(order["items"]),
+                                 float(order["total_amount"]), order["payment_method"]))
+                    positions.append(i)
+                except (KeyError, TypeError, ValueError) as e:
+                    errors.append((offset + i, f"{type(e).__name__}: {e}"))
+            chunk_ids = [None] * len(chunk)
+            if rows:
+                ids = _insert_orders_batch(conn, rows)
+                for position, order_id in zip(positions, ids):
+                    chunk_ids[position] = order_id
+                inserted += len(ids)
+            order_ids.extend(chunk_ids)
+    finally:
+        conn.close()
+    return BulkResult(order_ids, errors, inserted, time.perf_counter() - started)
+
+def _insert_orders_batch(conn, rows):
+    # Ids are assigned up front under the write lock so the batch stays one executemany.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM orders").fetchone()[0]
+        ids = list(range(next_id, next_id + len(rows)))
+        conn.executemany('''
+            INSERT INTO orders (id, timestamp, order_mode, items, total_amount, payment_method)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(order_id,) + row for order_id, row in zip(ids, rows)])
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return ids
+
 def get_orders():
     """
     Retrieves all past orders from the database.
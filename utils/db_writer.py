@@ -0,0 +1,173 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from utils.db_pool import get_pool
+from utils.order_store import insert_order
+
+_STOP = object()
+
+
+class DbWriter:
+    """
+    A dedicated thread that owns the database's write connection.
+
+    Callers submit write intents, functions taking the connection, and get a Future.
+    The thread drains whatever is queued (up to `max_batch` intents, waiting at most
+    `max_wait` seconds for more) and runs the batch in one BEGIN IMMEDIATE transaction,
+    each intent under its own savepoint: an intent that raises is rolled back alone and
+    its exception goes to its Future, while the rest commit together. Writers therefore
+    never contend for the lock with each other, and one commit covers several orders.
+
+    If the transaction itself fails (BEGIN IMMEDIATE times out on a lock held elsewhere,
+    or COMMIT fails), every intent in the batch is rolled back and its Future raises the error.
+
+    Intents run on the writer thread, so they must not commit, must not wait on another
+    intent, and should not touch thread-bound state such as Streamlit's.
+
+    The app's and the API's writes all go through here. A few writers open their own
+    connection instead and rely on WAL mode and the pool's busy_timeout to take turns
+    with this thread: schema migrations, which run before any writer starts; bulk loads
+    (order_store.save_orders_bulk, scripts/generate_orders.py), which commit large
+    batches of their own; and scripts/rebuild_rollups.py. Run those off-hours, or route
+    them through submit(), if the app is busy.
+    """
+
+    def __init__(self, pool=None, max_batch=64, max_wait=0.0):
+        self._pool = pool or get_pool()
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.intents = 0
+        self.failed = 0
+        self.commit_time = 0.0
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args):
+        """
+        Queues `func(conn, *args)` to run in the next group commit.
+
+        Returns:
+            Future: Resolves to func's return value once the batch has committed.
+        """
+        future = Future()
+        if not self._thread.is_alive():
+            raise RuntimeError("The database writer has been stopped.")
+        self._queue.put((func, args, future))
+        return future
+
+    def insert_order(self, order):
+        """
+        Queues an order (shaped like save_order_to_db's input) for insertion.
+
+        Returns:
+            Future: Resolves to the new order_id, or raises ValueError for a malformed order.
+        """
+        return self.submit(insert_order, order)
+
+    def _next_batch(self):
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0)) if self.max_wait else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Finish this batch first; the stop marker is seen again on the next call.
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        with self._pool.connection() as conn:
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    return
+                self._commit(conn, batch)
+
+    def _commit(self, conn, batch):
+        started = time.perf_counter()
+        # Claim every future before touching the database, so a failed BEGIN or COMMIT
+        # can resolve all of them; cancelled ones are dropped here.
+        batch = [intent for intent in batch if intent[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for func, args, future in batch:
+                conn.execute("SAVEPOINT intent")
+                try:
+                    outcomes.append((True, func(conn, *args)))
+                    conn.execute("RELEASE intent")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO intent")
+                    conn.execute("RELEASE intent")
+                    outcomes.append((False, e))
+            conn.commit()
+        except BaseException as e:
+            if conn.in_transaction:
+                conn.rollback()
+            for func, args, future in batch:
+                future.set_exception(e)
+            with self._lock:
+                self.failed += len(batch)
+            return
+
+        for (func, args, future), (succeeded, value) in zip(batch, outcomes):
+            if succeeded:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+        with self._lock:
+            self.batches += 1
+            self.intents += len(batch)
+            self.failed += sum(1 for succeeded, _ in outcomes if not succeeded)
+            self.commit_time += time.perf_counter() - started
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "batches": self.batches,
+                "intents": self.intents,
+                "failed": self.failed,
+                "avg_batch": self.intents / self.batches if self.batches else 0.0,
+                "avg_commit_ms": self.commit_time * 1000 / self.batches if self.batches else 0.0,
+            }
+
+    def close(self):
+        """
+        Commits everything already queued, then stops the thread.
+        """
+        self._queue.put(_STOP)
+        self._thread.join()
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(pool=None):
+    """
+    Returns the process-wide DbWriter for `pool` (the restaurant database by default).
+    """
+    pool = pool or get_pool()
+    writer = _writers.get(pool.db_path)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(pool.db_path)
+            if writer is None:
+                writer = DbWriter(pool)
+                _writers[pool.db_path] = writer
+    return writer
@@ -0,0 +1,202 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.db_pool import get_pool
+
+# Separate database so URL checks never contend with order writes
+CACHE_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "image_cache.db")
+
+
+class ImageUrlValidator:
+    """
+    Checks image URLs concurrently and remembers the answers in SQLite.
+
+    Each result is cached per URL with its HTTP status, ETag / Last-Modified and the time
+    it was checked. A URL is valid if it answers below 400 (after redirects) with an image
+    Content-Type. Entries younger than `ttl_seconds` are answered from the cache without
+    touching the network; stale entries are revalidated with a conditional HEAD so an
+    unchanged image costs a 304.
+    """
+
+    def __init__(self, cache_path=CACHE_DB_PATH, ttl_seconds=24 * 3600, max_workers=8, timeout=3):
+        self.ttl_seconds = ttl_seconds
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._pool = get_pool(cache_path)
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-check")
+        self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-refresh")
+        self._inflight = set()
+        self._inflight_lock = threading.Lock()
+
+        with self._pool.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS image_url_status (
+                    url TEXT PRIMARY KEY,
+                    ok INTEGER NOT NULL,
+                    status INTEGER,
+                    etag TEXT,
+                    last_modified TEXT,
+                    error TEXT,
+                    checked_at REAL NOT NULL
+                );
+            """)
+
+    def _session(self):
+        # One keep-alive session per worker thread, so repeated hosts reuse connections.
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+        return session
+
+    def cached(self, urls):
+        """
+        Returns {url: row dict} for every URL that has a cache entry. Never hits the network.
+        """
+        urls = list(dict.fromkeys(urls))
+        entries = {}
+        with self._pool.connection() as conn:
+            # Chunked to stay under SQLite's bound-parameter limit.
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = conn.execute(
+                    f"SELECT url, ok, status, etag, last_modified, error, checked_at "
+                    f"FROM image_url_status WHERE url IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for url, ok, status, etag, last_modified, error, checked_at in rows:
+                    entries[url] = {
+                        "ok": bool(ok),
+                        "status": status,
+                        "etag": etag,
+                        "last_modified": last_modified,
+                        "error": error,
+                        "checked_at": checked_at,
+                    }
+        return entries
+
+    def stale(self, urls, entries=None):
+        """
+        Returns the URLs that have no cache entry or whose entry is older than the TTL.
+        """
+        entries = self.cached(urls) if entries is None else entries
+        cutoff = time.time() - self.ttl_seconds
+        return [url for url in dict.fromkeys(urls) if url not in entries or entries[url]["checked_at"] < cutoff]
+
+    def _check(self, url, previous):
+        headers = {}
+        if previous:
+            if previous.get("etag"):
+                headers["If-None-Match"] = previous["etag"]
+            if previous.get("last_modified"):
+                headers["If-Modified-Since"] = previous["last_modified"]
+        try:
+            response = self._session().head(url, headers=headers, timeout=self.timeout, allow_redirects=True)
+        except requests.RequestException as e:
+            return {"ok": False, "status": None, "etag": None, "last_modified": None, "error": str(e)}
+
+        if response.status_code == 304 and previous:
+            # Unchanged since the last check; keep the previous verdict and validators.
+            return dict(previous, status=304, error=None)
+        # Servers that omit Content-Type on HEAD get the benefit of the doubt; anything
+        # that says what it is must say it is an image.
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        return {
+            "ok": response.status_code < 400 and (not content_type or content_type.startswith("image/")),
+            "status": response.status_code,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "error": None,
+        }
+
+    def refresh(self, urls, force=False):
+        """
+        Revalidates stale (or, with `force`, all) URLs concurrently and stores the results.
+
+        Returns:
+            dict: {url: entry} for the URLs that were checked.
+        """
+        entries = self.cached(urls)
+        to_check = list(dict.fromkeys(urls)) if force else self.stale(urls, entries)
+        if not to_check:
+            return {}
+
+        results = dict(zip(to_check, self._executor.map(lambda u: self._check(u, entries.get(u)), to_check)))
+        checked_at = time.time()
+        with self._pool.transaction() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO image_url_status (url, ok, status, etag, last_modified, error, checked_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (url, int(r["ok"]), r["status"], r["etag"], r["last_modified"], r["error"], checked_at)
+                    for url, r in results.items()
+                ]
+            )
+        for result in results.values():
+            result["checked_at"] = checked_at
+        return results
+
+    def refresh_in_background(self, urls, force=False):
+        """
+        Schedules `refresh()` on a background thread and returns its Future.
+
+        URLs already being refreshed by an earlier call are skipped.
+        """
+        with self._inflight_lock:
+            pending = [url for url in dict.fromkeys(urls) if url not in self._inflight]
+            self._inflight.update(pending)
+
+        def run():
+            try:
+                return self.refresh(pending, force=force)
+            finally:
+                with self._inflight_lock:
+                    self._inflight.difference_update(pending)
+
+        return self._background.submit(run)
+
+    def validate(self, urls, wait=True):
+        """
+        Returns {url: ok} for `urls`.
+
+        With `wait`, stale entries are revalidated before answering. Without it, the answer
+        comes from the cache alone (unknown URLs count as valid) and stale entries are
+        refreshed in the background for the next call.
+        """
+        if wait:
+            self.refresh(urls)
+            entries = self.cached(urls)
+        else:
+            entries = self.cached(urls)
+            stale = self.stale(urls, entries)
+            if stale:
+                self.refresh_in_background(stale)
+        return {url: entries[url]["ok"] if url in entries else True for url in urls}
+
+
+_validator = None
+_validator_lock = threading.Lock()
+
+
+def get_validator():
+    """
+    Returns the process-wide validator backed by db/image_cache.db.
+    """
+    global _validator
+    if _validator is None:
+        with _validator_lock:
+            if _validator is None:
+                _validator = ImageUrlValidator()
+    return _validator
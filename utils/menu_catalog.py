@@ -0,0 +1,129 @@
+import threading
+from collections import namedtuple
+
+import pandas as pd
+
+from utils.data_cache import bump_data_version, get_data_version
+from utils.db_pool import get_pool
+from utils.db_writer import get_writer
+from utils.tracing import traced
+
+MENU_COLUMNS = ["item_id", "item_name", "category", "price", "gst", "image_url"]
+
+# One immutable, fully indexed copy of the menu; swapped wholesale on reload.
+MenuSnapshot = namedtuple("MenuSnapshot", ["version", "by_id", "by_category", "categories", "items", "dataframe"])
+
+
+class MenuCatalog:
+    """
+    Process-wide, indexed copy of the `menu` table.
+
+    Rows are held by item_id alongside a category -> items index and a sorted category
+    list, so lookups never touch pandas. The version is the "menu" counter in the
+    data_versions table, which every menu write bumps; a read that sees a newer version
+    than the loaded one reloads once. Because the counter lives in SQLite, writes from
+    other processes are picked up too.
+
+    snapshot() and every accessor below read the version, one SELECT per call. Code that
+    does many lookups (a page render, a cart) should take snapshot() once and use its
+    by_id / by_category / items directly.
+    """
+
+    def __init__(self, pool=None):
+        self._pool = pool or get_pool()
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    @property
+    def version(self):
+        with self._pool.connection() as conn:
+            return get_data_version(conn, "menu")
+
+    def bump(self, conn=None):
+        """
+        Marks the menu as changed. Pass the writer's connection to bump inside its
+        transaction; otherwise the bump is queued on the database's writer thread.
+        """
+        if conn is not None:
+            bump_data_version(conn, "menu")
+            return
+        get_writer(self._pool).submit(bump_data_version, "menu").result()
+
+    @traced(rows=lambda snapshot: len(snapshot.items))
+    def _load(self, version):
+        with self._pool.connection() as conn:
+            rows = conn.execute(f"SELECT {', '.join(MENU_COLUMNS)} FROM menu ORDER BY item_id").fetchall()
+
+        items = [dict(zip(MENU_COLUMNS, row)) for row in rows]
+        by_id = {item["item_id"]: item for item in items}
+        by_category = {}
+        for item in items:
+            by_category.setdefault(item["category"], []).append(item)
+        return MenuSnapshot(
+            version=version,
+            by_id=by_id,
+            by_category=by_category,
+            categories=sorted(by_category),
+            items=items,
+            dataframe=pd.DataFrame(items, columns=MENU_COLUMNS),
+        )
+
+    @traced(rows=None)
+    def snapshot(self):
+        """
+        Returns the current MenuSnapshot, reloading it if the version has moved on.
+        """
+        version = self.version
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = self._load(version)
+            return self._snapshot
+
+    def get(self, item_id):
+        """
+        Returns the menu row for `item_id` as a dict, or None if it does not exist.
+        """
+        return self.snapshot().by_id.get(item_id)
+
+    def items(self):
+        return self.snapshot().items
+
+    def items_in_category(self, category):
+        return self.snapshot().by_category.get(category, [])
+
+    def categories(self):
+        return self.snapshot().categories
+
+    def as_dict(self):
+        """
+        Returns {item_id: row dict} for every menu item.
+        """
+        return self.snapshot().by_id
+
+    def dataframe(self):
+        """
+        Returns the menu as a DataFrame. Shared between callers, so treat it as read-only.
+        """
+        return self.snapshot().dataframe
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_menu_catalog(pool=None):
+    """
+    Returns the process-wide catalog for `pool` (the restaurant database by default).
+    """
+    pool = pool or get_pool()
+    catalog = _catalogs.get(pool.db_path)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(pool.db_path)
+            if catalog is None:
+                catalog = MenuCatalog(pool)
+                _catalogs[pool.db_path] = catalog
+    return catalog
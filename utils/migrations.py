@@ -0,0 +1,279 @@
+import datetime
+import threading
+
+from utils.business_day import BUSINESS_DAY_CUTOFF_HOURS
+
+# Registered migrations as (version, description, function) tuples, applied in version order.
+MIGRATIONS = []
+
+_bootstrapped = set()
+_bootstrap_lock = threading.Lock()
+
+
+def migration(version, description):
+    """
+    Registers a function as numbered schema migration `version`.
+
+    The function receives an open connection and runs inside the migration's transaction;
+    it must not commit.
+    """
+    def register(func):
+        if any(v == version for v, _, _ in MIGRATIONS):
+            raise ValueError(f"Duplicate migration version: {version}")
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return func
+    return register
+
+
+# ----------------- Migrations -----------------
+@migration(1, "Create menu, orders and order_items tables")
+def _create_base_tables(conn):
+    # IF NOT EXISTS keeps this safe on databases created before versioning existed.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS menu (
+            item_id INTEGER PRIMARY KEY,
+            item_name TEXT NOT NULL UNIQUE,
+            category TEXT NOT NULL,
+            price REAL NOT NULL,
+            gst REAL NOT NULL,
+            image_url TEXT
+        );
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS orders (
+            order_id INTEGER PRIMARY KEY,
+            mode TEXT NOT NULL,
+            payment TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            total REAL NOT NULL
+        );
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS order_items (
+            item_id INTEGER,
+            order_id INTEGER,
+            qty INTEGER NOT NULL,
+            total REAL NOT NULL,
+            FOREIGN KEY (item_id) REFERENCES menu (item_id),
+            FOREIGN KEY (order_id) REFERENCES orders (order_id)
+        );
+    """)
+
+
+@migration(2, "Index order_items join keys and orders.timestamp")
+def _add_core_indexes(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_order_items_order_id ON order_items (order_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_order_items_item_id ON order_items (item_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_timestamp ON orders (timestamp)")
+    # Refresh planner statistics so the new indexes are picked for range scans and joins.
+    conn.execute("ANALYZE")
+
+
+@migration(3, "Add data_versions counters for cache invalidation")
+def _add_data_versions(conn):
+    # One row per data tag ("menu", "orders") plus per-day rows ("orders@2025-07-28");
+    # see utils.data_cache.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            tag TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        ) WITHOUT ROWID;
+    """)
+    conn.executemany(
+        "INSERT OR IGNORE INTO data_versions (tag, version) VALUES (?, 0)",
+        [("menu",), ("orders",)]
+    )
+
+
+@migration(4, "Store order amounts as integer paise")
+def _add_paise_columns(conn):
+    # The REAL columns stay for older readers; new code reads and sums the *_paise columns.
+    conn.execute("ALTER TABLE orders ADD COLUMN total_paise INTEGER")
+    conn.execute("ALTER TABLE order_items ADD COLUMN total_paise INTEGER")
+    conn.execute("UPDATE orders SET total_paise = CAST(ROUND(total * 100) AS INTEGER)")
+    conn.execute("UPDATE order_items SET total_paise = CAST(ROUND(total * 100) AS INTEGER)")
+
+
+@migration(5, "Add daily and hourly sales rollups")
+def _add_rollup_tables(conn):
+    # Maintained by utils.rollups alongside every order write. The bucket is the
+    # timestamp prefix: 'YYYY-MM-DD' for daily tables, 'YYYY-MM-DD HH' for hourly ones.
+    for suffix, width in (("daily", 10), ("hourly", 13)):
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS sales_{suffix} (
+                bucket TEXT NOT NULL,
+                payment TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                revenue_paise INTEGER NOT NULL,
+                orders INTEGER NOT NULL,
+                PRIMARY KEY (bucket, payment, mode)
+            ) WITHOUT ROWID;
+        """)
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS item_sales_{suffix} (
+                bucket TEXT NOT NULL,
+                item_id INTEGER NOT NULL,
+                qty INTEGER NOT NULL,
+                revenue_paise INTEGER NOT NULL,
+                PRIMARY KEY (bucket, item_id)
+            ) WITHOUT ROWID;
+        """)
+        conn.execute(f"""
+            INSERT INTO sales_{suffix} (bucket, payment, mode, revenue_paise, orders)
+            SELECT substr(timestamp, 1, {width}), payment, mode, SUM(total_paise), COUNT(*)
+            FROM orders GROUP BY 1, 2, 3
+        """)
+        conn.execute(f"""
+            INSERT INTO item_sales_{suffix} (bucket, item_id, qty, revenue_paise)
+            SELECT substr(o.timestamp, 1, {width}), oi.item_id, SUM(oi.qty), SUM(oi.total_paise)
+            FROM orders o JOIN order_items oi ON oi.order_id = o.order_id
+            GROUP BY 1, 2
+        """)
+
+
+@migration(6, "Add indexed ts_epoch and business_date columns to orders")
+def _add_epoch_columns(conn):
+    # ts_epoch is the outlet-local wall clock in seconds (see utils.business_day.to_epoch);
+    # business_date applies the day cutoff so late-night orders land on the previous day.
+    conn.execute("ALTER TABLE orders ADD COLUMN ts_epoch INTEGER")
+    conn.execute("ALTER TABLE orders ADD COLUMN business_date TEXT")
+    conn.execute(
+        "UPDATE orders SET ts_epoch = CAST(strftime('%s', timestamp) AS INTEGER), business_date = date(timestamp, ?)",
+        (f"-{BUSINESS_DAY_CUTOFF_HOURS} hours",)
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_ts_epoch ON orders (ts_epoch)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_business_date ON orders (business_date)")
+    # Range filters and keyset pagination now seek on ts_epoch; stop maintaining this one.
+    conn.execute("DROP INDEX IF EXISTS idx_orders_timestamp")
+
+    # Daily rollups were bucketed by calendar date; re-bucket them by business date.
+    conn.execute("DELETE FROM sales_daily")
+    conn.execute("DELETE FROM item_sales_daily")
+    conn.execute("""
+        INSERT INTO sales_daily (bucket, payment, mode, revenue_paise, orders)
+        SELECT business_date, payment, mode, SUM(total_paise), COUNT(*)
+        FROM orders GROUP BY 1, 2, 3
+    """)
+    conn.execute("""
+        INSERT INTO item_sales_daily (bucket, item_id, qty, revenue_paise)
+        SELECT o.business_date, oi.item_id, SUM(oi.qty), SUM(oi.total_paise)
+        FROM orders o JOIN order_items oi ON oi.order_id = o.order_id
+        GROUP BY 1, 2
+    """)
+    conn.execute("ANALYZE")
+
+
+@migration(7, "Snapshot item and settlement details on each order")
+def _add_sale_snapshots(conn):
+    # What the customer was charged is frozen at sale time, so receipts, history and
+    # analytics stay correct after menu edits and never need to join the menu.
+    for column in ("item_name TEXT", "category TEXT", "unit_price_paise INTEGER", "gst_bp INTEGER", "gst_paise INTEGER"):
+        conn.execute(f"ALTER TABLE order_items ADD COLUMN {column}")
+    for column in ("subtotal_paise INTEGER", "discount_paise INTEGER", "tip_paise INTEGER"):
+        conn.execute(f"ALTER TABLE orders ADD COLUMN {column}")
+
+    # Best effort for existing rows: the current menu is the only price source we have.
+    conn.execute("""
+        UPDATE order_items SET
+            item_name = COALESCE((SELECT m.item_name FROM menu m WHERE m.item_id = order_items.item_id),
+                                 'Item ' || item_id),
+            category = (SELECT m.category FROM menu m WHERE m.item_id = order_items.item_id),
+            unit_price_paise = (SELECT CAST(ROUND(m.price * 100) AS INTEGER) FROM menu m WHERE m.item_id = order_items.item_id),
+            gst_bp = (SELECT CAST(ROUND(m.gst * 100) AS INTEGER) FROM menu m WHERE m.item_id = order_items.item_id)
+    """)
+    conn.execute("UPDATE order_items SET gst_paise = total_paise - unit_price_paise * qty WHERE unit_price_paise IS NOT NULL")
+    # Discount and tip were never stored; recover the net adjustment from the totals.
+    conn.execute("""
+        UPDATE orders SET subtotal_paise = COALESCE(
+            (SELECT SUM(oi.total_paise) FROM order_items oi WHERE oi.order_id = orders.order_id), total_paise)
+    """)
+    conn.execute("""
+        UPDATE orders SET
+            discount_paise = MAX(subtotal_paise - total_paise, 0),
+            tip_paise = MAX(total_paise - subtotal_paise, 0)
+    """)
+
+    for suffix, bucket in (("daily", "o.business_date"), ("hourly", "substr(o.timestamp, 1, 13)")):
+        conn.execute(f"ALTER TABLE item_sales_{suffix} ADD COLUMN item_name TEXT")
+        conn.execute(f"ALTER TABLE item_sales_{suffix} ADD COLUMN category TEXT")
+        conn.execute(f"DELETE FROM item_sales_{suffix}")
+        conn.execute(f"""
+            INSERT INTO item_sales_{suffix} (bucket, item_id, qty, revenue_paise, item_name, category)
+            SELECT {bucket}, oi.item_id, SUM(oi.qty), SUM(oi.total_paise), MAX(oi.item_name), MAX(oi.category)
+            FROM orders o JOIN order_items oi ON oi.order_id = o.order_id
+            GROUP BY 1, 2
+        """)
+
+
+@migration(8, "Store the payment transaction id on orders")
+def _add_txn_id(conn):
+    # The UPI transaction id shown in the customer's QR, for reconciling against the
+    # bank statement; NULL for cash and card orders.
+    conn.execute("ALTER TABLE orders ADD COLUMN txn_id TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_txn_id ON orders (txn_id) WHERE txn_id IS NOT NULL")
+
+
+# ----------------- Runner -----------------
+def get_schema_version(conn):
+    """
+    Returns the highest applied migration version, or 0 for an unversioned database.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        );
+    """)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def run_migrations(conn):
+    """
+    Applies every pending migration, each in its own transaction.
+
+    Returns:
+        list: The versions that were applied by this call.
+    """
+    applied = []
+    for version, description, func in MIGRATIONS:
+        if version <= get_schema_version(conn):
+            continue
+        # IMMEDIATE takes the write lock up front, so two processes racing to migrate
+        # serialize here and the loser sees the new version on its re-check.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if version <= get_schema_version(conn):
+                conn.rollback()
+                continue
+            func(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (version, description, datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+    return applied
+
+
+def bootstrap_schema(pool):
+    """
+    Brings the pool's database up to date once per process.
+
+    Returns:
+        bool: True if this call ran the bootstrap, False if it had already run.
+    """
+    if pool.db_path in _bootstrapped:
+        return False
+    with _bootstrap_lock:
+        if pool.db_path in _bootstrapped:
+            return False
+        with pool.connection() as conn:
+            run_migrations(conn)
+        _bootstrapped.add(pool.db_path)
+    return True
@@ -0,0 +1,186 @@
+import math
+import os
+from collections import namedtuple
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+
+# GST rounding policies:
+#   "line"    - round GST on every line, invoice GST is the sum of line GST.
+#   "invoice" - add up unrounded GST per rate across the invoice and round once per rate;
+#               the rounding remainder is spread over that rate's lines so they still add up.
+ROUNDING_MODES = ("line", "invoice")
+# Selects the policy the order page and the API price with; "line" when unset.
+GST_ROUNDING_ENV = "RESTAURANT_GST_ROUNDING"
+
+InvoiceTotals = namedtuple("InvoiceTotals", [
+    "base", "gst", "line_total",            # int64 arrays, one entry per line
+    "subtotal", "gst_total", "discount", "tip", "final_total",  # ints, invoice level
+])
+
+
+def gst_rounding():
+    """
+    Returns the GST rounding policy GST_ROUNDING_ENV selects.
+
+    Raises:
+        ValueError: If it names a policy not in ROUNDING_MODES.
+    """
+    rounding = os.environ.get(GST_ROUNDING_ENV, "").strip().lower() or "line"
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"{GST_ROUNDING_ENV}={rounding!r}: expected one of {', '.join(ROUNDING_MODES)}")
+    return rounding
+
+
+def to_paise(value):
+    """
+    Converts a rupee amount (int, float, str or Decimal) to integer paise, rounding half up.
+    """
+    if isinstance(value, (int, np.integer)):
+        return int(value) * 100
+    if isinstance(value, (float, np.floating)):
+        # Same rule as to_paise_array, without a Decimal round-trip on the hot path.
+        scaled = round(float(value) * 100.0, 6)
+        return int(math.floor(abs(scaled) + 0.5)) * (1 if scaled >= 0 else -1)
+    return int((Decimal(str(value)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def to_paise_array(values):
+    """
+    Vectorized `to_paise` for float arrays. Rounds to 6 places first so values such as
+    1.005 (stored as 1.00499999...) still round half up like their decimal spelling.
+    """
+    scaled = np.round(np.asarray(values, dtype=np.float64) * 100.0, 6)
+    return (np.sign(scaled) * np.floor(np.abs(scaled) + 0.5)).astype(np.int64)
+
+
+def rate_to_bp(rates):
+    """
+    Converts GST percentages (5.0, 12.0, 2.5 ...) to integer basis points (500, 1200, 250).
+    """
+    return to_paise_array(rates)
+
+
+def round_div(numerator, denominator):
+    """
+    Integer division rounding half away from zero. Works on ints and int64 arrays.
+    """
+    numerator = np.asarray(numerator, dtype=np.int64)
+    quotient = (2 * np.abs(numerator) + denominator) // (2 * denominator)
+    result = np.sign(numerator) * quotient
+    return int(result) if result.ndim == 0 else result
+
+
+def from_paise(paise):
+    """
+    Converts paise back to rupees as a float, for display and legacy REAL columns only.
+    """
+    return paise / 100.0
+
+
+def format_paise(paise, symbol="₹"):
+    """
+    Formats paise as a rupee string, e.g. 123450 -> "₹1234.50", without going through float.
+    """
+    sign = "-" if paise < 0 else ""
+    rupees, rem = divmod(abs(int(paise)), 100)
+    return f"{sign}{symbol}{rupees}.{rem:02d}"
+
+
+def price_lines_paise(prices_paise, gst_bp, qtys):
+    """
+    Prices lines exactly in paise with GST rounded per line.
+
+    Returns:
+        tuple: int64 arrays (base, gst, line_total).
+    """
+    base = np.asarray(prices_paise, dtype=np.int64) * np.asarray(qtys, dtype=np.int64)
+    gst = round_div(base * np.asarray(gst_bp, dtype=np.int64), 10000)
+    gst = np.asarray(gst, dtype=np.int64)
+    return base, gst, base + gst
+
+
+def price_line_paise(price, gst, qty):
+    """
+    Scalar version of `price_lines_paise` taking rupees and a GST percentage.
+
+    Returns:
+        tuple: ints (base, gst, line_total) in paise.
+    """
+    base = to_paise(price) * int(qty)
+    gst_amount = round_div(base * to_paise(gst), 10000)
+    return base, gst_amount, base + gst_amount
+
+
+def settle(subtotal, discount_pct=0.0, tip_pct=0.0):
+    """
+    Applies a discount to a paise subtotal, then a tip on the discounted amount.
+
+    Returns:
+        tuple: ints (discount, tip, final_total) in paise.
+    """
+    discount = round_div(subtotal * to_paise(discount_pct), 10000)
+    tip = round_div((subtotal - discount) * to_paise(tip_pct), 10000)
+    return discount, tip, subtotal - discount + tip
+
+
+def price_invoice(prices, gsts, qtys, discount_pct=0.0, tip_pct=0.0, rounding="line"):
+    """
+    Prices one invoice with integer paise arithmetic.
+
+    Args:
+        prices (array-like): Unit prices in rupees.
+        gsts (array-like): GST percentage per line.
+        qtys (array-like): Quantity per line.
+        discount_pct (float): Discount on the GST-inclusive subtotal.
+        tip_pct (float): Tip on the amount after discount.
+        rounding (str): "line" or "invoice"; see ROUNDING_MODES.
+
+    Returns:
+        InvoiceTotals: Per-line arrays and invoice totals, all in paise. The lines' gst
+            always sums to gst_total and their line_total to subtotal.
+    """
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"Unknown GST rounding mode: {rounding}")
+
+    gst_bp = rate_to_bp(gsts)
+    base, gst, line_total = price_lines_paise(to_paise_array(prices), gst_bp, qtys)
+
+    if rounding == "invoice" and len(base):
+        gst = _allocate_invoice_gst(base, gst_bp)
+        line_total = base + gst
+    gst_total = int(gst.sum())
+
+    subtotal = int(base.sum()) + gst_total
+    discount, tip, final_total = settle(subtotal, discount_pct, tip_pct)
+    return InvoiceTotals(
+        base=base,
+        gst=gst,
+        line_total=line_total,
+        subtotal=subtotal,
+        gst_total=gst_total,
+        discount=discount,
+        tip=tip,
+        final_total=final_total,
+    )
+
+
+def _allocate_invoice_gst(base, gst_bp):
+    """
+    Rounds GST once per distinct rate, on the exact sum of that rate's bases, then hands
+    each rate's total back to its lines: every line gets its exact GST rounded down, and
+    the paise left over go one each to the lines with the largest dropped fractions
+    (earlier lines first on ties).
+    """
+    exact = base * np.asarray(gst_bp, dtype=np.int64)  # GST in 1/10000 paise
+    gst = exact // 10000
+    fraction = exact % 10000
+    rates, group = np.unique(gst_bp, return_inverse=True)
+    for rate_index in range(len(rates)):
+        lines = np.flatnonzero(group == rate_index)
+        leftover = round_div(int(exact[lines].sum()), 10000) - int(gst[lines].sum())
+        if leftover:
+            # Stable sort on the negated fraction: largest first, input order on ties.
+            order = lines[np.argsort(-fraction[lines], kind="stable")]
+            gst[order[:leftover]] += 1
+    return gst
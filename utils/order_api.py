@@ -0,0 +1,344 @@
+import asyncio
+import datetime
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from utils.analytics import AnalyticsSnapshot
+from utils.data_cache import DataCache
+from utils.db_pool import get_pool
+from utils.db_writer import get_writer
+from utils.menu_catalog import get_menu_catalog
+from utils.money import from_paise, gst_rounding, price_invoice
+from utils.order_history import get_history_page, get_receipt
+from utils.order_store import TIMESTAMP_FORMAT
+
+# A headless JSON API over the same data layer as the Streamlit app, for kiosks, kitchen
+# screens and extra terminals. Plain asyncio HTTP/1.1 with keep-alive; every database
+# call runs on a worker thread so the event loop only parses and routes.
+#
+#   GET  /health
+#   GET  /menu                                  -> {"version", "items"}
+#   POST /orders          {order} or [{order}]  -> {"order_id", "total_paise"} (or a list)
+#   GET  /orders/<id>                           -> the stored receipt
+#   GET  /orders?start=&end=[&limit=&cursor=&items=1]   -> one history page
+#   GET  /analytics?start=&end=[&top=]          -> dashboard figures
+#
+# An order is {"mode", "payment", "items": [{"item_id", "qty"}], "discount_pct",
+# "tip_pct", "txn_id"}; prices and GST always come from the menu, never the client.
+
+MAX_BODY_BYTES = 1 << 20
+MAX_PAGE = 500
+MAX_TOP = 100
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 411: "Length Required", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    """
+    A request the API rejects; rendered as {"error": message} with `status`.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _day(query, name, default=None):
+    value = query.get(name, [None])[0]
+    if value is None:
+        if default is None:
+            raise ApiError(400, f"missing query parameter '{name}'")
+        return default
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ApiError(400, f"'{name}' must be YYYY-MM-DD")
+
+
+def _int(query, name, default, low=None, high=None):
+    try:
+        value = int(query.get(name, [default])[0])
+    except ValueError:
+        raise ApiError(400, f"'{name}' must be an integer")
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise ApiError(400, f"'{name}' must be between {low} and {high}")
+    return value
+
+
+def price_order(request, menu):
+    """
+    Turns an API order request into the order dict order_store expects, priced from the
+    menu exactly as the order page prices it.
+
+    Args:
+        menu (dict): {item_id: menu row}, e.g. MenuCatalog.as_dict().
+
+    Raises:
+        ApiError: If the request is malformed or names an unknown item.
+    """
+    if not isinstance(request, dict):
+        raise ApiError(400, "an order must be a JSON object")
+    lines = request.get("items")
+    if not lines or not isinstance(lines, list):
+        raise ApiError(400, "order has no items")
+    rows, qtys = [], []
+    for line in lines:
+        try:
+            item_id, qty = int(line["item_id"]), int(line["qty"])
+        except (KeyError, TypeError, ValueError):
+            raise ApiError(400, "each item needs an integer item_id and qty")
+        row = menu.get(item_id)
+        if row is None:
+            raise ApiError(400, f"unknown item_id {item_id}")
+        if qty <= 0:
+            raise ApiError(400, f"item {item_id} has non-positive qty {qty}")
+        rows.append(row)
+        qtys.append(qty)
+    try:
+        discount_pct = float(request.get("discount_pct", 0.0))
+        tip_pct = float(request.get("tip_pct", 0.0))
+    except (TypeError, ValueError):
+        raise ApiError(400, "discount_pct and tip_pct must be numbers")
+    if not (0 <= discount_pct <= 100 and 0 <= tip_pct <= 100):
+        raise ApiError(400, "discount_pct and tip_pct must be between 0 and 100")
+
+    invoice = price_invoice([row["price"] for row in rows], [row["gst"] for row in rows], qtys,
+                            discount_pct, tip_pct, rounding=gst_rounding())
+    items = []
+    for row, qty, line_gst, line_total in zip(rows, qtys, invoice.gst.tolist(), invoice.line_total.tolist()):
+        items.append({
+            "item_id": row["item_id"],
+            "name": row["item_name"],
+            "qty": qty,
+            "category": row["category"],
+            "unit_price": row["price"],
+            "gst": row["gst"],
+            "gst_amount": from_paise(line_gst),
+            "total": from_paise(line_total),
+            "total_paise": line_total,
+        })
+    return {
+        "mode": request.get("mode", ""),
+        "payment": request.get("payment", ""),
+        "timestamp": datetime.datetime.now().strftime(TIMESTAMP_FORMAT),
+        "total": from_paise(invoice.final_total),
+        "total_paise": invoice.final_total,
+        "subtotal_paise": invoice.subtotal,
+        "discount_paise": invoice.discount,
+        "tip_paise": invoice.tip,
+        "txn_id": request.get("txn_id"),
+        "items": items,
+    }
+
+
+class OrderApi:
+    """
+    Routes API requests to the data layer. The `_get_*` handlers and order pricing are
+    blocking and run on the executor. Orders are written by the process's DbWriter, which
+    group-commits them with every other writer's intents.
+    """
+
+    def __init__(self, pool=None, workers=None):
+        self._pool = pool or get_pool()
+        self._executor = ThreadPoolExecutor(max_workers=workers or self._pool.max_connections,
+                                            thread_name_prefix="order-api")
+        self._catalog = get_menu_catalog(self._pool)
+        self._analytics = DataCache(self._compute_analytics, ("orders",), date_range=("start_date", "end_date"),
+                                    pool=self._pool)
+        self._writer = get_writer(self._pool)
+
+    # ----------------- Handlers -----------------
+    def _get_menu(self, query):
+        snapshot = self._catalog.snapshot()
+        return 200, {"version": snapshot.version, "items": snapshot.items}
+
+    def _price_orders(self, body):
+        # A batch rejects only its bad orders: each slot is a priced order or the ApiError.
+        menu = self._catalog.as_dict()
+        if not isinstance(body, list):
+            return [price_order(body, menu)]
+        priced = []
+        for request in body:
+            try:
+                priced.append(price_order(request, menu))
+            except ApiError as e:
+                priced.append(e)
+        return priced
+
+    def _get_order(self, order_id):
+        receipt = get_receipt(order_id, pool=self._pool)
+        if receipt is None:
+            raise ApiError(404, f"order {order_id} not found")
+        return 200, receipt
+
+    def _get_orders(self, query):
+        start = _day(query, "start")
+        end = _day(query, "end", start)
+        cursor = query.get("cursor", [None])[0]
+        if cursor is not None:
+            try:
+                cursor = tuple(int(part) for part in cursor.split(","))
+            except ValueError:
+                cursor = ()
+            if len(cursor) != 2:
+                raise ApiError(400, "'cursor' must be the next_cursor of the previous page")
+        page = get_history_page(start, end, page_size=_int(query, "limit", 25, 1, MAX_PAGE), cursor=cursor,
+                                include_items=query.get("items", ["0"])[0] == "1", pool=self._pool)
+        next_cursor = ",".join(str(part) for part in page.next_cursor) if page.next_cursor else None
+        return 200, {"orders": page.orders, "next_cursor": next_cursor}
+
+    def _compute_analytics(self, start_date, end_date, top_n):
+        result = AnalyticsSnapshot(self._pool, top_n=top_n).compute(start_date, end_date)
+        return {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "total_revenue": result.total_revenue,
+            "num_orders": result.num_orders,
+            "avg_order_value": result.avg_order_value,
+            "daily_sales": result.daily_sales.to_dict(orient="records"),
+            "payment_sales": result.payment_sales.to_dict(orient="records"),
+            "category_sales": result.category_sales.to_dict(orient="records"),
+            "top_items": [{"item_name": name, "qty": qty} for name, qty in result.top_items],
+        }
+
+    def _get_analytics(self, query):
+        start = _day(query, "start")
+        end = _day(query, "end", start)
+        return 200, self._analytics(start, end, _int(query, "top", 5, 1, MAX_TOP))
+
+    # ----------------- Routing -----------------
+    async def dispatch(self, method, target, body):
+        """
+        Returns (status, payload) for one request.
+        """
+        loop = asyncio.get_running_loop()
+        url = urlsplit(target)
+        path, query = url.path.rstrip("/") or "/", parse_qs(url.query)
+        if path == "/health":
+            return 200, {"status": "ok", "writer": self._writer.stats()}
+        if path == "/orders" and method == "POST":
+            payload = self._decode(body)
+            orders = await loop.run_in_executor(self._executor, self._price_orders, payload)
+            order_ids = await asyncio.gather(
+                *(self._place(order) for order in orders if not isinstance(order, ApiError)),
+                return_exceptions=True
+            )
+            order_ids = iter(order_ids)
+            placed = []
+            for order in orders:
+                order_id = order if isinstance(order, ApiError) else next(order_ids)
+                if isinstance(order_id, BaseException):
+                    if not isinstance(payload, list):
+                        raise order_id
+                    placed.append({"error": str(order_id)})
+                else:
+                    placed.append({"order_id": order_id, "total_paise": order["total_paise"]})
+            return 201, placed if isinstance(payload, list) else placed[0]
+        if method != "GET":
+            raise ApiError(405, f"{method} is not allowed on {path}")
+        if path == "/menu":
+            handler, argument = self._get_menu, query
+        elif path == "/orders":
+            handler, argument = self._get_orders, query
+        elif path.startswith("/orders/") and path[len("/orders/"):].isdigit():
+            handler, argument = self._get_order, int(path[len("/orders/"):])
+        elif path == "/analytics":
+            handler, argument = self._get_analytics, query
+        else:
+            raise ApiError(404, f"no route for {path}")
+        return await loop.run_in_executor(self._executor, handler, argument)
+
+    async def _place(self, order):
+        try:
+            return await asyncio.wrap_future(self._writer.insert_order(order))
+        except (ValueError, TypeError, KeyError) as e:
+            raise ApiError(400, str(e))
+
+    @staticmethod
+    def _decode(body):
+        try:
+            return json.loads(body or b"null")
+        except ValueError:
+            raise ApiError(400, "request body is not valid JSON")
+
+    # ----------------- HTTP -----------------
+    async def handle_connection(self, reader, writer):
+        """
+        Serves one client connection, answering requests until it closes or asks to.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, close=True)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                close = headers.get("connection", "").lower() == "close" or version == "HTTP/1.0"
+
+                body = b""
+                if "transfer-encoding" in headers:
+                    await self._respond(writer, 411, {"error": "send a Content-Length body"}, close=True)
+                    break
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "invalid Content-Length"}, close=True)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "request body too large"}, close=True)
+                    break
+                if length:
+                    body = await reader.readexactly(length)
+
+                try:
+                    status, payload = await self.dispatch(method.upper(), target, body)
+                except ApiError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                await self._respond(writer, status, payload, close=close)
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, close=False):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host="127.0.0.1", port=8000, ready=None):
+        """
+        Runs the server until cancelled. `ready`, if given, is called with the bound (host, port).
+        """
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+        if ready:
+            ready(server.sockets[0].getsockname()[:2])
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,88 @@
+import os
+import tempfile
+
+import pandas as pd
+import xlsxwriter
+
+from utils.db_pool import get_pool
+from utils.order_history import iter_history_rows
+from utils.tracing import traced
+
+EXPORT_COLUMNS = [
+    "Order ID", "Timestamp", "Mode", "Payment", "Item Name", "Qty",
+    "Unit Price", "Total (with GST)", "Order Total",
+]
+SHEET_NAME = "Order History"
+MAX_SHEET_ROWS = 1_048_576  # Excel's hard limit, header row included
+
+
+@traced(rows=None)
+def export_order_csv(order_id, pool=None):
+    """
+    Returns one order's lines (item_name, qty, total) as CSV text, for the receipt download.
+    """
+    pool = pool or get_pool()
+    with pool.connection() as conn:
+        df = pd.read_sql("SELECT item_name, qty, total FROM order_items WHERE order_id = ?",
+                         conn, params=(int(order_id),))
+    return df.to_csv(index=False)
+
+
+def write_order_history_xlsx(path, start_date, end_date, chunk_size=5000, pool=None):
+    """
+    Streams the order history for a date range into an .xlsx file.
+
+    The workbook is written in xlsxwriter's constant_memory mode, which flushes every row
+    to disk as soon as the next one starts, and rows come from the database cursor in
+    chunks. Ranges larger than one sheet continue on "Order History (2)", "(3)" and so on.
+
+    Args:
+        path (str): Destination file.
+        chunk_size (int): Rows fetched from the cursor at a time.
+
+    Returns:
+        int: Number of line items written.
+    """
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    try:
+        header_format = workbook.add_format({"bold": True})
+        money_format = workbook.add_format({"num_format": "0.00"})
+        sheets = 0
+        worksheet, row_num, written = None, MAX_SHEET_ROWS, 0
+
+        for row in iter_history_rows(start_date, end_date, chunk_size=chunk_size, pool=pool):
+            if row_num == MAX_SHEET_ROWS:
+                sheets += 1
+                worksheet = workbook.add_worksheet(SHEET_NAME if sheets == 1 else f"{SHEET_NAME} ({sheets})")
+                worksheet.write_row(0, 0, EXPORT_COLUMNS, header_format)
+                worksheet.set_column(1, 1, 20)
+                worksheet.set_column(4, 4, 28)
+                worksheet.set_column(6, 8, 14, money_format)
+                row_num = 1
+            worksheet.write_row(row_num, 0, row)
+            row_num += 1
+            written += 1
+
+        if worksheet is None:
+            worksheet = workbook.add_worksheet(SHEET_NAME)
+            worksheet.write_row(0, 0, EXPORT_COLUMNS, header_format)
+    finally:
+        workbook.close()
+    return written
+
+
+def export_order_history_xlsx(start_date, end_date, chunk_size=5000, pool=None):
+    """
+    Builds the order history workbook in a temporary file and returns its bytes.
+
+    Only the finished (compressed) file is ever held in memory; the temporary file is
+    removed before returning.
+    """
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        write_order_history_xlsx(path, start_date, end_date, chunk_size=chunk_size, pool=pool)
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
@@ -0,0 +1,230 @@
+from collections import namedtuple
+
+from utils.business_day import business_day_bounds
+from utils.data_cache import cached
+from utils.db_pool import get_pool
+from utils.tracing import traced
+
+ORDER_COLUMNS = ["order_id", "mode", "payment", "timestamp", "total"]
+LINE_COLUMNS = ["order_id", "item_id", "item_name", "qty", "unit_price", "gst_rate", "gst_amount", "total"]
+
+# Line values as snapshotted at sale time; rows backfilled for items no longer on the
+# menu may lack a price.
+_LINE_SELECT = """
+    oi.item_id, oi.item_name, oi.qty, COALESCE(oi.unit_price_paise, 0) / 100.0,
+    COALESCE(oi.gst_bp, 0) / 100.0, COALESCE(oi.gst_paise, 0) / 100.0, oi.total
+"""
+
+# Receipt fields as stored at sale time, amounts in paise (see get_receipt).
+RECEIPT_COLUMNS = ["order_id", "mode", "payment", "timestamp", "total_paise", "subtotal_paise", "discount_paise", "tip_paise",
+                   "txn_id"]
+RECEIPT_LINE_COLUMNS = ["item_id", "item_name", "qty", "unit_price_paise", "gst_bp", "gst_paise", "total_paise"]
+_RECEIPT_SELECT = """
+    order_id, mode, payment, timestamp, total_paise,
+    subtotal_paise, COALESCE(discount_paise, 0), COALESCE(tip_paise, 0), txn_id
+"""
+_RECEIPT_LINE_SELECT = """
+    item_id, item_name, qty, COALESCE(unit_price_paise, 0), COALESCE(gst_bp, 0),
+    COALESCE(gst_paise, 0), total_paise
+"""
+
+# orders: list of order dicts (newest first). next_cursor: pass back to get the next page,
+# None on the last page.
+HistoryPage = namedtuple("HistoryPage", ["orders", "next_cursor"])
+
+
+def _range_params(start_date, end_date):
+    return list(business_day_bounds(start_date, end_date))
+
+
+@traced(rows=None)
+@cached(depends_on=("orders",), date_range=("start_date", "end_date"))
+def count_orders(start_date, end_date, pool=None):
+    """
+    Counts orders in the business-date range (an index-only scan on orders.business_date),
+    cached until an order in the range changes.
+    """
+    pool = pool or get_pool()
+    with pool.connection() as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM orders WHERE business_date BETWEEN ? AND ?",
+            (start_date.isoformat(), end_date.isoformat())
+        ).fetchone()[0]
+
+
+@traced(rows=lambda page: len(page.orders))
+def get_history_page(start_date, end_date, page_size=25, cursor=None, include_items=False, pool=None):
+    """
+    Returns one page of orders in the business-date range, newest first, using keyset pagination.
+
+    The cursor is the (ts_epoch, order_id) of the last order on the previous page, so
+    every page is an index seek plus `page_size` rows no matter how deep it is.
+
+    Args:
+        include_items (bool): Also fetch each order's lines, in the same query, under "items".
+    """
+    pool = pool or get_pool()
+    params = _range_params(start_date, end_date)
+    keyset = ""
+    if cursor is not None:
+        keyset = "AND (ts_epoch, order_id) < (?, ?)"
+        params += list(cursor)
+    params.append(page_size + 1)  # one extra row tells us whether another page exists
+
+    page_query = f"""
+        SELECT {', '.join(ORDER_COLUMNS)}, ts_epoch
+        FROM orders
+        WHERE ts_epoch >= ? AND ts_epoch < ? {keyset}
+        ORDER BY ts_epoch DESC, order_id DESC
+        LIMIT ?
+    """
+    with pool.connection() as conn:
+        if not include_items:
+            rows = conn.execute(page_query, params).fetchall()
+            orders = [dict(zip(ORDER_COLUMNS + ["ts_epoch"], row)) for row in rows]
+        else:
+            rows = conn.execute(
+                f"""
+                WITH page AS ({page_query})
+                SELECT page.*, {_LINE_SELECT}
+                FROM page
+                LEFT JOIN order_items oi ON oi.order_id = page.order_id
+                ORDER BY page.ts_epoch DESC, page.order_id DESC
+                """,
+                params
+            ).fetchall()
+            orders = []
+            for row in rows:
+                if not orders or orders[-1]["order_id"] != row[0]:
+                    orders.append(dict(zip(ORDER_COLUMNS + ["ts_epoch"], row), items=[]))
+                if row[6] is not None:
+                    orders[-1]["items"].append(dict(zip(LINE_COLUMNS, (row[0],) + row[6:])))
+
+    next_cursor = None
+    if len(orders) > page_size:
+        orders = orders[:page_size]
+        next_cursor = (orders[-1]["ts_epoch"], orders[-1]["order_id"])
+    return HistoryPage(orders, next_cursor)
+
+
+@traced(rows=lambda lines: sum(len(order_lines) for order_lines in lines.values()))
+def get_order_lines(order_ids, pool=None):
+    """
+    Loads the lines of several orders with one query.
+
+    Returns:
+        dict: {order_id: [line dicts]}; orders without lines map to an empty list.
+    """
+    order_ids = [int(order_id) for order_id in order_ids]
+    lines = {order_id: [] for order_id in order_ids}
+    if not order_ids:
+        return lines
+    pool = pool or get_pool()
+    placeholders = ", ".join("?" for _ in order_ids)
+    with pool.connection() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT oi.order_id, {_LINE_SELECT}
+            FROM order_items oi
+            WHERE oi.order_id IN ({placeholders})
+            ORDER BY oi.order_id, oi.rowid
+            """,
+            order_ids
+        ).fetchall()
+    for row in rows:
+        lines[row[0]].append(dict(zip(LINE_COLUMNS, row)))
+    return lines
+
+
+@traced(rows=lambda receipt: len(receipt["items"]))
+def get_receipt(order_id, pool=None):
+    """
+    Loads everything needed to reprint one order's receipt from the stored snapshot.
+
+    Returns:
+        dict: The order's columns (amounts in paise, see order_store.ORDER_ROW) plus
+            "order_id" and "items", a list of line dicts; None if the order does not exist.
+    """
+    pool = pool or get_pool()
+    with pool.connection() as conn:
+        row = conn.execute(f"SELECT {_RECEIPT_SELECT} FROM orders WHERE order_id = ?", (int(order_id),)).fetchone()
+        if row is None:
+            return None
+        receipt = dict(zip(RECEIPT_COLUMNS, row))
+        receipt["items"] = [
+            dict(zip(RECEIPT_LINE_COLUMNS, line))
+            for line in conn.execute(
+                f"SELECT {_RECEIPT_LINE_SELECT} FROM order_items WHERE order_id = ? ORDER BY rowid",
+                (int(order_id),)
+            )
+        ]
+    return receipt
+
+
+def iter_receipts(start_date, end_date, chunk_size=500, pool=None):
+    """
+    Yields the receipt (as returned by get_receipt) of every order in the business-date
+    range, oldest first.
+
+    Orders are read `chunk_size` at a time by keyset on (ts_epoch, order_id), with one
+    query for each chunk's lines, and no connection is held between chunks, so memory
+    stays flat and writers are never blocked however long the range is.
+    """
+    pool = pool or get_pool()
+    lower, upper = _range_params(start_date, end_date)
+    cursor = (lower - 1, 0)
+    while True:
+        with pool.connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {_RECEIPT_SELECT}, ts_epoch
+                FROM orders
+                WHERE ts_epoch >= ? AND ts_epoch < ? AND (ts_epoch, order_id) > (?, ?)
+                ORDER BY ts_epoch, order_id
+                LIMIT ?
+                """,
+                (lower, upper) + cursor + (chunk_size,)
+            ).fetchall()
+            if not rows:
+                return
+            receipts = {row[0]: dict(zip(RECEIPT_COLUMNS, row), items=[]) for row in rows}
+            placeholders = ", ".join("?" for _ in receipts)
+            for line in conn.execute(
+                f"""
+                SELECT order_id, {_RECEIPT_LINE_SELECT}
+                FROM order_items WHERE order_id IN ({placeholders})
+                ORDER BY order_id, rowid
+                """,
+                list(receipts)
+            ):
+                receipts[line[0]]["items"].append(dict(zip(RECEIPT_LINE_COLUMNS, line[1:])))
+        yield from receipts.values()
+        cursor = (rows[-1][-1], rows[-1][0])
+
+
+def iter_history_rows(start_date, end_date, chunk_size=5000, pool=None):
+    """
+    Yields one flat tuple per order line in the range (newest order first), from a single
+    joined query: (order_id, timestamp, mode, payment, item_name, qty, unit_price, line_total, order_total).
+
+    Rows are pulled from the cursor `chunk_size` at a time, so memory stays flat however
+    long the range is.
+    """
+    pool = pool or get_pool()
+    with pool.connection() as conn:
+        cursor = conn.execute(
+            """
+            SELECT o.order_id, o.timestamp, o.mode, o.payment,
+                   oi.item_name, oi.qty, COALESCE(oi.unit_price_paise, 0) / 100.0, oi.total, o.total
+            FROM orders o
+            JOIN order_items oi ON oi.order_id = o.order_id
+            WHERE o.ts_epoch >= ? AND o.ts_epoch < ?
+            ORDER BY o.ts_epoch DESC, o.order_id DESC
+            """,
+            _range_params(start_date, end_date)
+        )
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
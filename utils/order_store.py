@@ -0,0 +1,250 @@
+import datetime
+import time
+from collections import namedtuple
+from itertools import islice
+
+from utils.business_day import business_date, to_epoch
+from utils.data_cache import bump_data_version
+from utils.db_pool import get_pool
+from utils.money import to_paise
+from utils.rollups import apply_orders, remove_orders
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Layouts of the normalized rows _order_row returns (and utils.rollups consumes).
+ORDER_ROW = ("mode", "payment", "timestamp", "total", "total_paise", "ts_epoch", "business_date",
+             "subtotal_paise", "discount_paise", "tip_paise", "txn_id")
+ITEM_ROW = ("item_id", "qty", "total", "total_paise", "item_name", "category", "unit_price_paise", "gst_bp", "gst_paise")
+
+# order_ids lines up with the input: the new id, or None where the order was rejected.
+# errors is a list of (input index, message) for the rejected orders.
+BulkResult = namedtuple("BulkResult", ["order_ids", "errors", "inserted", "seconds"])
+
+
+def _order_row(order):
+    """
+    Validates one order dict and returns its normalized (order_row, item_rows).
+
+    Raises:
+        ValueError: If the order is malformed.
+    """
+    for field in ("mode", "payment", "timestamp", "total", "items"):
+        if field not in order:
+            raise ValueError(f"missing field '{field}'")
+    mode, payment = str(order["mode"]).strip(), str(order["payment"]).strip()
+    if not mode or not payment:
+        raise ValueError("mode and payment must not be empty")
+    timestamp = str(order["timestamp"])
+    try:
+        # fromisoformat is far cheaper than strptime; the length check pins the exact layout.
+        if len(timestamp) != 19 or timestamp[10] != " ":
+            raise ValueError
+        moment = datetime.datetime.fromisoformat(timestamp)
+    except ValueError:
+        raise ValueError(f"timestamp '{timestamp}' is not in {TIMESTAMP_FORMAT} format")
+    total = float(order["total"])
+    if total < 0:
+        raise ValueError("total must not be negative")
+    if not order["items"]:
+        raise ValueError("order has no items")
+
+    item_rows = []
+    for item in order["items"]:
+        qty = int(item["qty"])
+        item_total = float(item["total"])
+        if qty <= 0:
+            raise ValueError(f"item {item.get('item_id')} has non-positive qty {qty}")
+        if item_total < 0:
+            raise ValueError(f"item {item.get('item_id')} has a negative total")
+        # Sale-time snapshot; anything the caller leaves out is filled from the menu on insert.
+        unit_price_paise = item.get("unit_price_paise")
+        if unit_price_paise is None and item.get("unit_price") is not None:
+            unit_price_paise = to_paise(item["unit_price"])
+        gst_bp = item.get("gst_bp")
+        if gst_bp is None and item.get("gst") is not None:
+            gst_bp = to_paise(item["gst"])
+        gst_paise = item.get("gst_paise")
+        if gst_paise is None and item.get("gst_amount") is not None:
+            gst_paise = to_paise(item["gst_amount"])
+        item_rows.append([
+            int(item["item_id"]), qty, item_total, int(item.get("total_paise", to_paise(item_total))),
+            item.get("item_name", item.get("name")), item.get("category"), unit_price_paise, gst_bp, gst_paise,
+        ])
+
+    total_paise = int(order.get("total_paise", to_paise(total)))
+    subtotal_paise = int(order.get("subtotal_paise", sum(row[3] for row in item_rows)))
+    if "discount_paise" in order or "tip_paise" in order:
+        discount_paise, tip_paise = int(order.get("discount_paise", 0)), int(order.get("tip_paise", 0))
+        if discount_paise < 0 or tip_paise < 0:
+            raise ValueError("discount and tip must not be negative")
+    else:
+        # Callers that only know the final total get the net adjustment recorded.
+        discount_paise, tip_paise = max(subtotal_paise - total_paise, 0), max(total_paise - subtotal_paise, 0)
+
+    txn_id = order.get("txn_id")
+    order_row = (
+        mode, payment, timestamp, total, total_paise, to_epoch(moment), business_date(moment),
+        subtotal_paise, discount_paise, tip_paise, str(txn_id) if txn_id else None,
+    )
+    return order_row, item_rows
+
+
+def _fill_snapshots(conn, item_rows):
+    """
+    Completes item rows whose name, category, unit price or GST rate the caller did not
+    supply, from the current menu.
+    """
+    missing = {row[0] for row in item_rows if None in row[4:8]}
+    if missing:
+        placeholders = ", ".join("?" for _ in missing)
+        menu = {
+            item_id: (item_name, category, to_paise(price), to_paise(gst))
+            for item_id, item_name, category, price, gst in conn.execute(
+                f"SELECT item_id, item_name, category, price, gst FROM menu WHERE item_id IN ({placeholders})",
+                list(missing)
+            )
+        }
+        for row in item_rows:
+            if row[0] in missing:
+                known = menu.get(row[0], (f"Item {row[0]}", None, None, None))
+                row[4:8] = [value if value is not None else default for value, default in zip(row[4:8], known)]
+    for row in item_rows:
+        if row[8] is None and row[6] is not None:
+            row[8] = row[3] - row[6] * row[1]
+
+
+def insert_order(conn, order):
+    """
+    Inserts one order and its items on `conn` inside the caller's transaction.
+
+    Returns:
+        int: The new order_id.
+    """
+    order_row, item_rows = _order_row(order)
+    _fill_snapshots(conn, item_rows)
+    cur = conn.execute(
+        f"INSERT INTO orders ({', '.join(ORDER_ROW)}) VALUES ({', '.join('?' for _ in ORDER_ROW)})",
+        order_row
+    )
+    order_id = cur.lastrowid
+    conn.executemany(
+        f"INSERT INTO order_items (order_id, {', '.join(ITEM_ROW)}) VALUES (?, {', '.join('?' for _ in ITEM_ROW)})",
+        [[order_id] + row for row in item_rows]
+    )
+    apply_orders(conn, [(order_row, item_rows)])
+    bump_data_version(conn, "orders", day=order_row[6])
+    return order_id
+
+
+def insert_order_rows(conn, batch, update_rollups=True):
+    """
+    Inserts an already validated batch of (order_row, item_rows) with one executemany per
+    table, on `conn` inside the caller's BEGIN IMMEDIATE transaction.
+
+    Rows are laid out as ORDER_ROW and ITEM_ROW (item rows as lists) and are not checked
+    again; importers that build them directly skip _order_row's per-field validation.
+    Bulk loads that call rollups.rebuild_rollups over the loaded days afterwards can pass
+    update_rollups=False.
+
+    Returns:
+        list: The new order_ids, in batch order.
+    """
+    # Ids are assigned up front so items can reference them without a lastrowid per
+    # order. Safe because the caller holds the write lock (BEGIN IMMEDIATE).
+    next_id = conn.execute("SELECT COALESCE(MAX(order_id), 0) + 1 FROM orders").fetchone()[0]
+    order_ids = list(range(next_id, next_id + len(batch)))
+    _fill_snapshots(conn, [row for _, item_rows in batch for row in item_rows])
+
+    conn.executemany(
+        f"INSERT INTO orders (order_id, {', '.join(ORDER_ROW)}) VALUES (?, {', '.join('?' for _ in ORDER_ROW)})",
+        [(order_id,) + order_row for order_id, (order_row, _) in zip(order_ids, batch)]
+    )
+    conn.executemany(
+        f"INSERT INTO order_items (order_id, {', '.join(ITEM_ROW)}) VALUES (?, {', '.join('?' for _ in ITEM_ROW)})",
+        [
+            [order_id] + row
+            for order_id, (_, item_rows) in zip(order_ids, batch)
+            for row in item_rows
+        ]
+    )
+    if update_rollups:
+        apply_orders(conn, batch)
+    for day in {order_row[6] for order_row, _ in batch}:
+        bump_data_version(conn, "orders", day=day)
+    return order_ids
+
+
+def delete_orders(conn, order_ids):
+    """
+    Deletes orders and their items on `conn` inside the caller's transaction, taking
+    them out of the rollups first.
+
+    Returns:
+        int: Number of orders deleted.
+    """
+    order_ids = [int(order_id) for order_id in order_ids]
+    if not order_ids:
+        return 0
+    placeholders = ", ".join("?" for _ in order_ids)
+    days = [row[0] for row in conn.execute(
+        f"SELECT DISTINCT business_date FROM orders WHERE order_id IN ({placeholders})", order_ids
+    )]
+    remove_orders(conn, order_ids)
+    conn.execute(f"DELETE FROM order_items WHERE order_id IN ({placeholders})", order_ids)
+    deleted = conn.execute(f"DELETE FROM orders WHERE order_id IN ({placeholders})", order_ids).rowcount
+    for day in days:
+        bump_data_version(conn, "orders", day=day)
+    return deleted
+
+
+def save_orders_bulk(orders, batch_size=1000, pool=None):
+    """
+    Streams orders into the database, committing once per batch.
+
+    Each order is validated on its own; a malformed order is reported in `errors` and
+    skipped without aborting the rest of its batch.
+
+    Args:
+        orders (iterable): Order dicts shaped like save_order_to_db's input. May be a generator.
+        batch_size (int): Orders per transaction.
+        pool (ConnectionPool): Target database; the restaurant database by default.
+
+    Returns:
+        BulkResult: Assigned ids in input order, per-order errors, count inserted and elapsed seconds.
+    """
+    pool = pool or get_pool()
+    started = time.perf_counter()
+    order_ids = []
+    errors = []
+    inserted = 0
+    orders = iter(orders)
+
+    while True:
+        chunk = list(islice(orders, batch_size))
+        if not chunk:
+            break
+        offset = len(order_ids)
+        batch, positions = [], []
+        for i, order in enumerate(chunk):
+            try:
+                batch.append(_order_row(order))
+                positions.append(i)
+            except (ValueError, TypeError, KeyError) as e:
+                errors.append((offset + i, str(e)))
+
+        chunk_ids = [None] * len(chunk)
+        if batch:
+            with pool.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    ids = insert_order_rows(conn, batch)
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+            for position, order_id in zip(positions, ids):
+                chunk_ids[position] = order_id
+            inserted += len(ids)
+        order_ids.extend(chunk_ids)
+
+    return BulkResult(order_ids, errors, inserted, time.perf_counter() - started)
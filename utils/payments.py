@@ -0,0 +1,299 @@
+import abc
+import importlib
+import os
+import random
+import threading
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Payment states. PENDING and PROCESSING are in flight; the rest are final.
+PENDING = "pending"
+PROCESSING = "processing"
+APPROVED = "approved"
+DECLINED = "declined"
+FAILED = "failed"
+FINAL_STATES = (APPROVED, DECLINED, FAILED)
+
+# Names the gateway card and UPI payments are charged through: "simulated" for
+# SimulatedGateway, or "package.module:ClassName" for a PaymentGateway subclass built
+# with no arguments. Unset (or "manual") means no gateway: the cashier confirms each
+# card and UPI payment by hand.
+GATEWAY_ENV = "RESTAURANT_PAYMENT_GATEWAY"
+
+# A snapshot of one payment. reference: the gateway's id for an approved charge.
+# message: why it was declined or failed. Times are time.time() seconds.
+PaymentStatus = namedtuple("PaymentStatus", [
+    "payment_id", "method", "amount_paise", "txn_id", "state", "reference", "message",
+    "attempts", "submitted_at", "finished_at",
+])
+
+# What a gateway's charge() returns when it reaches a decision.
+ChargeResult = namedtuple("ChargeResult", ["approved", "reference", "message"])
+
+
+class GatewayError(Exception):
+    """
+    A transient gateway failure (timeout, connection reset); the charge may be retried.
+    """
+
+
+class PaymentGateway(abc.ABC):
+    """
+    Interface to a payment provider. charge() blocks until the provider decides and is
+    only ever called from PaymentQueue's worker threads, never from a UI thread.
+
+    A charge that raised GatewayError may still have gone through, so it is retried with
+    the same txn_id; implementations should send it as the provider's idempotency key.
+    """
+
+    @abc.abstractmethod
+    def charge(self, method, amount_paise, txn_id):
+        """
+        Charges `amount_paise` by `method` ("Card", "UPI", ...).
+
+        Returns:
+            ChargeResult: Approved or declined.
+
+        Raises:
+            GatewayError: If the provider could not be reached or did not answer.
+        """
+
+
+class SimulatedGateway(PaymentGateway):
+    """
+    A local stand-in for a real provider: every charge takes a random time within
+    `latency` seconds, is declined with probability `decline_rate`, and fails with a
+    GatewayError with probability `error_rate`.
+    """
+
+    def __init__(self, latency=(0.5, 2.0), decline_rate=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.decline_rate = decline_rate
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def charge(self, method, amount_paise, txn_id):
+        with self._lock:
+            delay = self._random.uniform(*self.latency)
+            roll = self._random.random()
+        time.sleep(delay)
+        if roll < self.error_rate:
+            raise GatewayError("simulated gateway timeout")
+        if roll < self.error_rate + self.decline_rate:
+            return ChargeResult(False, None, "Declined by issuer (simulated)")
+        return ChargeResult(True, f"SIM{uuid.uuid4().hex[:12].upper()}", None)
+
+
+class PaymentQueue:
+    """
+    Runs payments on background worker threads so a Streamlit rerun never waits on a gateway.
+
+    submit() returns immediately with a payment id; the page polls status() on later
+    reruns. Transient gateway errors are retried up to `retries` times, after an
+    exponential backoff starting at `backoff` seconds and capped at `max_backoff`.
+    Finished payments are kept for `keep_for` seconds so late polls still see the outcome.
+    """
+
+    def __init__(self, gateway, workers=16, retries=2, keep_for=3600, backoff=0.5, max_backoff=8.0):
+        self.gateway = gateway
+        self.retries = retries
+        self.keep_for = keep_for
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="payment")
+        self._payments = {}
+        self._by_txn = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self.approved = 0
+        self.declined = 0
+        self.failed = 0
+
+    def submit(self, method, amount_paise, txn_id=None):
+        """
+        Queues a charge. Submitting a txn_id again while its payment is in flight or
+        approved returns that payment instead of charging twice; after a decline or
+        failure the txn_id may be charged again.
+
+        Args:
+            txn_id (str): The caller's id for this payment, sent to the gateway as the
+                idempotency key. One is generated when omitted.
+
+        Returns:
+            str: The payment id to poll with status().
+
+        Raises:
+            ValueError: If txn_id already has a live payment of another method or amount.
+        """
+        payment_id = uuid.uuid4().hex
+        txn_id = txn_id or f"PAY{payment_id[:16].upper()}"
+        status = PaymentStatus(payment_id, method, int(amount_paise), txn_id, PENDING, None, None, 0, time.time(), None)
+        with self._lock:
+            self._expire()
+            existing = self._payments.get(self._by_txn.get(txn_id))
+            if existing is not None and existing.state not in (DECLINED, FAILED):
+                if (existing.method, existing.amount_paise) != (status.method, status.amount_paise):
+                    raise ValueError(
+                        f"Transaction {txn_id} already has a {existing.state} {existing.method} payment "
+                        f"of {existing.amount_paise} paise."
+                    )
+                return existing.payment_id
+            self._payments[payment_id] = status
+            self._by_txn[txn_id] = payment_id
+        self._executor.submit(self._run, payment_id)
+        return payment_id
+
+    def status(self, payment_id):
+        """
+        Returns the payment's current PaymentStatus, or None for an unknown or expired id.
+        """
+        with self._lock:
+            return self._payments.get(payment_id)
+
+    def wait(self, payment_id, timeout=None):
+        """
+        Blocks until the payment reaches a final state or `timeout` seconds pass; for
+        scripts and batch jobs, not for UI threads.
+
+        Returns:
+            PaymentStatus: The last status seen.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = self.status(payment_id)
+            if status is None or status.state in FINAL_STATES:
+                return status
+            if deadline is not None and time.monotonic() >= deadline:
+                return status
+            time.sleep(0.01)
+
+    def _update(self, payment_id, **changes):
+        with self._lock:
+            status = self._payments[payment_id]._replace(**changes)
+            self._payments[payment_id] = status
+            if status.state == APPROVED:
+                self.approved += 1
+            elif status.state == DECLINED:
+                self.declined += 1
+            elif status.state == FAILED:
+                self.failed += 1
+            return status
+
+    def _run(self, payment_id):
+        status = self._update(payment_id, state=PROCESSING)
+        for attempt in range(1, self.retries + 2):
+            try:
+                result = self.gateway.charge(status.method, status.amount_paise, status.txn_id)
+            except GatewayError as e:
+                if attempt <= self.retries:
+                    self._update(payment_id, attempts=attempt, message=f"{e} (retrying)")
+                    # close() cuts the wait short so shutdown is not held up by a backoff.
+                    self._closed.wait(self.retry_delay(attempt))
+                    continue
+                self._update(payment_id, state=FAILED, message=str(e), attempts=attempt, finished_at=time.time())
+                return
+            except Exception as e:
+                self._update(payment_id, state=FAILED, message=f"{type(e).__name__}: {e}", attempts=attempt,
+                             finished_at=time.time())
+                return
+            self._update(
+                payment_id,
+                state=APPROVED if result.approved else DECLINED,
+                reference=result.reference,
+                message=result.message,
+                attempts=attempt,
+                finished_at=time.time(),
+            )
+            return
+
+    def retry_delay(self, attempt):
+        """
+        Seconds to wait before retrying after failed attempt number `attempt`: the
+        exponential backoff with half of it jittered, so payments that failed together
+        do not all hit the gateway again at the same moment.
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _expire(self):
+        cutoff = time.time() - self.keep_for
+        expired = [
+            payment_id for payment_id, status in self._payments.items()
+            if status.finished_at is not None and status.finished_at < cutoff
+        ]
+        for payment_id in expired:
+            status = self._payments.pop(payment_id)
+            if self._by_txn.get(status.txn_id) == payment_id:
+                del self._by_txn[status.txn_id]
+
+    def stats(self):
+        with self._lock:
+            in_flight = sum(1 for status in self._payments.values() if status.state not in FINAL_STATES)
+            return {
+                "in_flight": in_flight,
+                "approved": self.approved,
+                "declined": self.declined,
+                "failed": self.failed,
+            }
+
+    def close(self):
+        self._closed.set()
+        self._executor.shutdown(wait=True)
+
+
+def configured_gateway():
+    """
+    Builds the gateway GATEWAY_ENV names.
+
+    Returns:
+        PaymentGateway: The configured gateway, or None for manual confirmation.
+
+    Raises:
+        ValueError: If GATEWAY_ENV names something that is not a PaymentGateway.
+    """
+    name = os.environ.get(GATEWAY_ENV, "").strip()
+    if name.lower() in ("", "manual"):
+        return None
+    if name.lower() == "simulated":
+        return SimulatedGateway()
+    module_name, _, class_name = name.partition(":")
+    try:
+        gateway_class = getattr(importlib.import_module(module_name), class_name)
+    except (ImportError, AttributeError, ValueError) as e:
+        raise ValueError(f"{GATEWAY_ENV}={name!r} does not name a gateway class: {e}")
+    if not (isinstance(gateway_class, type) and issubclass(gateway_class, PaymentGateway)):
+        raise ValueError(f"{GATEWAY_ENV}={name!r} is not a PaymentGateway subclass")
+    return gateway_class()
+
+
+_queue = None
+_queue_ready = False
+_queue_lock = threading.Lock()
+
+
+def get_payment_queue(gateway=None):
+    """
+    Returns the process-wide PaymentQueue, or None when no gateway is configured and the
+    cashier confirms card and UPI payments by hand.
+
+    Args:
+        gateway (PaymentGateway): The gateway to build the queue with on first use;
+            configured_gateway() by default.
+
+    Raises:
+        RuntimeError: If `gateway` differs from the one the queue was already built with.
+    """
+    global _queue, _queue_ready
+    if not _queue_ready:
+        with _queue_lock:
+            if not _queue_ready:
+                gateway = gateway or configured_gateway()
+                _queue = PaymentQueue(gateway) if gateway is not None else None
+                _queue_ready = True
+                return _queue
+    if gateway is not None and (_queue is None or _queue.gateway is not gateway):
+        raise RuntimeError("The payment queue has already been set up with another gateway.")
+    return _queue
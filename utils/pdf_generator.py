@@ -1,13 +1,82 @@
 import io
 from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Spacer, Paragraph, HRFlowable
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Spacer, Paragraph, HRFlowable, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
+import copy
 import datetime
+import functools
+import threading
+from collections import OrderedDict, namedtuple
+
+from utils.money import from_paise
+from utils.tracing import traced
+
+# --- Shared receipt layout ---
+# Every receipt uses the same styles, table styles and static header/footer text, so
+# they are built once per process instead of on every call.
+_ReceiptTemplate = namedtuple("_ReceiptTemplate", [
+    "styles", "details_style", "items_style", "summary_style", "header", "footer",
+])
+
+
+@functools.lru_cache(maxsize=None)
+def _receipt_template():
+    styles = getSampleStyleSheet()
+    # Custom style for right-aligned text
+    styles.add(ParagraphStyle(name='RightAlign', alignment=2)) # 2 means right alignment
+    styles.add(ParagraphStyle(name='TitleStyle', alignment=1, fontSize=16, fontName='Helvetica-Bold'))
+
+    header = [
+        # Restaurant name and address
+        Paragraph("<font size='18'><b>Imperial Spice</b></font>", styles['Heading1']),
+        Paragraph("123, Food Street, Gourmet City", styles['Normal']),
+        Paragraph("Email: contact@restaurant.com | Phone: +91 98765 43210", styles['Normal']),
+        Spacer(1, 0.2 * inch),
+        Paragraph(f"<b>TAX INVOICE</b>", styles['TitleStyle']),
+        Spacer(1, 0.1 * inch),
+    ]
+    footer = [
+        Spacer(1, 0.5 * inch),
+        Paragraph("Thank you for your visit!", styles['Normal']),
+        Paragraph("For any queries, please contact us.", styles['Normal']),
+    ]
+    details_style = TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('GRID', (0, 0), (-1, -1), 0, colors.white),
+        ('BOX', (0, 0), (-1, -1), 0, colors.white),
+        ('TEXTCOLOR', (0, 0), (0, -1), colors.darkgrey),
+        ('LEFTPADDING', (0, 0), (-1, -1), 0),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ])
+    items_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ])
+    summary_style = TableStyle([
+        ('BOX', (0, 0), (-1, -1), 0, colors.white), ('LEFTPADDING', (0, 0), (-1, -1), 0), ('RIGHTPADDING', (0, 0), (-1, -1), 0)
+    ])
+    return _ReceiptTemplate(styles, details_style, items_style, summary_style, header, footer)
+
+
+def _static(flowables):
+    # Shallow copies keep the parsed paragraph text but give each build its own layout
+    # state, so concurrent builds never share a flowable.
+    return [copy.copy(flowable) for flowable in flowables]
+
 
 # --- PDF Generation Function ---
-def generate_pdf_bill(order_id, order_items, subtotal, gst, discount, total, payment_method, mode):
+@traced(rows=None)
+def generate_pdf_bill(order_id, order_items, subtotal, gst, discount, total, payment_method, mode, tip=0.0, order_time=None):
     """
     Generates a professional-looking PDF bill with detailed information.
     
@@ -21,53 +90,65 @@ def generate_pdf_bill(order_id, order_items, subtotal, gst, discount, total, pay
         total (float): The final payable amount.
         payment_method (str): The method of payment (e.g., 'Cash', 'Card').
         mode (str): The order mode (e.g., 'Dine-In', 'Takeaway').
+        tip (float): The tip amount, shown only when non-zero.
+        order_time (datetime.datetime): When the order was placed; defaults to now.
         
     Returns:
         bytes: The binary data of the generated PDF file.
     """
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
-    
-    # Custom style for right-aligned text
-    styles.add(ParagraphStyle(name='RightAlign', alignment=2)) # 2 means right alignment
-    
+    doc.build(_bill_story(order_id, order_items, subtotal, gst, discount, total, payment_method, mode, tip, order_time))
+
+    pdf_bytes = buffer.getvalue()
+    buffer.close()
+    return pdf_bytes
+
+
+def generate_pdf_bills(bills):
+    """
+    Renders several receipts into one multi-page PDF, each starting on a new page.
+
+    Args:
+        bills (iterable): Keyword-argument dicts for generate_pdf_bill, including 'order_id'.
+
+    Returns:
+        bytes: The binary data of the combined PDF file.
+    """
     story = []
+    for bill in bills:
+        if story:
+            story.append(PageBreak())
+        story.extend(_bill_story(**bill))
 
-    # --- Header with Business Info ---
-    # Restaurant name and address
-    story.append(Paragraph(
-        "<font size='18'><b>Imperial Spice</b></font>",
-        styles['Heading1']
-    ))
-    story.append(Paragraph("123, Food Street, Gourmet City", styles['Normal']))
-    story.append(Paragraph("Email: contact@restaurant.com | Phone: +91 98765 43210", styles['Normal']))
-    story.append(Spacer(1, 0.2 * inch))
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    doc.build(story)
 
-    # --- Bill Title and Details ---
-    styles.add(ParagraphStyle(name='TitleStyle', alignment=1, fontSize=16, fontName='Helvetica-Bold'))
-    story.append(Paragraph(f"<b>TAX INVOICE</b>", styles['TitleStyle']))
-    story.append(Spacer(1, 0.1 * inch))
+    pdf_bytes = buffer.getvalue()
+    buffer.close()
+    return pdf_bytes
+
+
+def _bill_story(order_id, order_items, subtotal, gst, discount, total, payment_method, mode, tip=0.0, order_time=None):
+    # The flowables of one receipt; see generate_pdf_bill for the arguments.
+    template = _receipt_template()
+    styles = template.styles
+    order_time = order_time or datetime.datetime.now()
+
+    # --- Header with Business Info and Bill Title ---
+    story = _static(template.header)
     
     # Use a table for clean layout of order details
     details_data = [
         ["Order ID:", f"#{order_id}"],
-        ["Order Date:", datetime.datetime.now().strftime("%Y-%m-%d")],
-        ["Order Time:", datetime.datetime.now().strftime("%H:%M:%S")],
+        ["Order Date:", order_time.strftime("%Y-%m-%d")],
+        ["Order Time:", order_time.strftime("%H:%M:%S")],
         ["Order Mode:", mode],
         ["Payment Method:", payment_method]
     ]
     details_table = Table(details_data, colWidths=[2 * inch, 5 * inch])
-    details_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('GRID', (0, 0), (-1, -1), 0, colors.white),
-        ('BOX', (0, 0), (-1, -1), 0, colors.white),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.darkgrey),
-        ('LEFTPADDING', (0, 0), (-1, -1), 0),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-    ]))
+    details_table.setStyle(template.details_style)
     story.append(details_table)
     story.append(Spacer(1, 0.2 * inch))
 
@@ -77,16 +158,7 @@ def generate_pdf_bill(order_id, order_items, subtotal, gst, discount, total, pay
         data.append([item['item'], str(item['qty']), f"₹{item['price']:.2f}", f"₹{item['total']:.2f}"])
 
     item_table = Table(data, colWidths=[3 * inch, 0.7 * inch, 1.5 * inch, 1.5 * inch])
-    item_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-    ]))
+    item_table.setStyle(template.items_style)
     story.append(item_table)
     story.append(Spacer(1, 0.1 * inch))
     
@@ -94,38 +166,116 @@ def generate_pdf_bill(order_id, order_items, subtotal, gst, discount, total, pay
     story.append(HRFlowable(width="100%", thickness=1, lineCap='round', color=colors.black, spaceAfter=12, spaceBefore=12))
 
     # --- Summary Section with improved alignment ---
-    story.append(Table(
-        [[Paragraph("Subtotal:", styles['Normal']), Paragraph(f"₹{subtotal:.2f}", styles['RightAlign'])]],
-        colWidths=[5 * inch, 2 * inch],
-        style=[('BOX', (0, 0), (-1, -1), 0, colors.white), ('LEFTPADDING', (0, 0), (-1, -1), 0), ('RIGHTPADDING', (0, 0), (-1, -1), 0)]
-    ))
-    story.append(Table(
-        [[Paragraph("GST:", styles['Normal']), Paragraph(f"₹{gst:.2f}", styles['RightAlign'])]],
-        colWidths=[5 * inch, 2 * inch],
-        style=[('BOX', (0, 0), (-1, -1), 0, colors.white), ('LEFTPADDING', (0, 0), (-1, -1), 0), ('RIGHTPADDING', (0, 0), (-1, -1), 0)]
-    ))
-    story.append(Table(
-        [[Paragraph("Discount:", styles['Normal']), Paragraph(f"-₹{discount:.2f}", styles['RightAlign'])]],
-        colWidths=[5 * inch, 2 * inch],
-        style=[('BOX', (0, 0), (-1, -1), 0, colors.white), ('LEFTPADDING', (0, 0), (-1, -1), 0), ('RIGHTPADDING', (0, 0), (-1, -1), 0)]
-    ))
-    story.append(Table(
-        [[Paragraph("<b>TOTAL PAYABLE:</b>", styles['Normal']), Paragraph(f"<b>₹{total:.2f}</b>", styles['RightAlign'])]],
-        colWidths=[5 * inch, 2 * inch],
-        style=[('BOX', (0, 0), (-1, -1), 0, colors.white), ('LEFTPADDING', (0, 0), (-1, -1), 0), ('RIGHTPADDING', (0, 0), (-1, -1), 0)]
-    ))
-
-    story.append(Spacer(1, 0.5 * inch))
-    
+    summary = [
+        ("Subtotal:", f"₹{subtotal:.2f}"),
+        ("GST:", f"₹{gst:.2f}"),
+        ("Discount:", f"-₹{discount:.2f}"),
+    ]
+    if tip:
+        summary.append(("Tip:", f"+₹{tip:.2f}"))
+    summary.append(("<b>TOTAL PAYABLE:</b>", f"<b>₹{total:.2f}</b>"))
+    for label, amount in summary:
+        story.append(Table(
+            [[Paragraph(label, styles['Normal']), Paragraph(amount, styles['RightAlign'])]],
+            colWidths=[5 * inch, 2 * inch],
+            style=template.summary_style
+        ))
+
     # --- Footer ---
-    story.append(Paragraph("Thank you for your visit!", styles['Normal']))
-    story.append(Paragraph("For any queries, please contact us.", styles['Normal']))
+    story.extend(_static(template.footer))
+    return story
 
-    doc.build(story)
-    
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    return pdf_bytes
+
+def receipt_bill(receipt):
+    """
+    Maps a stored receipt (see order_history.get_receipt) to generate_pdf_bill's
+    keyword arguments, apart from order_id.
+    """
+    lines = receipt["items"]
+    return dict(
+        order_items=[
+            {
+                "item": line["item_name"],
+                "qty": line["qty"],
+                "price": from_paise(line["unit_price_paise"]),
+                "total": from_paise(line["total_paise"])
+            }
+            for line in lines
+        ],
+        subtotal=from_paise(sum(line["total_paise"] - line["gst_paise"] for line in lines)),
+        gst=from_paise(sum(line["gst_paise"] for line in lines)),
+        discount=from_paise(receipt["discount_paise"]),
+        total=from_paise(receipt["total_paise"]),
+        payment_method=receipt["payment"],
+        mode=receipt["mode"],
+        tip=from_paise(receipt["tip_paise"]),
+        order_time=datetime.datetime.fromisoformat(receipt["timestamp"])
+    )
+
+
+# --- Memoized receipts ---
+class ReceiptRenderer:
+    """
+    Bounded LRU of rendered receipts keyed by (order_id, data version).
+
+    The version is whatever the caller uses to notice that an order changed (e.g. the
+    "orders" data version of the order's day), so reruns and re-downloads of the same
+    receipt return the cached bytes without rebuilding the PDF.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, order_id, version, **bill):
+        """
+        Returns the receipt PDF for `order_id`, building it with generate_pdf_bill(**bill) on a miss.
+        """
+        key = (order_id, version)
+        with self._lock:
+            pdf_bytes = self._entries.get(key)
+            if pdf_bytes is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pdf_bytes
+            self.misses += 1
+
+        pdf_bytes = generate_pdf_bill(order_id=order_id, **bill)
+        with self._lock:
+            self._entries[key] = pdf_bytes
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return pdf_bytes
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_receipt_renderer():
+    """
+    Returns the process-wide ReceiptRenderer.
+    """
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = ReceiptRenderer()
+    return _renderer
 
 if __name__ == '__main__':
     # This is a sample usage to demonstrate the function
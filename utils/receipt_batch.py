@@ -0,0 +1,158 @@
+import collections
+import concurrent.futures
+import io
+import itertools
+import os
+import time
+import zipfile
+from collections import namedtuple
+
+from utils.order_history import count_orders, iter_receipts
+from utils.pdf_generator import generate_pdf_bill, generate_pdf_bills, receipt_bill
+
+# pypdf is only needed to merge receipts into one PDF; ZIP output works without it.
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    PdfReader = PdfWriter = None
+
+REPRINT_FORMATS = ("zip", "pdf")
+
+# path: the file written. receipts: how many were rendered. workers: processes used.
+# seconds: wall time.
+ReprintResult = namedtuple("ReprintResult", ["path", "receipts", "workers", "seconds"])
+
+
+# ----------------- Worker side -----------------
+# These run in the worker processes; they take and return plain picklable values so a
+# chunk crosses the process boundary once each way.
+def _render_zip_chunk(receipts):
+    return [
+        (receipt_name(receipt), generate_pdf_bill(order_id=receipt["order_id"], **receipt_bill(receipt)))
+        for receipt in receipts
+    ]
+
+
+def _render_pdf_chunk(receipts):
+    return generate_pdf_bills(dict(receipt_bill(receipt), order_id=receipt["order_id"]) for receipt in receipts)
+
+
+# ----------------- Output side -----------------
+class _ZipSink:
+    # One PDF entry per receipt; entries are written as chunks arrive, so only the
+    # in-flight chunks are ever held in memory.
+    def __init__(self, path):
+        self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def write(self, rendered):
+        for name, pdf_bytes in rendered:
+            self._zip.writestr(name, pdf_bytes)
+
+    def close(self):
+        self._zip.close()
+
+    def discard(self):
+        self._zip.close()
+
+
+class _PdfSink:
+    # Appends each chunk's multi-page PDF to one merged document. pypdf keeps the
+    # merged pages until close(), so for very long ranges prefer the zip format.
+    def __init__(self, path):
+        self._path = path
+        self._writer = PdfWriter()
+
+    def write(self, rendered):
+        self._writer.append(PdfReader(io.BytesIO(rendered)))
+
+    def close(self):
+        with open(self._path, "wb") as f:
+            self._writer.write(f)
+
+    def discard(self):
+        self._writer.close()
+
+
+def receipt_name(receipt):
+    """
+    Returns the file name a receipt gets inside a reprint ZIP, e.g. "2025-07-28/receipt_order_42.pdf".
+    """
+    return f"{receipt['timestamp'][:10]}/receipt_order_{receipt['order_id']}.pdf"
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def reprint_receipts(start_date, end_date, out_path, fmt="zip", workers=None, chunk_size=25, progress=None, pool=None):
+    """
+    Re-renders the receipt of every order in a business-date range into one file.
+
+    Orders are streamed from the database in chunks and rendered by a process pool, so
+    PDF building runs on every core. At most two chunks per worker are in flight, which
+    keeps memory bounded however many orders the range holds, and results are written
+    in order, oldest order first.
+
+    Args:
+        start_date (datetime.date): First business day, inclusive.
+        end_date (datetime.date): Last business day, inclusive.
+        out_path (str): The ZIP or PDF file to write; it is replaced only once complete.
+        fmt (str): "zip" for one PDF per receipt, "pdf" for one merged multi-page PDF.
+        workers (int): Worker processes; None uses every CPU, 1 renders in this process.
+        chunk_size (int): Receipts per task sent to a worker.
+        progress (callable): Called as progress(done, total) after every chunk.
+
+    Returns:
+        ReprintResult: Where the receipts went and how long it took.
+    """
+    if fmt not in REPRINT_FORMATS:
+        raise ValueError(f"Unknown reprint format {fmt!r}; expected one of {REPRINT_FORMATS}")
+    if fmt == "pdf" and PdfWriter is None:
+        raise RuntimeError("Merged PDF reprints need the pypdf package (pip install pypdf); use the zip format instead.")
+    workers = workers or os.cpu_count() or 1
+    render = _render_zip_chunk if fmt == "zip" else _render_pdf_chunk
+    total = count_orders(start_date, end_date, pool=pool)
+    chunks = _chunks(iter_receipts(start_date, end_date, chunk_size=max(chunk_size, 500), pool=pool), chunk_size)
+
+    started = time.perf_counter()
+    part_path = out_path + ".part"
+    sink = (_ZipSink if fmt == "zip" else _PdfSink)(part_path)
+    done = 0
+
+    def finish(count, rendered):
+        nonlocal done
+        sink.write(rendered)
+        done += count
+        if progress:
+            progress(done, total)
+
+    try:
+        if workers == 1:
+            for chunk in chunks:
+                finish(len(chunk), render(chunk))
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = collections.deque()
+                for chunk in chunks:
+                    pending.append((len(chunk), executor.submit(render, chunk)))
+                    # Wait on the oldest task before queueing more, so output stays in
+                    # order and no more than two chunks per worker are held at once.
+                    if len(pending) >= 2 * workers:
+                        count, future = pending.popleft()
+                        finish(count, future.result())
+                while pending:
+                    count, future = pending.popleft()
+                    finish(count, future.result())
+        sink.close()
+    except BaseException:
+        sink.discard()
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    os.replace(part_path, out_path)
+    return ReprintResult(out_path, done, workers, time.perf_counter() - started)
@@ -0,0 +1,147 @@
+import datetime
+from collections import defaultdict
+
+from utils.business_day import BUSINESS_DAY_CUTOFF_HOURS, business_day_bounds
+
+# Rollup grains as (table suffix, SQL bucket expression over `orders o`, Python bucket of an
+# order_row): the business date ("2025-07-28") for daily rows, the clock hour
+# ("2025-07-28 19") for hourly rows.
+ROLLUP_GRAINS = (
+    ("daily", "o.business_date", lambda order_row: order_row[6]),
+    ("hourly", "substr(o.timestamp, 1, 13)", lambda order_row: order_row[2][:13]),
+)
+
+ROLLUP_TABLES = [f"{fact}_{suffix}" for fact in ("sales", "item_sales") for suffix, _, _ in ROLLUP_GRAINS]
+
+_DELETE_CHUNK = 500
+
+
+def apply_orders(conn, orders, sign=1):
+    """
+    Adds orders to (sign=1) or subtracts them from (sign=-1) every rollup table, on the
+    caller's connection and inside its transaction.
+
+    Args:
+        orders (iterable): (order_row, item_rows) pairs laid out as order_store.ORDER_ROW
+            and order_store.ITEM_ROW.
+    """
+    orders = list(orders)
+    if not orders:
+        return
+    for suffix, _, bucket_of in ROLLUP_GRAINS:
+        # Aggregate in Python first so a batch costs one upsert per touched bucket.
+        sales = defaultdict(lambda: [0, 0])
+        items = defaultdict(lambda: [0, 0, None, None])
+        for order_row, item_rows in orders:
+            mode, payment, total_paise = order_row[0], order_row[1], order_row[4]
+            bucket = bucket_of(order_row)
+            totals = sales[(bucket, payment, mode)]
+            totals[0] += sign * total_paise
+            totals[1] += sign
+            for item_id, qty, _, line_paise, item_name, category in (row[:6] for row in item_rows):
+                totals = items[(bucket, item_id)]
+                totals[0] += sign * qty
+                totals[1] += sign * line_paise
+                totals[2:] = item_name, category
+
+        conn.executemany(
+            f"""
+            INSERT INTO sales_{suffix} (bucket, payment, mode, revenue_paise, orders)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (bucket, payment, mode) DO UPDATE SET
+                revenue_paise = revenue_paise + excluded.revenue_paise,
+                orders = orders + excluded.orders
+            """,
+            [key + tuple(totals) for key, totals in sales.items()]
+        )
+        conn.executemany(
+            f"""
+            INSERT INTO item_sales_{suffix} (bucket, item_id, qty, revenue_paise, item_name, category)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (bucket, item_id) DO UPDATE SET
+                qty = qty + excluded.qty,
+                revenue_paise = revenue_paise + excluded.revenue_paise,
+                item_name = COALESCE(excluded.item_name, item_name),
+                category = COALESCE(excluded.category, category)
+            """,
+            [key + tuple(totals) for key, totals in items.items()]
+        )
+        if sign < 0:
+            conn.execute(f"DELETE FROM sales_{suffix} WHERE orders <= 0")
+            conn.execute(f"DELETE FROM item_sales_{suffix} WHERE qty <= 0")
+
+
+def remove_orders(conn, order_ids):
+    """
+    Subtracts existing orders from the rollups. Call it before deleting the rows.
+    """
+    order_ids = list(order_ids)
+    for start in range(0, len(order_ids), _DELETE_CHUNK):
+        chunk = order_ids[start:start + _DELETE_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        orders = {
+            row[0]: (row[1:], [])
+            for row in conn.execute(
+                f"SELECT order_id, mode, payment, timestamp, total, total_paise, ts_epoch, business_date "
+                f"FROM orders WHERE order_id IN ({placeholders})",
+                chunk
+            )
+        }
+        for row in conn.execute(
+            f"SELECT order_id, item_id, qty, total, total_paise, item_name, category "
+            f"FROM order_items WHERE order_id IN ({placeholders})",
+            chunk
+        ):
+            if row[0] in orders:
+                orders[row[0]][1].append(row[1:])
+        apply_orders(conn, orders.values(), sign=-1)
+
+
+def clear_rollups(conn):
+    """
+    Empties every rollup table, for use alongside deleting all orders.
+    """
+    for table in ROLLUP_TABLES:
+        conn.execute(f"DELETE FROM {table}")
+
+
+def rebuild_rollups(conn, start_day=None, end_day=None):
+    """
+    Recomputes the rollups from the raw orders, for every day or for an inclusive range
+    of 'YYYY-MM-DD' business dates. Use it after backfills or imports that bypassed order_store.
+    """
+    if start_day or end_day:
+        start = datetime.date.fromisoformat(start_day or "0001-01-01")
+        end = datetime.date.fromisoformat(end_day or "9998-12-30")
+        # Hourly buckets of those business days run from the cutoff hour on the first day
+        # to the hour before the cutoff after the last day.
+        first_hour = f"{start.isoformat()} {BUSINESS_DAY_CUTOFF_HOURS:02d}"
+        after_hour = f"{(end + datetime.timedelta(days=1)).isoformat()} {BUSINESS_DAY_CUTOFF_HOURS:02d}"
+        conn.execute("DELETE FROM sales_daily WHERE bucket BETWEEN ? AND ?", (start.isoformat(), end.isoformat()))
+        conn.execute("DELETE FROM item_sales_daily WHERE bucket BETWEEN ? AND ?", (start.isoformat(), end.isoformat()))
+        conn.execute("DELETE FROM sales_hourly WHERE bucket >= ? AND bucket < ?", (first_hour, after_hour))
+        conn.execute("DELETE FROM item_sales_hourly WHERE bucket >= ? AND bucket < ?", (first_hour, after_hour))
+        where, params = "WHERE o.ts_epoch >= ? AND o.ts_epoch < ?", business_day_bounds(start, end)
+    else:
+        clear_rollups(conn)
+        where, params = "", ()
+
+    for suffix, bucket_sql, _ in ROLLUP_GRAINS:
+        conn.execute(
+            f"""
+            INSERT INTO sales_{suffix} (bucket, payment, mode, revenue_paise, orders)
+            SELECT {bucket_sql}, o.payment, o.mode, SUM(o.total_paise), COUNT(*)
+            FROM orders o {where}
+            GROUP BY 1, 2, 3
+            """,
+            params
+        )
+        conn.execute(
+            f"""
+            INSERT INTO item_sales_{suffix} (bucket, item_id, qty, revenue_paise, item_name, category)
+            SELECT {bucket_sql}, oi.item_id, SUM(oi.qty), SUM(oi.total_paise), MAX(oi.item_name), MAX(oi.category)
+            FROM orders o JOIN order_items oi ON oi.order_id = o.order_id {where}
+            GROUP BY 1, 2
+            """,
+            params
+        )
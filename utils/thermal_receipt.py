@@ -0,0 +1,281 @@
+import functools
+import os
+import socket
+import textwrap
+from collections import namedtuple
+
+from utils.money import format_paise
+
+# Receipts for thermal printers, as fixed-width text or ESC/POS bytes, built from the
+# stored receipt (see order_history.get_receipt). Nothing here imports the PDF stack, so
+# printing a receipt is string formatting plus one write to the printer.
+
+RECEIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "receipts")
+FONT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "DejaVuSans.ttf")
+
+RECEIPT_BACKENDS = ("pdf", "text", "escpos")
+
+# backend: one of RECEIPT_BACKENDS. width: characters per line (48 for 80mm paper in
+# font A, 32 for 58mm). printer: a file path or "tcp://host:port"; None to only download.
+Terminal = namedtuple("Terminal", ["name", "backend", "width", "printer"])
+
+TERMINALS = {
+    "Front Desk": Terminal("Front Desk", "pdf", None, None),
+    "Counter 1": Terminal("Counter 1", "escpos", 48, os.path.join(RECEIPTS_DIR, "counter_1.prn")),
+    "Counter 2": Terminal("Counter 2", "text", 48, os.path.join(RECEIPTS_DIR, "counter_2.txt")),
+}
+DEFAULT_TERMINAL = "Front Desk"
+
+HEADER_LINES = ("123, Food Street, Gourmet City", "contact@restaurant.com", "Phone: +91 98765 43210")
+FOOTER_LINES = ("Thank you for your visit!", "For any queries, please contact us.")
+
+# ----------------- ESC/POS -----------------
+ESC_INIT = b"\x1b@"
+ESC_CODEPAGE_PC437 = b"\x1bt\x00"
+ESC_ALIGN_LEFT, ESC_ALIGN_CENTER = b"\x1ba\x00", b"\x1ba\x01"
+ESC_BOLD_ON, ESC_BOLD_OFF = b"\x1bE\x01", b"\x1bE\x00"
+GS_SIZE_NORMAL, GS_SIZE_DOUBLE = b"\x1d!\x00", b"\x1d!\x11"
+GS_FEED_AND_CUT = b"\x1dVB\x03"
+
+# Printer code pages have no ₹, so the glyph is rasterized from the bundled DejaVu font
+# and downloaded as a user-defined character on this otherwise unused code point.
+RUPEE_CODE = 0x60  # "`"
+_GLYPH_WIDTH, _GLYPH_BYTES = 12, 3  # font A cell: 12 x 24 dots, 3 bytes per column
+
+
+@functools.lru_cache(maxsize=None)
+def _rupee_glyph():
+    # Returns the ESC & bitmap for ₹ (column-major, top bit first), or None when Pillow or
+    # the font is unavailable, in which case amounts fall back to "Rs.".
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+        font = ImageFont.truetype(FONT_PATH, 22)
+    except (ImportError, OSError):
+        return None
+    height = _GLYPH_BYTES * 8
+    image = Image.new("1", (_GLYPH_WIDTH, height), 0)
+    draw = ImageDraw.Draw(image)
+    left, top, right, bottom = draw.textbbox((0, 0), "₹", font=font)
+    draw.text(((_GLYPH_WIDTH - (right - left)) // 2 - left, (height - (bottom - top)) // 2 - top), "₹", font=font, fill=1)
+    pixels = image.load()
+    data = bytearray()
+    for x in range(_GLYPH_WIDTH):
+        for byte in range(_GLYPH_BYTES):
+            value = 0
+            for bit in range(8):
+                if pixels[x, byte * 8 + bit]:
+                    value |= 0x80 >> bit
+            data.append(value)
+    return b"\x1b&" + bytes([_GLYPH_BYTES, RUPEE_CODE, RUPEE_CODE, _GLYPH_WIDTH]) + bytes(data)
+
+
+@functools.lru_cache(maxsize=None)
+def _escpos_prelude():
+    # Reset, code page and the ₹ glyph: identical for every receipt, so built once.
+    glyph = _rupee_glyph()
+    if glyph is None:
+        return ESC_INIT + ESC_CODEPAGE_PC437, "Rs."
+    return ESC_INIT + ESC_CODEPAGE_PC437 + glyph + b"\x1b%\x01", "₹"
+
+
+def _encode(lines, glyph):
+    # With the glyph active, a literal "`" would print as ₹; anything else outside the
+    # code page prints as "?".
+    text = "\n".join(lines) + "\n"
+    if glyph:
+        text = text.replace("`", "'").replace("₹", chr(RUPEE_CODE))
+    return text.encode("cp437", errors="replace")
+
+
+# ----------------- Layout -----------------
+# Column widths and the static header/footer for one paper width and rupee symbol.
+_Layout = namedtuple("_Layout", ["width", "symbol", "line_format", "name_width", "money_width", "rule", "header", "footer"])
+
+
+@functools.lru_cache(maxsize=None)
+def receipt_layout(width=48, symbol="₹"):
+    """
+    Returns the precomputed column layout for `width` characters per line.
+
+    Items get name, qty, unit price and total columns; when the paper is too narrow for
+    a readable name column the name takes its own line above the figures.
+    """
+    money_width = len(symbol) + 8  # up to 99999.99
+    qty_width = 3
+    name_width = width - qty_width - 2 * money_width - 3
+    if name_width < 12:
+        name_width = 0
+        qty_width = width - 2 * money_width - 2
+        line_format = f"{{qty:>{qty_width}}} {{price:>{money_width}}} {{total:>{money_width}}}"
+    else:
+        line_format = f"{{name:<{name_width}}} {{qty:>{qty_width}}} {{price:>{money_width}}} {{total:>{money_width}}}"
+    header = [part.center(width).rstrip() for line in HEADER_LINES for part in textwrap.wrap(line, width)]
+    header += ["", "TAX INVOICE".center(width).rstrip()]
+    footer = [part.center(width).rstrip() for line in FOOTER_LINES for part in textwrap.wrap(line, width)]
+    return _Layout(width, symbol, line_format, name_width, money_width, "-" * width, header, footer)
+
+
+def _pair(layout, label, value):
+    return f"{label}{value:>{layout.width - len(label)}}"
+
+
+def _body_lines(receipt, layout):
+    # Everything between the header and the footer, as plain lines.
+    symbol = layout.symbol
+    timestamp = receipt["timestamp"]
+    lines = [
+        _pair(layout, "Order ID:", f"#{receipt['order_id']}"),
+        _pair(layout, "Date:", timestamp[:10]),
+        _pair(layout, "Time:", timestamp[11:19]),
+        _pair(layout, "Mode:", receipt["mode"]),
+        _pair(layout, "Payment:", receipt["payment"]),
+    ]
+    if receipt.get("txn_id"):
+        lines.append(_pair(layout, "Txn ID:", receipt["txn_id"]))
+    lines.append(layout.rule)
+    if layout.name_width:
+        lines.append(layout.line_format.format(name="Item", qty="Qty", price="Price", total="Total"))
+    else:
+        lines.append(layout.line_format.format(qty="Qty", price="Price", total="Total"))
+    lines.append(layout.rule)
+
+    subtotal = gst = 0
+    for line in receipt["items"]:
+        subtotal += line["total_paise"] - line["gst_paise"]
+        gst += line["gst_paise"]
+        figures = dict(
+            qty=line["qty"],
+            price=format_paise(line["unit_price_paise"], symbol),
+            total=format_paise(line["total_paise"], symbol),
+        )
+        name = line["item_name"] or f"Item {line['item_id']}"
+        if len(name) <= layout.name_width:
+            lines.append(layout.line_format.format(name=name, **figures))
+        elif layout.name_width:
+            wrapped = textwrap.wrap(name, layout.name_width)
+            lines.append(layout.line_format.format(name=wrapped[0], **figures))
+            lines.extend(wrapped[1:])
+        else:
+            lines.extend(textwrap.wrap(name, layout.width) or [""])
+            lines.append(layout.line_format.format(**figures))
+    lines.append(layout.rule)
+
+    lines.append(_pair(layout, "Subtotal:", format_paise(subtotal, symbol)))
+    lines.append(_pair(layout, "GST:", format_paise(gst, symbol)))
+    lines.append(_pair(layout, "Discount:", "-" + format_paise(receipt["discount_paise"], symbol)))
+    if receipt["tip_paise"]:
+        lines.append(_pair(layout, "Tip:", "+" + format_paise(receipt["tip_paise"], symbol)))
+    return lines
+
+
+def _total_line(receipt, layout):
+    return _pair(layout, "TOTAL PAYABLE:", format_paise(receipt["total_paise"], layout.symbol))
+
+
+# ----------------- Renderers -----------------
+def render_text_receipt(receipt, width=48):
+    """
+    Renders a stored receipt as fixed-width text, `width` characters per line.
+
+    Returns:
+        str: The receipt, newline-terminated.
+    """
+    layout = receipt_layout(width)
+    lines = ["Imperial Spice".center(width).rstrip()] + layout.header + [""]
+    lines += _body_lines(receipt, layout)
+    lines += [_total_line(receipt, layout), ""] + layout.footer
+    return "\n".join(lines) + "\n"
+
+
+def render_escpos_receipt(receipt, width=48):
+    """
+    Renders a stored receipt as an ESC/POS job: printer reset, bold double-size title,
+    the items in fixed columns, a bold total, then feed and cut.
+
+    Returns:
+        bytes: The job, ready to be written to the printer.
+    """
+    prelude, symbol = _escpos_prelude()
+    layout = receipt_layout(width, symbol)
+    glyph = symbol == "₹"
+    return b"".join((
+        prelude,
+        _escpos_header(width, symbol),
+        _encode(_body_lines(receipt, layout), glyph),
+        ESC_BOLD_ON, _encode([_total_line(receipt, layout)], glyph), ESC_BOLD_OFF,
+        _escpos_footer(width, symbol),
+    ))
+
+
+@functools.lru_cache(maxsize=None)
+def _escpos_header(width, symbol):
+    layout = receipt_layout(width, symbol)
+    return b"".join((
+        ESC_ALIGN_CENTER, GS_SIZE_DOUBLE, ESC_BOLD_ON, b"Imperial Spice\n", ESC_BOLD_OFF, GS_SIZE_NORMAL,
+        _encode([line.strip() for line in layout.header] + [""], False),
+        ESC_ALIGN_LEFT,
+    ))
+
+
+@functools.lru_cache(maxsize=None)
+def _escpos_footer(width, symbol):
+    layout = receipt_layout(width, symbol)
+    return b"".join((
+        ESC_ALIGN_CENTER, _encode([""] + [line.strip() for line in layout.footer], False),
+        ESC_ALIGN_LEFT, GS_FEED_AND_CUT,
+    ))
+
+
+def render_receipt(receipt, backend, width=48):
+    """
+    Renders a stored receipt with a thermal backend ("text" or "escpos").
+
+    Returns:
+        bytes: UTF-8 text or an ESC/POS job.
+    """
+    if backend == "text":
+        return render_text_receipt(receipt, width).encode("utf-8")
+    if backend == "escpos":
+        return render_escpos_receipt(receipt, width)
+    raise ValueError(f"Not a thermal receipt backend: {backend!r}")
+
+
+# ----------------- Printers -----------------
+def send_to_printer(data, target, timeout=3.0):
+    """
+    Writes a rendered receipt to a printer.
+
+    Args:
+        target (str): "tcp://host:port" for a network printer (raw port 9100, or a local
+            stand-in), otherwise a file or device path the job is appended to.
+    """
+    if target.startswith("tcp://"):
+        host, _, port = target[len("tcp://"):].rpartition(":")
+        with socket.create_connection((host, int(port)), timeout=timeout) as sock:
+            sock.sendall(data)
+        return
+    directory = os.path.dirname(target)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(target, "ab") as f:
+        f.write(data)
+
+
+def get_terminal(name):
+    """
+    Returns the Terminal called `name`, or the default terminal for unknown names.
+    """
+    return TERMINALS.get(name) or TERMINALS[DEFAULT_TERMINAL]
+
+
+def print_receipt(receipt, terminal):
+    """
+    Renders a stored receipt for a thermal terminal and sends it to the terminal's printer, if any.
+
+    Returns:
+        bytes: What was printed, e.g. for offering it as a download too.
+    """
+    data = render_receipt(receipt, terminal.backend, terminal.width)
+    if terminal.printer:
+        send_to_printer(data, terminal.printer)
+    return data
@@ -0,0 +1,203 @@
+import base64
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from PIL import Image, ImageDraw, features
+
+from utils.db_pool import get_pool
+from utils.image_validator import CACHE_DB_PATH
+
+THUMBNAIL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "thumbnails")
+
+
+class ThumbnailCache:
+    """
+    Downloads each menu image once and serves a small local thumbnail from then on.
+
+    Thumbnails are stored under the SHA-256 of the source image bytes, so menu rows that
+    point at the same picture share one file. A URL -> hash index in SQLite lets a rerun
+    go straight to the file; when a row's image_url changes, the new URL simply misses the
+    index and gets fetched. Failed fetches fall back to a pre-rendered placeholder and are
+    retried after `retry_failed_after` seconds.
+    """
+
+    def __init__(self, thumb_dir=THUMBNAIL_DIR, index_path=CACHE_DB_PATH, size=160,
+                 max_workers=8, timeout=5, retry_failed_after=3600, memory_items=512):
+        self.thumb_dir = thumb_dir
+        self.size = size
+        self.timeout = timeout
+        self.retry_failed_after = retry_failed_after
+        self.memory_items = memory_items
+        self.format, self.extension = ("WEBP", "webp") if features.check("webp") else ("PNG", "png")
+
+        if not os.path.exists(thumb_dir):
+            os.makedirs(thumb_dir)
+
+        self._pool = get_pool(index_path)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="thumbnail")
+        self._local = threading.local()
+        self._memory = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self._placeholder = self._render_placeholder()
+
+        with self._pool.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS thumbnails (
+                    source TEXT PRIMARY KEY,
+                    content_hash TEXT,
+                    fetched_at REAL NOT NULL
+                );
+            """)
+
+    def _render_placeholder(self):
+        path = os.path.join(self.thumb_dir, f"placeholder_{self.size}.png")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return f.read()
+        img = Image.new("RGB", (self.size, self.size), (102, 102, 102))
+        draw = ImageDraw.Draw(img)
+        label = "No Image"
+        left, top, right, bottom = draw.textbbox((0, 0), label)
+        draw.text(((self.size - (right - left)) / 2, (self.size - (bottom - top)) / 2), label, fill=(255, 255, 255))
+        buf = io.BytesIO()
+        img.save(buf, format="PNG", optimize=True)
+        with open(path, "wb") as f:
+            f.write(buf.getvalue())
+        return buf.getvalue()
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+
+    def _read_source(self, source):
+        if source.startswith(("http://", "https://")):
+            response = self._session().get(source, timeout=self.timeout)
+            response.raise_for_status()
+            return response.content
+        if source.startswith("data:image"):
+            return base64.b64decode(source.split(",", 1)[1])
+        with open(source, "rb") as f:
+            return f.read()
+
+    def _thumb_path(self, content_hash):
+        return os.path.join(self.thumb_dir, f"{content_hash}.{self.extension}")
+
+    def _build(self, source):
+        """
+        Fetches `source` and writes its thumbnail. Returns the content hash, or None on failure.
+        """
+        try:
+            raw = self._read_source(source)
+            content_hash = hashlib.sha256(raw).hexdigest()
+            path = self._thumb_path(content_hash)
+            if not os.path.exists(path):
+                img = Image.open(io.BytesIO(raw))
+                img.thumbnail((self.size, self.size))
+                if img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGBA")
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                img.save(tmp_path, format=self.format)
+                os.replace(tmp_path, path)
+            return content_hash
+        except Exception:
+            return None
+
+    def _remember(self, source, data):
+        with self._memory_lock:
+            self._memory[source] = data
+            self._memory.move_to_end(source)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def get_many(self, sources):
+        """
+        Returns {source: thumbnail bytes} for `sources`, fetching any misses concurrently.
+
+        Empty or None sources map to the placeholder.
+        """
+        result = {}
+        pending = []
+        with self._memory_lock:
+            for source in dict.fromkeys(sources):
+                if not source:
+                    result[source] = self._placeholder
+                elif source in self._memory:
+                    self._memory.move_to_end(source)
+                    result[source] = self._memory[source]
+                else:
+                    pending.append(source)
+        if not pending:
+            return result
+
+        with self._pool.connection() as conn:
+            placeholders = ", ".join("?" for _ in pending)
+            index = {
+                source: (content_hash, fetched_at)
+                for source, content_hash, fetched_at in conn.execute(
+                    f"SELECT source, content_hash, fetched_at FROM thumbnails WHERE source IN ({placeholders})",
+                    pending
+                )
+            }
+
+        to_fetch = []
+        retry_cutoff = time.time() - self.retry_failed_after
+        for source in pending:
+            content_hash, fetched_at = index.get(source, (None, None))
+            if content_hash and os.path.exists(self._thumb_path(content_hash)):
+                with open(self._thumb_path(content_hash), "rb") as f:
+                    result[source] = f.read()
+            elif fetched_at is not None and content_hash is None and fetched_at >= retry_cutoff:
+                result[source] = self._placeholder
+            else:
+                to_fetch.append(source)
+
+        if to_fetch:
+            hashes = dict(zip(to_fetch, self._executor.map(self._build, to_fetch)))
+            fetched_at = time.time()
+            with self._pool.transaction() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO thumbnails (source, content_hash, fetched_at) VALUES (?, ?, ?)",
+                    [(source, content_hash, fetched_at) for source, content_hash in hashes.items()]
+                )
+            for source, content_hash in hashes.items():
+                if content_hash:
+                    with open(self._thumb_path(content_hash), "rb") as f:
+                        result[source] = f.read()
+                else:
+                    result[source] = self._placeholder
+
+        for source in pending:
+            if result[source] is not self._placeholder:
+                self._remember(source, result[source])
+        return result
+
+    def get(self, source):
+        """
+        Returns thumbnail bytes for a single image URL, data URI or local path.
+        """
+        return self.get_many([source])[source]
+
+
+_thumbnail_cache = None
+_thumbnail_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache():
+    """
+    Returns the process-wide thumbnail cache under db/thumbnails.
+    """
+    global _thumbnail_cache
+    if _thumbnail_cache is None:
+        with _thumbnail_cache_lock:
+            if _thumbnail_cache is None:
+                _thumbnail_cache = ThumbnailCache()
+    return _thumbnail_cache
@@ -0,0 +1,292 @@
+import datetime
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import namedtuple
+
+# Lightweight wall-clock tracing for finding where a Streamlit rerun spends its time.
+#
+# A thread starts a Trace with begin_trace(); every @traced function or `with span(...)`
+# block it runs until finish_trace() is recorded as a Span. Threads without an open trace
+# pay one global read per call while no thread anywhere is tracing, and one thread-local
+# lookup otherwise. Finished traces are appended as JSON lines to a size-rotated log for
+# offline analysis (see scripts/trace_report.py).
+
+TRACE_LOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "trace.jsonl")
+TRACE_LOG_MAX_BYTES = 5 * 1024 * 1024
+TRACE_LOG_BACKUPS = 5
+# Set to 1 to trace every session's reruns without flipping the sidebar toggle.
+TRACE_ENV = "RESTAURANT_TRACE"
+
+# One timed call. depth: 0 for calls made directly by the traced code, 1 for calls made
+# inside those, and so on. start and seconds are relative to the trace's start. rows:
+# the result's size where the function reports one. error: the exception's type name.
+Span = namedtuple("Span", ["name", "depth", "start", "seconds", "rows", "error"])
+
+
+class _ThreadState(threading.local):
+    # A class-level default keeps the lookup on untraced threads a plain attribute read;
+    # a missing thread-local attribute would cost an AttributeError per call.
+    trace = None
+
+
+_local = _ThreadState()
+# Traces begun and not yet finished, across all threads.
+_open_traces = 0
+_open_lock = threading.Lock()
+
+
+def tracing_default():
+    """
+    Returns True if the TRACE_ENV environment variable asks for tracing.
+    """
+    return os.environ.get(TRACE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def count_rows(result):
+    """
+    The default row count for a traced result: DataFrame rows or list length, else None.
+    """
+    if isinstance(result, list):
+        return len(result)
+    shape = getattr(result, "shape", None)
+    if shape:
+        return int(shape[0])
+    return None
+
+
+class Trace:
+    """
+    The spans recorded on one thread between begin_trace() and finish_trace(), e.g. one
+    Streamlit rerun. `meta` is free-form context (page, user) written to the log with it.
+    """
+
+    def __init__(self, label, **meta):
+        self.label = label
+        self.meta = meta
+        self.started_at = time.time()
+        self.spans = []
+        self.seconds = None
+        self.interrupted = False
+        self._t0 = time.perf_counter()
+        self._depth = 0
+
+    @property
+    def finished(self):
+        return self.seconds is not None
+
+    def call(self, name, rows, func, args, kwargs):
+        """
+        Runs func(*args, **kwargs) as a span called `name`; `rows` maps its result to a row count.
+        """
+        depth = self._depth
+        self._depth = depth + 1
+        started = time.perf_counter()
+        result = error = None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        except Exception as e:
+            # Streamlit's st.rerun()/st.stop() raise BaseExceptions; those are control
+            # flow, not failures, so they end the span without an error.
+            error = type(e).__name__
+            raise
+        finally:
+            ended = time.perf_counter()
+            self._depth = depth
+            self.spans.append(Span(name, depth, started - self._t0, ended - started,
+                                   rows(result) if rows and error is None and result is not None else None, error))
+
+    def summary(self):
+        """
+        Aggregates the spans by function, slowest total first.
+
+        Returns:
+            list: Dicts with function, calls, total_ms, max_ms and rows. When the trace is
+                  finished, an "(untraced)" entry holds the time spent outside top-level
+                  spans: Streamlit layout, widgets and plain Python.
+        """
+        by_name = {}
+        for s in self.spans:
+            entry = by_name.setdefault(s.name, {"function": s.name, "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": None})
+            entry["calls"] += 1
+            entry["total_ms"] += s.seconds * 1000
+            entry["max_ms"] = max(entry["max_ms"], s.seconds * 1000)
+            if s.rows is not None:
+                entry["rows"] = (entry["rows"] or 0) + s.rows
+        rows = sorted(by_name.values(), key=lambda entry: entry["total_ms"], reverse=True)
+        if self.finished:
+            traced = sum(s.seconds for s in self.spans if s.depth == 0)
+            rows.append({"function": "(untraced)", "calls": None, "total_ms": max(self.seconds - traced, 0.0) * 1000,
+                         "max_ms": None, "rows": None})
+        return rows
+
+    def flame(self, width=24, name_width=22):
+        """
+        Renders the spans as a text icicle chart: one line per span in start order,
+        indented by depth, with a bar placed at its offset within the trace.
+
+        Returns:
+            list: The chart's lines, the trace itself first.
+        """
+        total = self.seconds or max((s.start + s.seconds for s in self.spans), default=0.0) or 1e-9
+
+        def line(name, depth, start, seconds):
+            left = min(int(start / total * width), width - 1)
+            bar = max(1, round(seconds / total * width))
+            label = ("  " * depth + name)[:name_width]
+            return f"{label:<{name_width}} {' ' * left}{'█' * min(bar, width - left):<{width - left}} {seconds * 1000:>8.1f} ms"
+
+        lines = [line(self.label, 0, 0.0, total)]
+        for s in sorted(self.spans, key=lambda s: (s.start, s.depth)):
+            lines.append(line(s.name, s.depth + 1, s.start, s.seconds))
+        return lines
+
+    def to_dict(self):
+        return {
+            "started": datetime.datetime.fromtimestamp(self.started_at).isoformat(timespec="milliseconds"),
+            "label": self.label,
+            "ms": round(self.seconds * 1000, 3) if self.finished else None,
+            "interrupted": self.interrupted,
+            "meta": self.meta,
+            "spans": [
+                {"name": s.name, "depth": s.depth, "start_ms": round(s.start * 1000, 3), "ms": round(s.seconds * 1000, 3),
+                 "rows": s.rows, "error": s.error}
+                for s in sorted(self.spans, key=lambda s: s.start)
+            ],
+        }
+
+
+def begin_trace(label, **meta):
+    """
+    Starts recording this thread's traced calls into a new Trace, replacing any open one.
+    """
+    global _open_traces
+    trace = Trace(label, **meta)
+    with _open_lock:
+        if _local.trace is not None and not _local.trace.finished:
+            _open_traces -= 1
+        _open_traces += 1
+    _local.trace = trace
+    return trace
+
+
+def finish_trace(trace, interrupted=False, log=True):
+    """
+    Stops `trace` and appends it to the trace log.
+
+    Args:
+        interrupted (bool): The traced code never reached its end (e.g. a rerun cut short
+            by st.rerun()); the trace then ends where its last span ended.
+
+    Returns:
+        Trace: `trace`, for chaining.
+    """
+    global _open_traces
+    if _local.trace is trace:
+        _local.trace = None
+    if trace.finished:
+        return trace
+    with _open_lock:
+        _open_traces -= 1
+    if interrupted:
+        trace.interrupted = True
+        trace.seconds = max((s.start + s.seconds for s in trace.spans), default=0.0)
+    else:
+        trace.seconds = time.perf_counter() - trace._t0
+    if log:
+        try:
+            _trace_logger().info(json.dumps(trace.to_dict(), default=str))
+        except OSError:
+            pass
+    return trace
+
+
+def current_trace():
+    """
+    Returns this thread's open Trace, or None.
+    """
+    return _local.trace
+
+
+def traced(name=None, rows=count_rows):
+    """
+    Decorator recording each call as a span of the calling thread's open trace.
+
+    Args:
+        name (str): Span name; defaults to the function's qualified name.
+        rows (callable): Maps the result to a row count, or None to record no count.
+    """
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _open_traces:
+                return func(*args, **kwargs)
+            trace = _local.trace
+            if trace is None:
+                return func(*args, **kwargs)
+            return trace.call(label, rows, func, args, kwargs)
+        return wrapper
+    return decorate
+
+
+class span:
+    """
+    Context manager recording a block as a span of the calling thread's open trace:
+
+        with span("menu table") as s:
+            df = ...
+            s.rows = len(df)
+    """
+
+    __slots__ = ("name", "rows", "_trace", "_depth", "_started")
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+
+    def __enter__(self):
+        self._trace = trace = _local.trace if _open_traces else None
+        if trace is not None:
+            self._depth = trace._depth
+            trace._depth += 1
+            self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        trace = self._trace
+        if trace is not None:
+            ended = time.perf_counter()
+            trace._depth = self._depth
+            error = exc_type.__name__ if exc_type is not None and issubclass(exc_type, Exception) else None
+            trace.spans.append(Span(self.name, self._depth, self._started - trace._t0, ended - self._started,
+                                    self.rows, error))
+        return False
+
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def _trace_logger():
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                os.makedirs(os.path.dirname(TRACE_LOG), exist_ok=True)
+                handler = logging.handlers.RotatingFileHandler(
+                    TRACE_LOG, maxBytes=TRACE_LOG_MAX_BYTES, backupCount=TRACE_LOG_BACKUPS, encoding="utf-8"
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger = logging.getLogger("restaurant.trace")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                logger.addHandler(handler)
+                _logger = logger
+    return _logger
@@ -0,0 +1,162 @@
+import datetime
+import io
+import secrets
+import threading
+from collections import OrderedDict, namedtuple
+from urllib.parse import quote
+
+import qrcode
+from PIL import Image
+
+from utils.money import format_paise
+
+UPI_ID = "your_upi_id@bank"
+BUSINESS_NAME = "Imperial Spice"
+
+# One payment the customer is being asked to make: the transaction id is minted once and
+# kept (e.g. in session state) until the order is saved, so the QR never changes under them.
+PendingPayment = namedtuple("PendingPayment", ["txn_id", "amount_paise", "link"])
+
+
+def new_txn_id():
+    """
+    Mints a transaction id, e.g. "TXN20250728131010123456A1F3"; the random suffix keeps
+    ids from two counters in the same microsecond apart.
+    """
+    return f"TXN{datetime.datetime.now().strftime('%Y%m%d%H%M%S%f')}{secrets.token_hex(2).upper()}"
+
+
+def upi_link(amount_paise, txn_id):
+    """
+    Returns the upi://pay deep link for collecting `amount_paise` under `txn_id`.
+    """
+    return (f"upi://pay?pa={UPI_ID}&pn={quote(BUSINESS_NAME)}&am={format_paise(amount_paise, '')}"
+            f"&tid={txn_id}&cu=INR")
+
+
+def pending_payment(current, amount_paise):
+    """
+    Returns `current` while it is still for `amount_paise`, otherwise a new PendingPayment
+    with a freshly minted transaction id (the cart or discount changed).
+    """
+    if current is not None and current.amount_paise == amount_paise:
+        return current
+    txn_id = new_txn_id()
+    return PendingPayment(txn_id, amount_paise, upi_link(amount_paise, txn_id))
+
+
+class UpiQrCache:
+    """
+    Bounded LRU of encoded UPI QR codes keyed by payment link, i.e. by (amount, txn id).
+
+    The QR matrix is encoded once per link; the SVG and PNG renderings of it are built on
+    first request and kept alongside, so a rerun showing the same pending payment is a
+    dictionary lookup.
+    """
+
+    def __init__(self, maxsize=128, border=4):
+        self.maxsize = maxsize
+        self.border = border
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, link):
+        with self._lock:
+            entry = self._entries.get(link)
+            if entry is not None:
+                self._entries.move_to_end(link)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L, border=0)
+        qr.add_data(link)
+        qr.make(fit=True)
+        entry = {"matrix": tuple(tuple(row) for row in qr.get_matrix())}
+        with self._lock:
+            entry = self._entries.setdefault(link, entry)
+            self._entries.move_to_end(link)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def matrix(self, link):
+        """
+        Returns the QR modules for `link` as rows of booleans (True = dark), without the quiet zone.
+        """
+        return self._entry(link)["matrix"]
+
+    def svg(self, link):
+        """
+        Returns the QR for `link` as a compact SVG document, one path in module units that
+        scales to any size.
+        """
+        entry = self._entry(link)
+        if "svg" not in entry:
+            matrix, border = entry["matrix"], self.border
+            size = len(matrix) + 2 * border
+            runs = []
+            for y, row in enumerate(matrix):
+                x = 0
+                while x < len(row):
+                    if row[x]:
+                        start = x
+                        while x < len(row) and row[x]:
+                            x += 1
+                        runs.append(f"M{start + border} {y + border}h{x - start}v1h{start - x}z")
+                    else:
+                        x += 1
+            entry["svg"] = (
+                f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+                f'<rect width="{size}" height="{size}" fill="#fff"/><path fill="#000" d="{"".join(runs)}"/></svg>'
+            )
+        return entry["svg"]
+
+    def png(self, link, size=250):
+        """
+        Returns the QR for `link` as a 1-bit PNG of whole-pixel modules, no larger than `size` pixels square.
+        """
+        entry = self._entry(link)
+        key = ("png", size)
+        if key not in entry:
+            matrix, border = entry["matrix"], self.border
+            modules = len(matrix) + 2 * border
+            image = Image.new("1", (modules, modules), 1)
+            image.putdata([
+                0 if 0 <= y - border < len(matrix) and 0 <= x - border < len(matrix) and matrix[y - border][x - border] else 1
+                for y in range(modules) for x in range(modules)
+            ])
+            scale = max(size // modules, 1)
+            image = image.resize((modules * scale, modules * scale), Image.NEAREST)
+            buf = io.BytesIO()
+            image.save(buf, format="PNG", optimize=True)
+            entry[key] = buf.getvalue()
+        return entry[key]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_upi_qr_cache():
+    """
+    Returns the process-wide UpiQrCache.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = UpiQrCache()
+    return _cache